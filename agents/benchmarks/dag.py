@@ -0,0 +1,41 @@
+"""
+DAG - Synthetic team graphs for benchmarking the scheduler and orchestrator
+"""
+
+import random
+from typing import Dict, Any
+
+
+def generate_teams(count: int, seed: int = 0, max_dependencies: int = 3,
+                   window: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Random team DAG in the ``teams`` config format
+
+    Teams are created in topological order; each picks up to
+    ``max_dependencies`` dependencies among the ``window`` teams created
+    just before it (default: a tenth of the graph, at least 4). Narrow
+    windows give long chains, wide ones give wide fan-out. Phases are the
+    team's depth in the graph.
+    """
+    rng = random.Random(seed)
+    window = window or max(4, count // 10)
+    teams: Dict[str, Dict[str, Any]] = {}
+    depth: Dict[str, int] = {}
+
+    for index in range(count):
+        team_id = f"t{index:05d}"
+        candidates = list(teams)[max(0, index - window):index]
+        dependencies = sorted(rng.sample(candidates, min(len(candidates),
+                                                         rng.randint(0, max_dependencies))))
+        if index and not dependencies:
+            dependencies = [candidates[-1]]
+
+        depth[team_id] = 1 + max((depth[dep] for dep in dependencies), default=0)
+        teams[team_id] = {
+            'name': f"Synthetic {team_id}",
+            'phase': depth[team_id],
+            'step_file': f"docs/steps/synthetic/{team_id}.md",
+            'dependencies': dependencies,
+            'duration_estimate': round(rng.uniform(0.5, 6.0) * 2) / 2,
+        }
+
+    return teams
@@ -0,0 +1,153 @@
+"""
+Fakes - Deterministic stand-ins for the model and the SSH host
+
+``FakeTransport`` is registered as the ``fake`` SSH transport and answers
+every command after a simulated latency, failing a configurable fraction of
+them. ``FakeModel`` scripts an agent conversation: a few turns of model
+latency, each asking for a batch of remote commands, then a final answer.
+``FakeAgent`` drives that conversation through the real SSH pool and
+progress checkpoints, so pooling, metrics, tracing, logging and state
+writes are all exercised exactly as in a real run.
+
+All randomness comes from ``random.Random`` seeded per team/command, so a
+given seed always produces the same workload.
+"""
+
+import hashlib
+import os
+import random
+import time
+from typing import Dict, Any, Optional, Callable
+
+from tools.ssh import CommandResult, OutputStream, Transport, register_transport
+
+
+def _rng(*parts: Any) -> random.Random:
+    """RNG seeded from the given parts, stable across processes"""
+    digest = hashlib.sha256(repr(parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _latency(rng: random.Random, mean_ms: float, jitter: float) -> float:
+    """Latency in seconds, uniformly spread +/- ``jitter`` around the mean"""
+    if mean_ms <= 0:
+        return 0.0
+    return max(0.0, mean_ms * (1 + rng.uniform(-jitter, jitter))) / 1000
+
+
+class FakeTransport(Transport):
+    """SSH transport that simulates a host without touching the network
+
+    Configured from ``ssh.fake``: ``latency_ms``, ``jitter`` (fraction),
+    ``failure_rate`` (share of commands exiting 1), ``connect_ms``,
+    ``upload_mbps`` and ``seed``.
+    """
+
+    def __init__(self, host: str, ssh_config: Dict):
+        super().__init__(host, ssh_config)
+        self.fake = ssh_config.get('fake', {})
+        self.connected = False
+        self.calls = 0
+
+    def connect(self):
+        time.sleep(self.fake.get('connect_ms', 0) / 1000)
+        self.connected = True
+
+    def is_active(self) -> bool:
+        return self.connected
+
+    def exec_command(self, command: str, timeout: Optional[float] = None,
+                     output: Optional[OutputStream] = None) -> CommandResult:
+        self.calls += 1
+        rng = _rng(self.fake.get('seed', 0), self.host, command)
+        delay = _latency(rng, self.fake.get('latency_ms', 0), self.fake.get('jitter', 0.2))
+        time.sleep(delay)
+
+        output = output or OutputStream()
+        if rng.random() < self.fake.get('failure_rate', 0.0):
+            output.write('stderr', b"simulated failure")
+            return output.result(command, 1, delay, self.host)
+        output.write('stdout', f"ok: {command}\n".encode())
+        return output.result(command, 0, delay, self.host)
+
+    def put_file(self, local_path: str, remote_path: str,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """Simulate an upload at ``upload_mbps`` (default 100 MB/s)"""
+        size = os.path.getsize(local_path)
+        time.sleep(size / (self.fake.get('upload_mbps', 100) * 2 ** 20))
+        if progress is not None:
+            progress(size, size)
+
+    def close(self):
+        self.connected = False
+
+
+register_transport('fake', FakeTransport)
+
+
+class FakeModel:
+    """Scripted, deterministic model for one team
+
+    ``turns`` model calls each take ``latency_ms`` (+/- ``jitter``) and
+    request ``commands_per_turn`` remote commands; the last turn finishes
+    the team. ``failure_rate`` is the chance a call raises, failing the team.
+    ``work_seconds`` of simulated remote work (e.g. from the team's
+    ``duration_estimate``) is spread over the turns.
+    """
+
+    def __init__(self, team_id: str, settings: Dict[str, Any], work_seconds: float = 0.0):
+        self.team_id = team_id
+        self.settings = settings
+        self.work_seconds = work_seconds
+        self.calls = 0
+        self.rng = _rng(settings.get('seed', 0), 'model', team_id)
+
+    @property
+    def turns(self) -> int:
+        return max(1, self.settings.get('turns', 3))
+
+    def respond(self, turn: int) -> Dict[str, Any]:
+        """Simulate one model call; returns the commands to run next, if any"""
+        self.calls += 1
+        time.sleep(_latency(self.rng, self.settings.get('latency_ms', 0),
+                            self.settings.get('jitter', 0.2)))
+        if self.rng.random() < self.settings.get('failure_rate', 0.0):
+            raise RuntimeError(f"simulated model failure for {self.team_id}")
+
+        if turn + 1 >= self.turns:
+            return {'final': f"{self.team_id} complete", 'commands': []}
+        commands = [f"step {turn} probe {i} for {self.team_id}"
+                    for i in range(self.settings.get('commands_per_turn', 2))]
+        return {'commands': commands, 'work': self.work_seconds / max(1, self.turns - 1)}
+
+
+class FakeAgent:
+    """Minimal agent loop: model turn, remote commands, checkpoint, repeat"""
+
+    def __init__(self, team_id: str, model: FakeModel, pool, state_manager):
+        self.team_id = team_id
+        self.model = model
+        self.pool = pool
+        self.state_manager = state_manager
+
+    def __call__(self, prompt: str) -> str:
+        for turn in range(self.model.turns):
+            reply = self.model.respond(turn)
+            if 'final' in reply:
+                return reply['final']
+
+            # Simulated long-running remote work (installs, builds, waits)
+            time.sleep(reply['work'])
+            for command in reply['commands']:
+                result = self.pool.run(command)
+                if not result.ok:
+                    # A real agent would look at the error and retry once
+                    self.pool.run(command)
+            self.state_manager.record_team_step(self.team_id, f"Task {turn + 1}",
+                                                f"{len(reply['commands'])} commands")
+        return f"{self.team_id} complete"
+
+    async def invoke_async(self, prompt: str) -> str:
+        import asyncio
+
+        return await asyncio.to_thread(self, prompt)
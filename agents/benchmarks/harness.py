@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Harness - Offline benchmark of the orchestrator on synthetic workloads
+
+Runs ``HypervisorOrchestrator`` end to end against synthetic team DAGs with
+the fake model and fake SSH transport from ``fakes.py``, so the scheduler,
+SSH pool, event bus, logging pipeline and ``StateManager`` do their real
+work while no server or model is involved. For each graph size it reports:
+
+- makespan against the lower bound ``max(critical path, work / slots)``,
+  both computed from the teams' measured durations
+- orchestrator overhead per team, from a run with every latency at zero
+- peak traced memory of that run
+- state-write cost: journal appends (including compactions), time per
+  write and the size of the state on disk
+
+Usage:
+    python agents/benchmarks/harness.py [--sizes 12,100,1000] [--parallel 8]
+        [--hour-ms 10] [--json results.json] [--compare baseline.json]
+
+Size 12 runs the real team graph from config.yaml; other sizes are random
+DAGs from ``dag.generate_teams``. With ``--compare`` the run exits non-zero
+if overhead, state-write cost or memory grew (or efficiency dropped) by
+more than ``--tolerance`` against the baseline file.
+"""
+
+import argparse
+import copy
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from orchestrator import HypervisorOrchestrator, load_config  # noqa: E402
+from utils.logger import get_log_pipeline  # noqa: E402
+from utils.metrics import get_metrics  # noqa: E402
+from utils.scheduler import DAGScheduler  # noqa: E402
+from fakes import FakeAgent, FakeModel  # noqa: E402
+from dag import generate_teams  # noqa: E402
+
+
+# Metrics compared by --compare: name -> True if higher is better
+COMPARED = {
+    'efficiency': True,
+    'overhead_ms_per_team': False,
+    'state_us_per_write': False,
+    'peak_memory_mb': False,
+}
+
+
+class BenchOrchestrator(HypervisorOrchestrator):
+    """Orchestrator whose team agents are ``FakeAgent``s
+
+    ``hour_seconds`` is the wall time standing in for one hour of a team's
+    ``duration_estimate``.
+    """
+
+    def __init__(self, config: Dict, model_settings: Dict[str, Any], hour_seconds: float):
+        self.model_settings = model_settings
+        self.hour_seconds = hour_seconds
+        super().__init__(config=config, quiet=True)
+
+    def _create_team_agent(self, team_id: str, task: Dict):
+        work = self.teams[team_id].get('duration_estimate', 1) * self.hour_seconds
+        model = FakeModel(team_id, self.model_settings, work_seconds=work)
+        return FakeAgent(team_id, model, self.ssh_pool, self.state_manager)
+
+
+class StateWriteStats:
+    """Times every journal append of a ``StateManager``"""
+
+    def __init__(self, state_manager):
+        self.state_manager = state_manager
+        self.writes = 0
+        self.seconds = 0.0
+        self._append = state_manager._append
+        state_manager._append = self._timed_append
+
+    def _timed_append(self, record: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            self._append(record)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.writes += 1
+
+    def report(self) -> Dict[str, Any]:
+        files = (self.state_manager.state_file, self.state_manager.journal_file)
+        return {
+            'state_writes': self.writes,
+            'state_write_ms': round(self.seconds * 1000, 2),
+            'state_us_per_write': round(self.seconds * 1e6 / max(1, self.writes), 1),
+            'state_bytes': sum(f.stat().st_size for f in files if f.exists()),
+        }
+
+
+def make_config(base: Dict, teams: Dict, workdir: Path, args, latency: bool) -> Dict:
+    """Benchmark config: scratch base_path, fake transport, no real verification"""
+    config = copy.deepcopy(base)
+    config['teams'] = teams
+    config['hosts'] = []
+    config['project']['base_path'] = str(workdir)
+
+    config.setdefault('workflow', {}).update({
+        'max_parallel_teams': args.parallel,
+        'enable_parallel': True,
+        'execution_mode': 'asyncio' if args.use_async else 'threads',
+    })
+    config.setdefault('error_handling', {}).update({
+        'continue_on_error': True,
+        'rollback_on_failure': False,
+    })
+    config.setdefault('verification', {}).update({
+        'run_after_each_team': False,
+        'reverify_on_resume': False,
+    })
+    config['state']['restore_on_startup'] = False
+    config['state']['fsync'] = args.fsync
+    config.setdefault('logging', {})['console_output'] = False
+    config.setdefault('monitoring', {})['enable_metrics'] = False
+    config.setdefault('advanced', {})['enable_profiling'] = False
+
+    config['ssh']['transport'] = 'fake'
+    config['ssh']['fake'] = {
+        'latency_ms': args.ssh_ms if latency else 0,
+        'jitter': args.jitter,
+        'failure_rate': args.ssh_failure_rate,
+        'seed': args.seed,
+    }
+    return config
+
+
+def model_settings(args, latency: bool) -> Dict[str, Any]:
+    return {
+        'turns': args.turns,
+        'commands_per_turn': args.commands,
+        'latency_ms': args.model_ms if latency else 0,
+        'jitter': args.jitter,
+        'failure_rate': args.model_failure_rate,
+        'seed': args.seed,
+    }
+
+
+def run_once(base: Dict, teams: Dict, args, latency: bool,
+             trace_memory: bool = False) -> Dict[str, Any]:
+    """One workflow run in a scratch directory"""
+    registry = get_metrics()
+    registry.reset()
+    hour_seconds = args.hour_ms / 1000 if latency else 0.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_config(base, teams, Path(tmp), args, latency)
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        orchestrator = BenchOrchestrator(config, model_settings(args, latency), hour_seconds)
+        state_stats = StateWriteStats(orchestrator.state_manager)
+        result = orchestrator.execute_full_workflow(use_async=args.use_async)
+        makespan = time.perf_counter() - start
+
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        get_log_pipeline(config).stop()
+        run = {
+            'makespan_seconds': makespan,
+            'completed': len(result.get('completed_teams', [])),
+            'failed': len(result.get('failed_teams', [])),
+            'durations': {t['id']: t['duration_seconds'] for t in registry.teams.values()},
+            'peak_memory_mb': round(peak / 2 ** 20, 1) if peak is not None else None,
+        }
+        run.update(state_stats.report())
+        return run
+
+
+def lower_bound(teams: Dict, durations: Dict[str, float], slots: int) -> Dict[str, float]:
+    """Critical path and work bounds on makespan from measured team durations"""
+    measured = copy.deepcopy(teams)
+    for team_id, team in measured.items():
+        team['duration_estimate'] = durations.get(team_id, 0.0)
+    scheduler = DAGScheduler(measured, max_parallel=slots)
+    critical_path = scheduler.critical_path_length()
+    work = sum(durations.values()) / slots
+    return {'critical_path_seconds': critical_path, 'work_bound_seconds': work,
+            'lower_bound_seconds': max(critical_path, work)}
+
+
+def bench_size(base: Dict, size: int, args) -> Dict[str, Any]:
+    """Makespan, overhead, memory and state-write cost for one graph size"""
+    teams = copy.deepcopy(base['teams']) if size == len(base['teams']) else \
+        generate_teams(size, seed=args.seed)
+
+    timed = run_once(base, teams, args, latency=True)
+    bounds = lower_bound(teams, timed['durations'], args.parallel)
+
+    # Zero-latency run: what is left is the orchestrator's own cost
+    bare = run_once(base, teams, args, latency=False)
+    memory = run_once(base, teams, args, latency=False, trace_memory=True) \
+        if args.memory else {'peak_memory_mb': None}
+
+    return {
+        'size': size,
+        'completed': timed['completed'],
+        'failed': timed['failed'],
+        'makespan_seconds': round(timed['makespan_seconds'], 3),
+        'lower_bound_seconds': round(bounds['lower_bound_seconds'], 3),
+        'critical_path_seconds': round(bounds['critical_path_seconds'], 3),
+        'efficiency': round(bounds['lower_bound_seconds'] / timed['makespan_seconds'], 3),
+        'overhead_ms_per_team': round(bare['makespan_seconds'] * 1000 / size, 3),
+        'peak_memory_mb': memory['peak_memory_mb'],
+        'state_writes': timed['state_writes'],
+        'state_us_per_write': timed['state_us_per_write'],
+        'state_bytes': timed['state_bytes'],
+    }
+
+
+def print_header():
+    print(f"{'teams':>7}{'makespan':>10}{'bound':>9}{'eff':>7}{'ovh ms':>9}"
+          f"{'mem MB':>9}{'writes':>8}{'us/wr':>9}{'state KB':>10}{'failed':>8}")
+
+
+def print_row(r: Dict[str, Any]):
+    memory = f"{r['peak_memory_mb']:.1f}" if r['peak_memory_mb'] is not None else '-'
+    print(f"{r['size']:>7}{r['makespan_seconds']:>9.2f}s{r['lower_bound_seconds']:>8.2f}s"
+          f"{r['efficiency']:>7.2f}{r['overhead_ms_per_team']:>9.2f}{memory:>9}"
+          f"{r['state_writes']:>8}{r['state_us_per_write']:>9.1f}"
+          f"{r['state_bytes'] / 1024:>10.1f}{r['failed']:>8}", flush=True)
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Regressions against a previous ``--json`` file"""
+    with open(baseline_path) as f:
+        baseline = {r['size']: r for r in json.load(f)['results']}
+
+    regressions = []
+    for r in results:
+        old = baseline.get(r['size'])
+        if not old:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            before, after = old.get(metric), r.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{r['size']} teams: {metric} {before} -> {after} "
+                                   f"({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator on synthetic team DAGs")
+    parser.add_argument("--config", default=str(AGENTS_DIR / "config.yaml"),
+                        help="Base configuration (teams are replaced for synthetic sizes)")
+    parser.add_argument("--sizes", default="12,100,1000",
+                        help="Comma-separated team counts; 12 uses the configured teams")
+    parser.add_argument("--parallel", type=int, default=8, help="Max parallel teams")
+    parser.add_argument("--hour-ms", type=float, default=10,
+                        help="Wall ms simulating one hour of duration_estimate")
+    parser.add_argument("--model-ms", type=float, default=5, help="Fake model latency per call")
+    parser.add_argument("--ssh-ms", type=float, default=2, help="Fake SSH latency per command")
+    parser.add_argument("--turns", type=int, default=3, help="Model calls per team")
+    parser.add_argument("--commands", type=int, default=2, help="SSH commands per model call")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter (fraction)")
+    parser.add_argument("--model-failure-rate", type=float, default=0.0)
+    parser.add_argument("--ssh-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fsync", action="store_true", help="fsync state writes as in production")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Use the asyncio engine")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Skip the tracemalloc run")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    base = load_config(args.config)
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    print_header()
+    results = []
+    for size in sizes:
+        results.append(bench_size(base, size, args))
+        print_row(results[-1])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Wall time of the read-only CLI commands
+
+Runs ``orchestrator.py --status`` (and ``--dry-run``) in fresh interpreters
+against a throwaway copy of the config, with provider credentials removed
+from the environment, and reports min/median/max wall time. Also checks that
+read-only commands never import strands or build a model client, that
+``--status`` writes nothing and that ``--dry-run`` creates no caches.
+
+Usage:
+    python agents/benchmarks/startup.py [--runs 20] [--max-ms 500]
+
+Exits non-zero if a command fails, imports strands, ``--status`` creates
+files, ``--dry-run`` creates cache directories, or a command's median
+exceeds ``--max-ms``.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+ORCHESTRATOR = AGENTS_DIR / "orchestrator.py"
+
+CREDENTIAL_VARS = ('OPENAI_API_KEY', 'ANTHROPIC_API_KEY', 'AWS_ACCESS_KEY_ID',
+                   'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN', 'AWS_PROFILE')
+
+COMMANDS = {
+    'status': ['--status'],
+    'dry-run': ['--dry-run'],
+}
+
+# Shows the status, constructs the orchestrator (as --dry-run does) and
+# reports which heavy modules got imported
+IMPORT_PROBE = """
+import sys
+sys.path.insert(0, {agents_dir!r})
+from orchestrator import HypervisorOrchestrator, load_config, show_status
+show_status(load_config({config!r}))
+orchestrator = HypervisorOrchestrator({config!r})
+heavy = sorted(m for m in ('strands', 'strands_tools', 'asyncio', 'paramiko')
+               if m in sys.modules)
+print('HEAVY:' + ','.join(heavy))
+"""
+
+
+def make_config(workdir: Path) -> Path:
+    """Copy config.yaml with base_path pointed at a scratch directory"""
+    with open(AGENTS_DIR / "config.yaml") as f:
+        config = yaml.safe_load(f)
+
+    config['project']['base_path'] = str(workdir)
+    for team in config['teams'].values():
+        step_file = AGENTS_DIR.parent / team['step_file']
+        team['step_file'] = str(step_file)
+    config['logging']['console_output'] = False
+
+    config_path = workdir / "config.yaml"
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return config_path
+
+
+def clean_env() -> dict:
+    return {k: v for k, v in os.environ.items() if k not in CREDENTIAL_VARS}
+
+
+def time_command(args: list, config_path: Path, runs: int) -> list:
+    """Wall time in ms of each run"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(ORCHESTRATOR), '--config', str(config_path)] + args,
+            env=clean_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    return timings
+
+
+def heavy_imports(config_path: Path) -> list:
+    """Heavy modules imported by --status and while constructing the orchestrator"""
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE.format(agents_dir=str(AGENTS_DIR),
+                                                   config=str(config_path))],
+        env=clean_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import probe failed:\n{result.stderr}")
+    line = [l for l in result.stdout.splitlines() if l.startswith('HEAVY:')][-1]
+    return [m for m in line[len('HEAVY:'):].split(',') if m]
+
+
+def baseline_ms(runs: int) -> float:
+    """Median start-up time of a bare interpreter, for reference"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestrator start-up time")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per command")
+    parser.add_argument("--max-ms", type=float, default=500,
+                        help="Fail if a command's median exceeds this many ms")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = make_config(Path(tmp))
+
+        # Warm the bytecode cache so the first run isn't an outlier
+        time_command(COMMANDS['status'], config_path, 1)
+        written = sorted(str(p.relative_to(tmp)) for p in Path(tmp).rglob('*') if p != config_path)
+        if written:
+            print(f"FAIL: --status wrote {', '.join(written)}")
+            failed = True
+
+        time_command(COMMANDS['dry-run'], config_path, 1)
+        if (Path(tmp) / 'cache').exists():
+            print("FAIL: --dry-run created cache directories")
+            failed = True
+
+        print(f"{'command':<12}{'min':>10}{'median':>10}{'max':>10}   (ms, {args.runs} runs)")
+        print(f"{'python':<12}{'':>10}{baseline_ms(args.runs):>10.1f}")
+        for name, command_args in COMMANDS.items():
+            timings = time_command(command_args, config_path, args.runs)
+            median = statistics.median(timings)
+            print(f"{name:<12}{min(timings):>10.1f}{median:>10.1f}{max(timings):>10.1f}")
+            if median > args.max_ms:
+                print(f"  FAIL: median above {args.max_ms:.0f} ms")
+                failed = True
+
+        heavy = heavy_imports(config_path)
+        if heavy:
+            print(f"FAIL: read-only start-up imported {', '.join(heavy)}")
+            failed = True
+        else:
+            print("No strands/asyncio/paramiko imports on read-only start-up")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,83 @@
 #!/usr/bin/env python3
 """
 Hypervisor Orchestrator - Main workflow coordinator for Hetzner hypervisor setup
-Uses Strands Agent Framework with Workflow pattern for parallel execution
+Runs one Strands agent per team, in parallel where the dependency graph allows
+
+strands and most of rich are imported on first use, and model clients are
+only created for the team agents that run, so read-only commands (--status,
+--dry-run, --rollback) start quickly and need no API credentials.
 """
 
-import os
 import sys
-import json
 import yaml
 import time
 import argparse
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.panel import Panel
-from rich.tree import Tree
+from typing import Dict, List, Optional, Any, Callable, TYPE_CHECKING
 
-from strands import Agent
-from strands_tools import workflow
+if TYPE_CHECKING:
+    from rich.console import Console
+    from strands import Agent
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.state_manager import StateManager
-from utils.logger import setup_logger
+from utils.state_manager import StateManager, read_status
+from utils.logger import setup_logger, TeamLogger, get_log_pipeline
+from utils.scheduler import DAGScheduler
+from utils.plan import WorkflowPlan
+from utils.durations import DurationHistory
+from utils.prefetch import Prefetcher, team_artifacts, normalize_artifacts
+from utils.artifacts import get_artifact_store
+from utils import events
+from utils.events import EventBus, TeamEvent
+from utils.cache import DiskCache
+from utils.metrics import MetricsReporter, get_metrics
+from utils.tracing import get_tracer
+from utils.step_docs import list_substeps, parse_step_tasks, resolve_step_file, StepTask
+from utils.fingerprint import compute_fingerprints, changed_teams
+from tools.ssh import get_ssh_pool, create_ssh_tools
+from tools.steps import StepExecutor, StepOutcome
+from tools.verification import VerificationRunner, VerificationReport
+from tools.progress import create_progress_tools
+
+
+def load_config(config_path: str) -> Dict:
+    """Load configuration from YAML file"""
+    config_file = Path(config_path)
+    if not config_file.exists():
+        # Try from project root, then from the agents directory
+        agents_dir = Path(__file__).resolve().parent
+        for candidate in (agents_dir.parent / config_path, agents_dir / config_path):
+            if candidate.exists():
+                config_file = candidate
+                break
+
+    # libyaml's loader is several times faster than the pure-Python one
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(config_file, 'r') as f:
+        return yaml.load(f, Loader=loader)
 
 
 class HypervisorOrchestrator:
     """Main orchestrator for coordinating multi-agent hypervisor setup"""
 
-    def __init__(self, config_path: str = "agents/config.yaml"):
-        """Initialize the orchestrator with configuration"""
-        self.console = Console()
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path: str = "agents/config.yaml", config: Optional[Dict] = None,
+                 team_slots: Optional[threading.BoundedSemaphore] = None, quiet: bool = False):
+        """Initialize the orchestrator with configuration
+
+        ``config`` skips loading ``config_path`` (used for per-host fleet
+        configs); ``team_slots`` is a fleet-wide cap every team must hold a
+        slot of while it runs; ``quiet`` suppresses console output.
+        """
+        self._console: Optional['Console'] = None
+        self.quiet = quiet
+        self.team_slots = team_slots
+        self.config = config if config is not None else self._load_config(config_path)
+        self.host: Optional[str] = self.config.get('fleet', {}).get('host')
         self.logger = setup_logger(self.config)
         self.state_manager = StateManager(self.config)
 
@@ -46,97 +86,116 @@ class HypervisorOrchestrator:
         self.completed_teams: List[str] = []
         self.failed_teams: List[str] = []
         self.running_teams: List[str] = []
+        self.queued_teams: List[str] = []
+        self.team_errors: Dict[str, str] = {}
+        self.team_fingerprints: Dict[str, str] = {}
+        self.team_started: Dict[str, float] = {}
+        self.team_output: Dict[str, str] = {}
+        self._output_listener: Optional[Callable[[str], None]] = None
+
+        # Team transitions drive status counters, checkpoints and metrics
+        self.events = EventBus()
+        self.events.subscribe(self._track_team_event)
+        self.events.subscribe(self._checkpoint_team_event)
+        self.metrics = MetricsReporter(self.config)
+        self.tracer = get_tracer()
+        if self.config.get('monitoring', {}).get('track_duration', True):
+            self.events.subscribe(self._record_team_metrics, states=[events.DONE, events.FAILED])
+
+        # Actual run times replace the configured estimates over time
+        self.durations = DurationHistory(self.config)
+        self.fresh_starts: set = set()
+        self.events.subscribe(self._learn_team_duration, states=[events.STARTED, events.DONE])
+
+        # Persistent SSH connections shared by every team agent
+        self.ssh_pool = get_ssh_pool(self.config)
+        self.verifier = VerificationRunner(
+            self.ssh_pool, self.config,
+            cache=DiskCache.from_config(self.config, 'verification')
+        )
+        self.step_executor = StepExecutor(self.ssh_pool, self.config)
 
-        # Initialize workflow coordinator agent
-        self.coordinator = self._create_coordinator_agent()
+        # Downloads declared artifacts onto the host ahead of the teams,
+        # through the local content-addressed store when it is enabled
+        self.artifact_store = get_artifact_store(self.config)
+        self.prefetcher = Prefetcher(self.ssh_pool, self.config, store=self.artifact_store)
+
+        # Compiled once; every mode queries it instead of rescanning the config
+        self.plan = WorkflowPlan(self.teams, build_task=self._compile_team_task)
+
+        # Dependency graph and critical-path priorities
+        self.scheduler = self._create_scheduler()
 
         # Load or restore state
         if self.config['state']['restore_on_startup']:
             self.state_manager.restore_state()
-            self.completed_teams = self.state_manager.get('completed_teams', [])
+            self.completed_teams = list(self.state_manager.get('completed_teams', []))
 
         self.logger.info("Orchestrator initialized successfully")
 
+    @property
+    def console(self) -> 'Console':
+        """Rich console, created on first output"""
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(quiet=self.quiet)
+        return self._console
+
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
-        config_file = Path(config_path)
-        if not config_file.exists():
-            # Try from project root
-            config_file = Path(self.config['project']['base_path']) / config_path
+        return load_config(config_path)
 
-        with open(config_file, 'r') as f:
-            return yaml.safe_load(f)
-
-    def _create_coordinator_agent(self) -> Agent:
-        """Create the main coordinator agent with workflow capability"""
-        from utils.model_factory import create_model
+    def execute_full_workflow(self, dry_run: bool = False,
+                              use_async: Optional[bool] = None,
+                              team_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Execute the complete hypervisor setup workflow
 
-        model = create_model(self.config)
+        ``use_async`` selects the asyncio engine; by default it follows
+        ``workflow.execution_mode`` in the config. ``team_ids`` restricts
+        the run to those teams (e.g. one phase); their dependencies outside
+        it must already be complete.
+        """
+        from rich.panel import Panel
 
-        agent = Agent(
-            name="HypervisorCoordinator",
-            model=model,
-            system_prompt="""You are the Hypervisor Infrastructure Coordinator.
-
-Your mission is to orchestrate the deployment of a production-grade Kubernetes
-hypervisor infrastructure on Hetzner servers using Firecracker/Flintlock microVMs.
-
-You coordinate multiple specialized agent teams working in parallel where possible,
-following a strict dependency graph to ensure proper ordering.
-
-Your responsibilities:
-- Manage workflow execution and task dependencies
-- Track progress across all teams
-- Handle errors and coordinate rollbacks
-- Ensure verification passes after each step
-- Optimize for parallel execution while respecting dependencies
-
-Be precise, methodical, and always verify before proceeding to the next phase.""",
-            tools=[workflow]
-        )
-
-        return agent
-
-    def execute_full_workflow(self, dry_run: bool = False) -> Dict[str, Any]:
-        """Execute the complete hypervisor setup workflow"""
         self.console.print(Panel.fit(
             "[bold cyan]🚀 Hetzner Hypervisor Setup - Full Workflow Execution[/bold cyan]",
             border_style="cyan"
         ))
 
         start_time = time.time()
+        tracing = False
 
         try:
             # Create workflow tasks
-            tasks = self._create_workflow_tasks()
+            # Re-run teams whose inputs changed, plus everything downstream
+            self._invalidate_changed_teams(persist=not dry_run)
+
+            # Run teams through the DAG scheduler
+            self.scheduler = self._create_scheduler(team_ids)
+            tasks = self._create_workflow_tasks(team_ids)
 
             if dry_run:
                 self._display_workflow_plan(tasks)
-                return {"status": "dry_run_complete", "tasks": len(tasks)}
-
-            # Create workflow in coordinator
-            self.console.print("\n[yellow]Creating workflow...[/yellow]")
-            self.coordinator.tool.workflow(
-                action="create",
-                workflow_id="hypervisor_setup",
-                tasks=tasks
+                return {"status": "dry_run_complete", "tasks": len(tasks),
+                        "projected_hours": round(self.scheduler.simulate(), 2)}
+
+            self.console.print("\n[yellow]Starting workflow execution...[/yellow]")
+            self.console.print(
+                f"[dim]Max parallel teams: {self.scheduler.max_parallel} | "
+                f"Critical path: {self.scheduler.critical_path_length():.1f}h | "
+                f"Projected: {self.scheduler.simulate():.1f}h[/dim]\n"
             )
 
-            # Start workflow execution
-            self.console.print("[yellow]Starting workflow execution...[/yellow]\n")
-            result = self.coordinator.tool.workflow(
-                action="start",
-                workflow_id="hypervisor_setup"
-            )
+            if use_async is None:
+                use_async = self.config.get('workflow', {}).get('execution_mode') == 'asyncio'
 
-            # Monitor progress
-            self._monitor_workflow_progress()
+            self.metrics.start()
+            tracing = self.tracer.start(self.config)
+            self._start_prefetch()
+            final_status = self._run_scheduler_with_progress(use_async)
 
-            # Get final status
-            final_status = self.coordinator.tool.workflow(
-                action="status",
-                workflow_id="hypervisor_setup"
-            )
+            if final_status['failed'] and not self.config['error_handling'].get('continue_on_error', False):
+                raise RuntimeError(f"Teams failed: {', '.join(final_status['failed'])}")
 
             duration_hours = (time.time() - start_time) / 3600
 
@@ -153,11 +212,29 @@ Be precise, methodical, and always verify before proceeding to the next phase.""
                 "duration_hours": duration_hours,
                 "completed_teams": self.completed_teams,
                 "failed_teams": self.failed_teams,
-                "final_status": final_status
+                "final_status": final_status,
+                "verification_cache": self.verifier.cache_stats()
+            }
+
+        except KeyboardInterrupt:
+            # Threads cannot be cancelled: the thread engine waits for running
+            # teams, and asyncio teams' to_thread work finishes in the background
+            if use_async:
+                running = ("running agents were cancelled, but scripted steps and checks "
+                           "already under way finish in the background")
+            else:
+                running = "teams already running were allowed to finish"
+            self.logger.warning("Workflow interrupted - no new teams started; %s", running)
+            self.console.print(f"[bold yellow]⏹  Interrupted. No new teams were started; {running}. "
+                               f"Resume with --resume.[/bold yellow]")
+            return {
+                "status": "interrupted",
+                "completed_teams": self.completed_teams,
+                "failed_teams": self.failed_teams,
             }
 
         except Exception as e:
-            self.logger.error(f"Workflow execution failed: {e}")
+            self.logger.error("Workflow execution failed: %s", e)
             self.console.print(f"[bold red]❌ Error: {e}[/bold red]")
 
             if self.config['error_handling']['rollback_on_failure']:
@@ -165,29 +242,43 @@ Be precise, methodical, and always verify before proceeding to the next phase.""
 
             raise
 
-    def _create_workflow_tasks(self) -> List[Dict]:
-        """Create workflow tasks from team configuration"""
+        finally:
+            self.prefetcher.stop()
+            if not dry_run:
+                self.metrics.stop(completed_teams=self.completed_teams,
+                                  failed_teams=self.failed_teams)
+                if tracing:
+                    self.tracer.stop()
+            self.ssh_pool.close()
+            self.state_manager.compact()
+
+    def _create_workflow_tasks(self, team_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Create workflow tasks for the given (default: all) teams still to run"""
         tasks = []
 
-        for team_id, team_config in self.teams.items():
+        for team_id in team_ids if team_ids is not None else self.plan.order:
             # Skip if already completed
             if team_id in self.completed_teams:
-                self.logger.info(f"Skipping {team_id} - already completed")
+                self.logger.info("Skipping %s - already completed", team_id)
                 continue
 
-            task = {
-                "task_id": team_id,
-                "description": self._get_team_description(team_id, team_config),
-                "system_prompt": self._get_team_system_prompt(team_id, team_config),
-                "dependencies": team_config.get('dependencies', []),
-                "priority": self._calculate_priority(team_config),
-            }
-
+            task = self._build_team_task(team_id)
+            task["priority"] = self._calculate_priority(team_id)
             tasks.append(task)
 
-        self.logger.info(f"Created {len(tasks)} workflow tasks")
+        self.logger.info("Created %d workflow tasks", len(tasks))
         return tasks
 
+    def _compile_team_task(self, team_id: str, team_config: Dict) -> Dict:
+        """Static part of a team's task, built once per plan"""
+        return {
+            "task_id": team_id,
+            "description": self._get_team_description(team_id, team_config),
+            "system_prompt": self._get_team_system_prompt(team_id, team_config),
+            "dependencies": list(team_config.get('dependencies') or []),
+            "step_tasks": parse_step_tasks(resolve_step_file(self.config, team_config['step_file'])),
+        }
+
     def _get_team_description(self, team_id: str, team_config: Dict) -> str:
         """Generate task description for a team"""
         step_file = team_config['step_file']
@@ -197,8 +288,12 @@ Be precise, methodical, and always verify before proceeding to the next phase.""
 Step Documentation: {step_file}
 
 Tasks:
-1. SSH to the Hetzner server (host: {self.config['ssh']['host']})
-2. Navigate to project: {self.config['ssh']['remote_project_path']}
+1. Run commands on the Hetzner server (host: {self.config['ssh']['host']}) with the
+   execute_remote_command tool; the SSH connection is already established.
+   Group short probes and checks into a single execute_remote_batch call
+2. Commands start in the project directory, {self.config['ssh']['remote_project_path']}
+   (once it exists). Each command runs in a fresh shell, so `cd` and exported
+   variables do not carry over: chain them with && in the same command
 3. Follow all instructions in {step_file}
 4. Execute commands carefully and verify each step
 5. Run verification script if available
@@ -209,8 +304,35 @@ Estimated Duration: {team_config['duration_estimate']} hours
 
 Important: Document any issues encountered and ensure all verification passes."""
 
+        substeps = list_substeps(resolve_step_file(self.config, step_file))
+        if substeps:
+            description += (
+                "\n\nSub-steps:\n" + "\n".join(f"- {name}" for name in substeps) +
+                "\n\nAfter each sub-step's verification passes, call record_step_checkpoint "
+                "with its name and a short summary."
+            )
+
+        artifacts = team_artifacts(team_config, self.prefetcher.remote_dir)
+        if artifacts and self.prefetcher.enabled:
+            description += (
+                "\n\nArtifacts prefetched to the host (use these instead of downloading again):\n" +
+                "\n".join(f"- {a['dest']} (from {a['url']})" for a in artifacts)
+            )
+
         return description
 
+    def _get_resume_note(self, team_id: str) -> str:
+        """Description suffix listing sub-steps a previous run already verified"""
+        completed_steps = self.state_manager.get_team_steps(team_id)
+        if not completed_steps:
+            return ""
+        done = "\n".join(f"- {s['step']}: {s['summary']}" for s in completed_steps)
+        return (
+            f"\n\nRESUMING: a previous run already completed and verified these sub-steps:\n"
+            f"{done}\n\nDo not repeat them. Continue from the next sub-step after "
+            f"'{completed_steps[-1]['step']}'."
+        )
+
     def _get_team_system_prompt(self, team_id: str, team_config: Dict) -> str:
         """Generate system prompt for a team agent"""
 
@@ -302,99 +424,627 @@ Make the platform easy and delightful to use."""
 
         return prompts.get(team_id, f"You are a specialist for {team_config['name']}.")
 
-    def _calculate_priority(self, team_config: Dict) -> int:
-        """Calculate task priority based on phase and dependencies"""
-        # Lower phase = higher priority (higher number)
-        # Phase 1 = priority 10, Phase 6 = priority 5
-        base_priority = 11 - team_config['phase']
+    def _calculate_priority(self, team_id: str) -> float:
+        """Calculate task priority as the longest remaining critical path (hours)"""
+        return round(self.scheduler.priority(team_id), 2)
 
-        # Reduce priority based on number of dependencies
-        dependency_factor = len(team_config.get('dependencies', []))
+    def _create_scheduler(self, team_ids: Optional[List[str]] = None) -> DAGScheduler:
+        """Create a DAG scheduler honoring the workflow parallelism settings
 
-        return max(1, base_priority - dependency_factor)
+        With ``team_ids``, every other team counts as done, so only those run.
+        """
+        workflow_config = self.config.get('workflow', {})
 
-    def _display_workflow_plan(self, tasks: List[Dict]):
-        """Display the workflow execution plan"""
-        tree = Tree("[bold cyan]Workflow Execution Plan[/bold cyan]")
+        if workflow_config.get('enable_parallel_execution', True):
+            max_parallel = workflow_config.get('max_parallel_teams', 1)
+        else:
+            max_parallel = 1
 
-        phases = {}
-        for task in tasks:
-            phase = self.teams[task['task_id']]['phase']
-            if phase not in phases:
-                phases[phase] = []
-            phases[phase].append(task)
+        completed = list(self.completed_teams)
+        if team_ids is not None:
+            completed += [t for t in self.plan.order if t not in team_ids and t not in completed]
+        return DAGScheduler(self.teams, max_parallel=max_parallel, completed=completed,
+                            durations=self.durations.estimates(self.teams), plan=self.plan)
 
-        for phase in sorted(phases.keys()):
-            phase_branch = tree.add(f"[yellow]Phase {phase}[/yellow]")
+    def _create_team_agent(self, team_id: str, task: Dict) -> 'Agent':
+        """Create the agent that executes a single team
 
-            for task in phases[phase]:
-                team_id = task['task_id']
-                team_config = self.teams[team_id]
-                deps = ', '.join(task['dependencies']) if task['dependencies'] else 'None'
+        A team that failed before gets fresh model responses: replaying the
+        recorded ones would repeat the decisions that failed.
+        """
+        from strands import Agent
+        from utils.model_factory import create_model
+        from utils.conversation import conversation_kwargs
+
+        retried = team_id in self.failed_teams or self.state_manager.is_team_failed(team_id)
+        return Agent(
+            name=f"Team_{team_id}",
+            model=create_model(self.config, cache=self.teams[team_id].get('llm_cache', True),
+                               replay=not retried),
+            system_prompt=task['system_prompt'],
+            tools=(create_ssh_tools(self.ssh_pool, on_output=self._command_output_sink(team_id),
+                                    cwd=self.config['ssh'].get('remote_project_path')) +
+                   create_progress_tools(self.state_manager, team_id)),
+            **conversation_kwargs(self.config, TeamLogger(team_id, self.config))
+        )
 
-                task_info = (
-                    f"[green]{team_config['name']}[/green] "
-                    f"({team_config['duration_estimate']}h) "
-                    f"- Deps: {deps}"
-                )
-                phase_branch.add(task_info)
+    def _command_output_sink(self, team_id: str) -> Callable[[str, str], None]:
+        """Forward a team's streamed command output to its log and the live display"""
+        team_logger = TeamLogger(team_id, self.config)
 
-        self.console.print(tree)
+        def on_output(stream: str, line: str):
+            team_logger.debug("%s | %s", stream, line)
+            self.team_output[team_id] = line
+            listener = self._output_listener
+            if listener:
+                listener(team_id)
+
+        return on_output
+
+    def _build_team_task(self, team_id: str) -> Dict:
+        """Build the task payload handed to a team agent"""
+        task = dict(self.plan.task(team_id))
+        task["description"] += self._get_resume_note(team_id)
+        return task
+
+    def _execute_team(self, team_id: str) -> bool:
+        """Run a single team agent to completion, returning True on success"""
+        team_logger = TeamLogger(team_id, self.config)
+        task = self._build_team_task(team_id)
+
+        try:
+            with self._team_slot(), self.tracer.track(self._track_name(team_id)), \
+                    self.tracer.span(team_id, 'team'):
+                team_logger.info("Starting %s", self.teams[team_id]['name'])
+                self._wait_for_artifacts(team_id, team_logger)
+                if self._uses_scripted_steps(team_id, task):
+                    if not self._run_scripted_steps(team_id, task, team_logger):
+                        return False
+                    return self._verify_team(team_id, team_logger)
+                agent = self._create_team_agent(team_id, task)
+                with self.tracer.span('agent', 'agent'):
+                    result = agent(task['description'])
+                team_logger.info("Completed: %s", result)
+                self._log_context_stats(agent, team_logger)
+                return self._verify_team(team_id, team_logger)
+        except Exception as e:
+            team_logger.error("Team execution failed: %s", e)
+            self.logger.error("Team %s failed: %s", team_id, e)
+            self.team_errors[team_id] = str(e)
+            return False
+
+    async def _execute_team_async(self, team_id: str) -> bool:
+        """Coroutine variant of ``_execute_team`` used by the asyncio engine"""
+        import asyncio
+
+        team_logger = TeamLogger(team_id, self.config)
+        task = self._build_team_task(team_id)
+
+        slot = False
+        try:
+            slot = await self._acquire_team_slot_async()
+            with self.tracer.track(self._track_name(team_id)), self.tracer.span(team_id, 'team'):
+                team_logger.info("Starting %s (async)", self.teams[team_id]['name'])
+                await asyncio.to_thread(self._wait_for_artifacts, team_id, team_logger)
+                if self._uses_scripted_steps(team_id, task):
+                    # Scripted tasks block on SSH; repairs run the agent synchronously there too
+                    if not await asyncio.to_thread(self._run_scripted_steps, team_id, task, team_logger):
+                        return False
+                    return await asyncio.to_thread(self._verify_team, team_id, team_logger)
+                agent = self._create_team_agent(team_id, task)
+                with self.tracer.span('agent', 'agent'):
+                    result = await agent.invoke_async(task['description'])
+                team_logger.info("Completed: %s", result)
+                self._log_context_stats(agent, team_logger)
+                return await asyncio.to_thread(self._verify_team, team_id, team_logger)
+        except asyncio.CancelledError:
+            team_logger.warning("Team execution cancelled")
+            raise
+        except Exception as e:
+            team_logger.error("Team execution failed: %s", e)
+            self.logger.error("Team %s failed: %s", team_id, e)
+            self.team_errors[team_id] = str(e)
+            return False
+        finally:
+            if slot:
+                self.team_slots.release()
+
+    def _uses_scripted_steps(self, team_id: str, task: Dict) -> bool:
+        """True if the team's step file is run directly instead of by the agent"""
+        enabled = self.teams[team_id].get(
+            'scripted_steps', self.config.get('workflow', {}).get('scripted_steps', False))
+        return bool(enabled and task.get('step_tasks'))
+
+    def _run_scripted_steps(self, team_id: str, task: Dict, team_logger: TeamLogger) -> bool:
+        """Run the step file's tasks without the model, repairing failures with the agent
+
+        Tasks already checkpointed by an earlier run are skipped. The agent
+        is created only when a task fails or is ``agent_only``, and is given
+        just that task.
+        """
+        done = {step['step'] for step in self.state_manager.get_team_steps(team_id)}
+        on_output = self._command_output_sink(team_id)
+        agent = None
+
+        try:
+            for step in task['step_tasks']:
+                if step.name in done:
+                    team_logger.info("Skipping %s - verified in an earlier run", step.name)
+                    continue
+
+                team_logger.set_step(step.name)
+                if step.agent_only:
+                    team_logger.info("%s is guarded in the step file; handing it to the agent", step.name)
+                    if agent is None:
+                        agent = self._create_team_agent(team_id, task)
+                    outcome = self._delegate_step(agent, team_id, step)
+                    summary = "Guarded sub-step; done by the agent and verified"
+                else:
+                    outcome = self.step_executor.run(step, on_output=on_output)
+                    if outcome.ok:
+                        team_logger.info("%s passed without the agent (%.1fs)", step.name, outcome.duration)
+                        summary = (f"Ran {len(step.commands)} command block(s), "
+                                   f"{len(step.checks)} check(s) passed")
+                    else:
+                        team_logger.warning("%s failed: %s", step.name, outcome.describe(500))
+                        if agent is None:
+                            agent = self._create_team_agent(team_id, task)
+                        outcome = self._repair_step(agent, team_id, step, outcome)
+                        get_metrics().inc('scripted_step_repairs_total',
+                                          result='repaired' if outcome.ok else 'failed')
+                        summary = "Failed when scripted; repaired by the agent and re-verified"
+
+                if not outcome.ok:
+                    message = f"{step.name} still failing after the agent's attempt: {outcome.describe(500)}"
+                    team_logger.error(message)
+                    self.team_errors[team_id] = message
+                    return False
+                team_logger.info("%s passed", step.name)
+                self.state_manager.record_team_step(team_id, step.name, summary)
+            return True
+        finally:
+            team_logger.set_step(None)
+            if agent is not None:
+                self._log_context_stats(agent, team_logger)
+
+    def _repair_step(self, agent: 'Agent', team_id: str, step: StepTask,
+                     outcome: StepOutcome) -> StepOutcome:
+        """Ask the team agent to fix one failed task, then re-run its checks"""
+        step_file = self.teams[team_id]['step_file']
+        checks = "\n".join(check.command for check in step.checks) or "(none)"
+        prompt = (
+            f"The sub-step '{step.name}' of {step_file} was run as a script and failed.\n\n"
+            f"Script:\n```bash\n{step.script or '(no commands)'}\n```\n\n"
+            f"{outcome.describe()}\n\n"
+            f"Diagnose the failure on the host and complete this sub-step only, so that "
+            f"these verification commands pass:\n```bash\n{checks}\n```\n"
+            f"Other sub-steps are run separately; do not start them."
+        )
+        with self.tracer.span('agent', 'agent', repair=step.name):
+            agent(prompt)
+        return self.step_executor.verify(step)
+
+    def _delegate_step(self, agent: 'Agent', team_id: str, step: StepTask) -> StepOutcome:
+        """Have the team agent carry out a guarded task, then run its checks"""
+        step_file = self.teams[team_id]['step_file']
+        checks = "\n".join(check.command for check in step.checks) or "(none)"
+        prompt = (
+            f"The sub-step '{step.name}' of {step_file} carries a warning in the step file, "
+            f"so it is not run as a script.\n\n"
+            f"Commands from the step file:\n```bash\n{step.script or '(no commands)'}\n```\n\n"
+            f"Read the warning, check its precondition on the host first, and carry out this "
+            f"sub-step only if it holds; if it does not, change nothing and explain why. "
+            f"The sub-step is complete when these verification commands pass:\n"
+            f"```bash\n{checks}\n```\n"
+            f"Other sub-steps are run separately; do not start them."
+        )
+        with self.tracer.span('agent', 'agent', delegate=step.name):
+            agent(prompt)
+        return self.step_executor.verify(step)
+
+    def _log_context_stats(self, agent: 'Agent', team_logger: TeamLogger):
+        """Log how large the agent's conversation got and how much compaction saved"""
+        manager = getattr(agent, 'conversation_manager', None)
+        if hasattr(manager, 'stats'):
+            stats = manager.stats()
+            team_logger.info("Context: peak ~%d tokens, ~%d at the end, ~%d saved by compaction",
+                             stats['peak_tokens'], stats['current_tokens'], stats['tokens_saved'])
+
+    def _start_prefetch(self):
+        """Queue every pending team's artifacts in projected start order"""
+        starts: Dict[str, float] = {}
+        self.scheduler.simulate(starts=starts)
+        self.prefetcher.start(self.teams, sorted(starts, key=starts.get))
+
+    def _wait_for_artifacts(self, team_id: str, team_logger: TeamLogger):
+        """Hold the team until its prefetched artifacts are on the host
+
+        A failed prefetch is logged, not fatal: the team's own step file
+        still knows how to download what it needs.
+        """
+        with self.tracer.span('artifacts', 'prefetch'):
+            failed = self.prefetcher.ensure(team_id)
+        for job in failed:
+            team_logger.warning("Prefetch of %s failed: %s", job.url, job.error)
+
+    @contextmanager
+    def _team_slot(self):
+        """Hold one of the fleet-wide team slots, if the fleet caps teams"""
+        if self.team_slots is None:
+            yield
+            return
+        self.team_slots.acquire()
+        try:
+            yield
+        finally:
+            self.team_slots.release()
+
+    async def _acquire_team_slot_async(self) -> bool:
+        """Wait for a fleet-wide team slot without blocking the event loop"""
+        import asyncio
+
+        if self.team_slots is None:
+            return False
+        # Poll rather than block a worker thread, so cancellation can't leak a slot
+        while not self.team_slots.acquire(blocking=False):
+            await asyncio.sleep(0.5)
+        return True
+
+    def _track_name(self, team_id: str) -> str:
+        """Trace track for a team, prefixed with the host in fleet mode"""
+        return f"{self.host}/{team_id}" if self.host else team_id
+
+    def _verify_team(self, team_id: str, team_logger: TeamLogger) -> bool:
+        """Gate a finished team on its verification checks
+
+        Publishes ``verified`` when the gate passes. In strict mode a failing
+        required check fails the team; otherwise it is logged and ignored.
+        """
+        verification_config = self.config.get('verification', {})
+        if not verification_config.get('run_after_each_team', True):
+            self.events.publish(team_id, events.VERIFIED, checks=0)
+            return True
+
+        report = self.verifier.verify_step(team_id)
+        team_logger.info("Verification: %s", report.to_dict())
+
+        if not report.passed:
+            message = f"Verification failed: {', '.join(report.failures)}"
+            if verification_config.get('strict_mode', True):
+                team_logger.error(message)
+                self.team_errors[team_id] = message
+                return False
+            team_logger.warning(message)
+
+        self.events.publish(team_id, events.VERIFIED, checks=len(report.results),
+                            verification_seconds=round(report.duration, 3))
+        return True
+
+    def _reverify_completed_teams(self, team_ids: Optional[List[str]] = None) -> List[str]:
+        """Re-check completed teams before building on them
+
+        Unchanged hosts and step files are served from the verification
+        cache, so this is cheap on ``--resume`` / ``--phase``. Teams that no
+        longer pass are removed from ``completed_teams`` so they run again.
+        """
+        if not self.config.get('verification', {}).get('reverify_on_resume', True):
+            return []
+
+        regressed = []
+        for team_id in list(team_ids if team_ids is not None else self.completed_teams):
+            report = self.verifier.verify_step(team_id, use_cache=True)
+            if not report.passed:
+                regressed.append(team_id)
+                self.completed_teams.remove(team_id)
+                self.state_manager.clear_team_steps(team_id)
+                self.logger.warning("Team %s no longer verifies: %s", team_id, ', '.join(report.failures))
+
+        cache_stats = self.verifier.cache_stats()
+        if cache_stats:
+            self.logger.info("Verification cache: %d hits, %d misses",
+                             cache_stats['hits'], cache_stats['misses'])
+
+        if regressed:
+            self.console.print(f"[yellow]Re-running teams that no longer verify: "
+                               f"{', '.join(regressed)}[/yellow]")
+        return regressed
+
+    def verify_host(self) -> VerificationReport:
+        """Run the base hypervisor checks and display the results"""
+        from rich.table import Table
+
+        report = self.verifier.verify_step("hypervisor")
+
+        table = Table(title="Hypervisor Verification")
+        table.add_column("Check", style="cyan")
+        table.add_column("Status")
+        table.add_column("Latency", justify="right")
+        table.add_column("Output", style="dim")
+
+        styles = {"pass": "green", "warn": "yellow", "fail": "red", "error": "red"}
+        for result in report.results:
+            style = styles[result.status]
+            table.add_row(result.check.description, f"[{style}]{result.status}[/{style}]",
+                          f"{result.latency:.2f}s", result.output[:60] or result.error)
+
+        self.console.print(table)
+        summary = report.summary()
+        self.console.print(f"Passed: {summary['pass']}  Warnings: {summary['warn']}  "
+                           f"Failed: {summary['fail'] + summary['error']}  "
+                           f"({report.duration:.2f}s)")
+        return report
+
+    def _get_team_timeouts(self) -> Dict[str, float]:
+        """Per-team timeouts in seconds for the asyncio engine
+
+        A team's ``timeout_hours`` wins; otherwise the timeout is its
+        ``duration_estimate`` scaled by ``workflow.team_timeout_factor``.
+        """
+        factor = self.config.get('workflow', {}).get('team_timeout_factor')
+        timeouts = {}
+
+        for team_id, team_config in self.teams.items():
+            hours = team_config.get('timeout_hours')
+            if hours is None and factor:
+                hours = team_config['duration_estimate'] * factor
+            if hours:
+                timeouts[team_id] = hours * 3600
+
+        return timeouts
+
+    def _run_scheduler_with_progress(self, use_async: bool = False) -> Dict[str, Any]:
+        """Run the scheduler, driving the progress bar from team events"""
+        from rich.markup import escape
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+
+        pending = len(self.teams) - len(self.scheduler.completed)
 
-    def _monitor_workflow_progress(self):
-        """Monitor and display workflow progress"""
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            console=self.console
+            console=self.console,
+            disable=self.quiet
         ) as progress:
 
-            task = progress.add_task("[cyan]Executing workflow...", total=100)
+            bar = progress.add_task("[cyan]Executing workflow...", total=max(pending, 1))
+            last_render = [0.0]
+
+            def describe() -> str:
+                running = ', '.join(self.running_teams) or 'idle'
+                remaining = self._estimated_remaining_hours()
+                eta = datetime.fromtimestamp(time.time() + remaining * 3600)
+                description = (f"[cyan]Running: {running} "
+                               f"[dim]| ETA {eta:%a %H:%M} ({remaining:.1f}h left)")
+                for team_id in list(self.running_teams):
+                    line = self.team_output.get(team_id)
+                    if line:
+                        description += f"\n  [dim]{team_id}: {escape(line[:100])}[/dim]"
+                return description
+
+            def on_output(team_id: str):
+                # Output can arrive far faster than the display refreshes
+                now = time.monotonic()
+                if now - last_render[0] >= 0.25:
+                    last_render[0] = now
+                    progress.update(bar, description=describe())
+
+            def on_event(event: TeamEvent):
+                name = self.teams[event.team_id]['name']
+                if event.state == events.STARTED:
+                    progress.console.print(f"[cyan]▶ {name} started[/cyan]")
+                elif event.state == events.DONE:
+                    progress.console.print(f"[green]✓ {name} complete[/green]")
+                    progress.advance(bar)
+                elif event.state == events.FAILED:
+                    progress.console.print(f"[red]✗ {name} failed[/red]")
+                    progress.advance(bar)
+
+                if event.state in (events.DONE, events.FAILED):
+                    self.team_output.pop(event.team_id, None)
+                progress.update(bar, description=describe())
+
+            scheduler_callbacks = {
+                "on_queue": lambda team_id: self.events.publish(team_id, events.QUEUED),
+                "on_start": lambda team_id: self.events.publish(
+                    team_id, events.STARTED,
+                    critical_path=round(self.scheduler.priority(team_id), 2)
+                ),
+                "on_finish": self._on_team_finished,
+                "continue_on_error": self.config['error_handling'].get('continue_on_error', False),
+            }
 
-            while True:
-                status = self.coordinator.tool.workflow(
-                    action="status",
-                    workflow_id="hypervisor_setup"
-                )
+            # Quiet orchestrators (fleet hosts) skip rendering output nobody sees
+            if not self.quiet:
+                self.events.subscribe(on_event)
+                self._output_listener = on_output
+            try:
+                if use_async:
+                    import asyncio
+
+                    return asyncio.run(self.scheduler.run_async(
+                        execute=self._execute_team_async,
+                        timeouts=self._get_team_timeouts(),
+                        **scheduler_callbacks
+                    ))
+                return self.scheduler.run(execute=self._execute_team, **scheduler_callbacks)
+            finally:
+                self.events.unsubscribe(on_event)
+                self._output_listener = None
+
+    def _on_team_finished(self, team_id: str, success: bool):
+        """Publish the final transition for a team reported by the scheduler"""
+        if success:
+            self.events.publish(team_id, events.DONE)
+        else:
+            error = (self.team_errors.get(team_id)
+                     or self.scheduler.errors.get(team_id, "Team execution failed"))
+            self.events.publish(team_id, events.FAILED, error=error)
+
+    def _track_team_event(self, event: TeamEvent):
+        """Keep the status counters in sync with team transitions"""
+        team_id = event.team_id
+
+        for bucket in (self.queued_teams, self.running_teams):
+            if team_id in bucket:
+                bucket.remove(team_id)
+
+        if event.state == events.QUEUED:
+            self.queued_teams.append(team_id)
+        elif event.state in (events.STARTED, events.VERIFIED):
+            self.running_teams.append(team_id)
+            if event.state == events.STARTED:
+                self.team_started[team_id] = time.time()
+        elif event.state == events.DONE:
+            if team_id not in self.completed_teams:
+                self.completed_teams.append(team_id)
+        elif event.state == events.FAILED:
+            if team_id not in self.failed_teams:
+                self.failed_teams.append(team_id)
+
+        self.logger.info("Team %s -> %s", team_id, event.state)
+        self.tracer.counter('teams', running=len(self.running_teams), queued=len(self.queued_teams))
+
+    def _checkpoint_team_event(self, event: TeamEvent):
+        """Persist team transitions through the state manager"""
+        if event.state == events.DONE:
+            self.state_manager.mark_team_complete(event.team_id)
+            self.state_manager.clear_team_steps(event.team_id)
+
+            fingerprints = dict(self.state_manager.get('team_fingerprints', {}))
+            if event.team_id in self.team_fingerprints:
+                fingerprints[event.team_id] = self.team_fingerprints[event.team_id]
+                self.state_manager.save_state({'team_fingerprints': fingerprints})
+        elif event.state == events.FAILED:
+            self.state_manager.mark_team_failed(event.team_id, event.data.get('error', ''))
+        elif event.state in (events.STARTED, events.VERIFIED):
+            self.state_manager.checkpoint(f"{event.team_id}_{event.state}", {
+                'last_event': event.to_dict(),
+                'running_teams': list(self.running_teams),
+            })
+
+    def _record_team_metrics(self, event: TeamEvent):
+        """Record team wall time against its duration estimate"""
+        started = self.team_started.get(event.team_id)
+        if started is None:
+            return
+        self.metrics.registry.record_team(
+            event.team_id, event.state, time.time() - started,
+            self.teams[event.team_id].get('duration_estimate'), host=self.host
+        )
+
+    def _learn_team_duration(self, event: TeamEvent):
+        """Record the run time of teams that completed in one go
+
+        Teams resumed from sub-step checkpoints only did part of the work,
+        so their run time would drag the learned estimate down.
+        """
+        if event.state == events.STARTED:
+            if not self.state_manager.get_team_steps(event.team_id):
+                self.fresh_starts.add(event.team_id)
+            return
+
+        started = self.team_started.get(event.team_id)
+        if event.team_id in self.fresh_starts and started is not None:
+            self.fresh_starts.discard(event.team_id)
+            self.durations.record(event.team_id, (time.time() - started) / 3600)
+
+    def _estimated_remaining_hours(self) -> float:
+        """Projected hours left, crediting running teams with their elapsed time"""
+        now = time.time()
+        elapsed = {
+            team_id: (now - self.team_started[team_id]) / 3600
+            for team_id in list(self.running_teams) if team_id in self.team_started
+        }
+        return self.scheduler.simulate(elapsed)
+
+    def _format_duration(self, team_id: str) -> str:
+        """Duration shown in the plan: learned estimate next to the configured one"""
+        configured = self.teams[team_id]['duration_estimate']
+        learned = self.durations.estimate(team_id)
+        if learned is None:
+            return f"{configured}h"
+        runs = self.durations.samples(team_id)
+        return (f"{learned:.1f}h learned from {runs} run{'s' if runs != 1 else ''}, "
+                f"configured {configured}h")
+
+    def _display_workflow_plan(self, tasks: List[Dict]):
+        """Display the workflow execution plan"""
+        from rich.tree import Tree
+
+        tree = Tree("[bold cyan]Workflow Execution Plan[/bold cyan]")
+
+        by_team = {task['task_id']: task for task in tasks}
+        for phase, team_ids in self.plan.phases.items():
+            pending = [team_id for team_id in team_ids if team_id in by_team]
+            if not pending:
+                continue
+            phase_branch = tree.add(f"[yellow]Phase {phase}[/yellow]")
 
-                # Parse status and update progress
-                if "content" in status:
-                    content = status["content"]
-                    # Extract progress percentage if available
-                    # This is a simplified version - enhance based on actual status format
+            for team_id in pending:
+                task = by_team[team_id]
+                team_config = self.plan.teams[team_id]
+                deps = ', '.join(task['dependencies']) if task['dependencies'] else 'None'
 
-                    if "complete" in content.lower():
-                        progress.update(task, completed=100)
-                        break
+                task_info = (
+                    f"[green]{team_config['name']}[/green] "
+                    f"({self._format_duration(team_id)}) "
+                    f"- Deps: {deps}"
+                )
+                if self._uses_scripted_steps(team_id, task):
+                    guarded = sum(1 for step in task['step_tasks'] if step.agent_only)
+                    task_info += (f" [dim]| {len(task['step_tasks']) - guarded} scripted, "
+                                  f"{guarded} agent-only sub-steps[/dim]")
+                phase_branch.add(task_info)
 
-                time.sleep(5)  # Check every 5 seconds
+        self.console.print(tree)
+        self.console.print(
+            f"\n[bold]Projected makespan:[/bold] {self.scheduler.simulate():.1f}h with "
+            f"{self.scheduler.max_parallel} parallel teams "
+            f"(critical path {self.scheduler.critical_path_length():.1f}h)"
+        )
 
     def execute_phase(self, phase_number: int) -> Dict[str, Any]:
-        """Execute a specific phase of the workflow"""
+        """Execute a specific phase of the workflow
+
+        Only the phase's teams run, through the same scheduler as the full
+        workflow. Their dependencies in earlier phases must be complete (and
+        still verify); otherwise nothing runs and the phase fails.
+        """
+        from rich.panel import Panel
+
         self.console.print(Panel.fit(
             f"[bold cyan]Executing Phase {phase_number}[/bold cyan]",
             border_style="cyan"
         ))
 
-        # Filter tasks for this phase
-        phase_tasks = [
-            self._create_workflow_tasks()[i]
-            for i, (team_id, config) in enumerate(self.teams.items())
-            if config['phase'] == phase_number and team_id not in self.completed_teams
-        ]
-
-        if not phase_tasks:
+        phase_teams = list(self.plan.phase_teams(phase_number))
+        if not phase_teams:
+            self.console.print(f"[red]No teams in Phase {phase_number}[/red]")
+            return {"status": "failed", "phase": phase_number, "error": "unknown phase"}
+
+        # Make sure earlier phases still hold before building on them
+        earlier = self.plan.teams_before_phase(phase_number)
+        self._reverify_completed_teams([
+            team_id for team_id in self.completed_teams if team_id in earlier
+        ])
+        self._invalidate_changed_teams()
+
+        missing = [team_id for team_id in self.plan.in_order(self.plan.upstream(phase_teams))
+                   if team_id not in phase_teams and team_id not in self.completed_teams]
+        if missing:
+            self.console.print(f"[red]Phase {phase_number} needs these teams to complete first: "
+                               f"{', '.join(missing)}[/red]")
+            return {"status": "failed", "phase": phase_number,
+                    "error": f"incomplete dependencies: {', '.join(missing)}"}
+
+        if all(team_id in self.completed_teams for team_id in phase_teams):
             self.console.print(f"[yellow]No tasks to execute in Phase {phase_number}[/yellow]")
             return {"status": "skipped", "phase": phase_number}
 
-        self.console.print(f"[green]Found {len(phase_tasks)} tasks in Phase {phase_number}[/green]")
-
-        # Execute tasks (they will run in parallel if no dependencies)
-        # Implementation similar to execute_full_workflow but filtered
-
-        return {"status": "complete", "phase": phase_number, "tasks": len(phase_tasks)}
+        result = self.execute_full_workflow(team_ids=phase_teams)
+        return {**result, "phase": phase_number}
 
     def resume_workflow(self) -> Dict[str, Any]:
         """Resume workflow from last checkpoint"""
@@ -405,26 +1055,77 @@ Make the platform easy and delightful to use."""
             self.console.print("[red]No checkpoint found. Starting fresh...[/red]")
             return self.execute_full_workflow()
 
-        self.completed_teams = last_state.get('completed_teams', [])
+        self.completed_teams = list(last_state.get('completed_teams', []))
         self.console.print(f"[green]Resuming after: {', '.join(self.completed_teams)}[/green]")
+        self._reverify_completed_teams()
 
         return self.execute_full_workflow()
 
     def resume_from_team(self, team_id: str) -> Dict[str, Any]:
-        """Resume workflow from a specific team"""
+        """Resume workflow from a specific team
+
+        The team's transitive dependencies are treated as complete; the team
+        itself and everything downstream of it run again.
+        """
+        if team_id not in self.plan:
+            raise ValueError(f"Unknown team: {team_id}")
+
         self.console.print(f"[yellow]Resuming from team: {team_id}[/yellow]")
 
-        # Mark all teams before this one as complete
-        for tid, config in self.teams.items():
-            if tid == team_id:
-                break
-            if tid not in self.completed_teams:
+        upstream = self.plan.upstream([team_id]) - {team_id}
+        rerun = self.plan.downstream([team_id])
+
+        for tid in self.plan.order:
+            if tid in upstream and tid not in self.completed_teams:
                 self.completed_teams.append(tid)
+            elif tid in rerun and tid in self.completed_teams:
+                self.completed_teams.remove(tid)
+                self.state_manager.clear_team_steps(tid)
+
+        self.state_manager.save_state({'completed_teams': list(self.completed_teams)})
 
         return self.execute_full_workflow()
 
+    def _compute_team_fingerprints(self) -> Dict[str, str]:
+        """Current content fingerprint of every team's inputs"""
+        prompts = {team_id: self.plan.task(team_id)['system_prompt'] for team_id in self.plan.order}
+        return compute_fingerprints(self.config, list(self.plan.order), prompts)
+
+    def _invalidate_changed_teams(self, persist: bool = True) -> List[str]:
+        """Drop completed teams whose fingerprint changed, plus their dependents
+
+        Returns the teams that will run again.
+        """
+        self.team_fingerprints = self._compute_team_fingerprints()
+        recorded = self.state_manager.get('team_fingerprints', {})
+
+        changed = changed_teams(self.team_fingerprints, recorded, self.completed_teams)
+        rerun = self.plan.downstream(changed)
+        stale = [
+            team_id for team_id in self.plan.order
+            if team_id in rerun and team_id in self.completed_teams
+        ]
+
+        if not stale:
+            return []
+
+        self.console.print(f"[yellow]Inputs changed for {', '.join(changed)}; "
+                           f"re-running {', '.join(stale)}[/yellow]")
+        self.logger.info("Fingerprint changes: %s -> re-running %s", changed, stale)
+
+        self.completed_teams = [t for t in self.completed_teams if t not in stale]
+
+        if persist:
+            for team_id in stale:
+                self.state_manager.clear_team_steps(team_id)
+            self.state_manager.save_state({'completed_teams': list(self.completed_teams)})
+
+        return stale
+
     def _handle_failure(self):
         """Handle workflow failure with rollback"""
+        from rich.panel import Panel
+
         self.console.print(Panel.fit(
             "[bold red]⚠️  Workflow Failed - Initiating Rollback[/bold red]",
             border_style="red"
@@ -444,10 +1145,11 @@ Make the platform easy and delightful to use."""
         self.console.print(f"[yellow]Rolling back to Phase {phase_number}[/yellow]")
 
         # Remove completed teams from later phases
-        self.completed_teams = [
-            team_id for team_id in self.completed_teams
-            if self.teams[team_id]['phase'] < phase_number
-        ]
+        earlier = self.plan.teams_before_phase(phase_number)
+        self.completed_teams = [team_id for team_id in self.completed_teams if team_id in earlier]
+
+        for team_id in self.plan.teams_from_phase(phase_number):
+            self.state_manager.clear_team_steps(team_id)
 
         self.state_manager.save_state({
             'completed_teams': self.completed_teams,
@@ -455,8 +1157,47 @@ Make the platform easy and delightful to use."""
             'timestamp': datetime.now().isoformat()
         })
 
+    def push_artifacts(self) -> Dict[str, Any]:
+        """Push ``artifact_store.payloads`` to the host from the local store
+
+        Payloads are downloaded into the store on first use and verified by
+        SHA-256; files the host already has with a matching hash are skipped.
+        """
+        from rich.table import Table
+
+        if self.artifact_store is None:
+            self.console.print("[yellow]artifact_store is disabled in the config[/yellow]")
+            return {"status": "skipped"}
+
+        settings = self.config.get('artifact_store', {})
+        payloads = normalize_artifacts(settings.get('payloads'),
+                                       settings.get('remote_dir', self.prefetcher.remote_dir))
+        unpinned = [p['url'] for p in payloads if not p['sha256']]
+        if unpinned:
+            style = "red" if self.artifact_store.require_sha256 else "yellow"
+            self.console.print(f"[{style}]Payloads without a pinned sha256 in artifact_store.payloads:[/{style}]\n" +
+                               "\n".join(f"  {url}" for url in unpinned))
+        if unpinned and self.artifact_store.require_sha256:
+            return {"status": "failed", "error": f"{len(unpinned)} payload(s) without a pinned sha256"}
+        items = [(self.artifact_store.fetch(p['url'], p['sha256']), p['dest']) for p in payloads]
+        outcome = self.artifact_store.push(self.ssh_pool, items)
+
+        table = Table(title=f"Artifacts on {self.ssh_pool.default_host}")
+        table.add_column("Artifact", style="cyan")
+        table.add_column("Host path")
+        table.add_column("Result")
+        for payload in payloads:
+            result = outcome[payload['dest']]
+            table.add_row(payload['url'].rsplit('/', 1)[-1], payload['dest'],
+                          f"[green]{result}[/green]" if result == 'uploaded' else f"[dim]{result}[/dim]")
+        self.console.print(table)
+
+        return {"status": "complete", "pushed": outcome, "store": self.artifact_store.stats()}
+
     def nuclear_reset(self):
         """Perform full server rebuild (nuclear option)"""
+        from rich.panel import Panel
+
         self.console.print(Panel.fit(
             "[bold red]☢️  NUCLEAR RESET - Full Server Rebuild[/bold red]",
             border_style="red"
@@ -467,14 +1208,19 @@ Make the platform easy and delightful to use."""
 1. Reset the Hetzner server (via Hetzner console)
 2. Reinstall Ubuntu 24.04 LTS
 3. Clone the repository
-4. Run install-all.sh
-5. Restart workflow from Phase 1
+4. Push install payloads from the local artifact store (if enabled)
+5. Run install-all.sh
+6. Restart workflow from Phase 1
 
 Please perform steps 1-2 manually in Hetzner console, then press Enter to continue...[/yellow]
         """)
 
         input()
 
+        # A fresh host has none of the payloads; install-all.sh uses these copies
+        if self.artifact_store is not None and self.push_artifacts()['status'] != 'complete':
+            self.console.print("[yellow]Payloads not pushed; install-all.sh will download them[/yellow]")
+
         # Clear all state
         self.completed_teams = []
         self.failed_teams = []
@@ -484,11 +1230,14 @@ Please perform steps 1-2 manually in Hetzner console, then press Enter to contin
 
     def get_status(self) -> Dict[str, Any]:
         """Get current workflow status"""
+        from rich.table import Table
+
         total_teams = len(self.teams)
         completed = len(self.completed_teams)
         failed = len(self.failed_teams)
         running = len(self.running_teams)
-        pending = total_teams - completed - failed - running
+        queued = len(self.queued_teams)
+        pending = total_teams - completed - failed - running - queued
 
         progress_pct = (completed / total_teams * 100) if total_teams > 0 else 0
 
@@ -499,22 +1248,207 @@ Please perform steps 1-2 manually in Hetzner console, then press Enter to contin
         table.add_row("Total Teams", str(total_teams))
         table.add_row("Completed", str(completed))
         table.add_row("Running", str(running))
+        table.add_row("Queued", str(queued))
         table.add_row("Failed", str(failed))
         table.add_row("Pending", str(pending))
         table.add_row("Progress", f"{progress_pct:.1f}%")
 
+        cache_stats = self.verifier.cache_stats()
+        if cache_stats:
+            table.add_row("Verification Cache",
+                          f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                          f"({cache_stats['entries']} entries)")
+
+        log_stats = get_log_pipeline(self.config).stats()
+        if log_stats['dropped']:
+            table.add_row("Dropped Log Records", str(log_stats['dropped']))
+
         self.console.print(table)
 
         return {
             "total_teams": total_teams,
             "completed": completed,
             "running": running,
+            "queued": queued,
             "failed": failed,
             "pending": pending,
             "progress_percentage": progress_pct
         }
 
 
+def show_status(config: Dict) -> Dict[str, Any]:
+    """Print workflow progress read from the state files
+
+    Builds no orchestrator: nothing is connected, created or written, so it
+    is safe to run next to an orchestrator that is executing the workflow.
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    status = read_status(config)
+    total_teams = status['total']
+    completed = len(status['completed'])
+    failed = len(status['failed'])
+    running = len(status['running'])
+    pending = total_teams - completed - failed - running
+
+    progress_pct = (completed / total_teams * 100) if total_teams > 0 else 0
+    last_event = status['last_event']
+
+    table = Table(title="Workflow Status")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+
+    table.add_row("Total Teams", str(total_teams))
+    table.add_row("Completed", str(completed))
+    table.add_row("Running", ', '.join(status['running']) or '0')
+    table.add_row("Failed", ', '.join(status['failed']) or '0')
+    table.add_row("Pending", str(pending))
+    table.add_row("Progress", f"{progress_pct:.1f}%")
+    if last_event:
+        table.add_row("Last Event", f"{last_event['team_id']} {last_event['state']}")
+    table.add_row("Last Update", status['last_update'] or 'never')
+
+    Console().print(table)
+
+    return {
+        "total_teams": total_teams,
+        "completed": completed,
+        "running": running,
+        "failed": failed,
+        "pending": pending,
+        "progress_percentage": progress_pct
+    }
+
+
+def show_fleet_status(config: Dict, hosts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Print a one-line-per-host summary read from each host's state file"""
+    from rich.console import Console
+    from rich.table import Table
+    from utils.fleet import fleet_status
+
+    rows = [row for row in fleet_status(config) if not hosts or row['host'] in hosts]
+
+    table = Table(title="Fleet Status")
+    table.add_column("Host", style="cyan")
+    table.add_column("Address")
+    table.add_column("Progress", justify="right")
+    table.add_column("Failed", style="red")
+    table.add_column("Running")
+    table.add_column("Last Event")
+    table.add_column("Last Update")
+
+    for row in rows:
+        last_event = row['last_event']
+        table.add_row(
+            row['host'], row['address'],
+            f"{row['completed']}/{row['total']}",
+            ', '.join(row['failed']) or '-',
+            ', '.join(row['running']) or '-',
+            f"{last_event['team_id']} {last_event['state']}" if last_event else '-',
+            row['last_update'] or 'never',
+        )
+
+    done = sum(1 for row in rows if row['completed'] == row['total'])
+    Console().print(table)
+    Console().print(f"[dim]{done}/{len(rows)} hosts complete[/dim]")
+    return rows
+
+
+def run_fleet(config: Dict, hosts: Optional[List[str]] = None, dry_run: bool = False,
+              resume: bool = False, use_async: Optional[bool] = None) -> Dict[str, Any]:
+    """Run the workflow on every inventory host under the fleet limits"""
+    from rich.console import Console
+    from rich.table import Table
+    from utils.fleet import FleetScheduler
+
+    console = Console()
+    fleet = FleetScheduler(
+        config,
+        lambda host_config, team_slots: HypervisorOrchestrator(
+            config=host_config, team_slots=team_slots, quiet=True),
+        hosts=hosts,
+    )
+
+    critical_path = DAGScheduler(config['teams']).critical_path_length()
+    fleet_config = config.get('fleet', {})
+    console.print(f"[bold cyan]Fleet: {len(fleet.inventory)} hosts, "
+                  f"strategy {fleet_config.get('strategy', 'parallel')}[/bold cyan]")
+    console.print(f"[dim]Max parallel hosts: {fleet.max_parallel_hosts} | "
+                  f"Max parallel teams: {fleet_config.get('max_parallel_teams') or 'unlimited'} | "
+                  f"Critical path per host: {critical_path:.1f}h[/dim]")
+    for number, wave in enumerate(fleet.waves, 1):
+        console.print(f"  Wave {number}: {', '.join(wave)}")
+
+    if dry_run:
+        console.print(f"[dim]Estimated makespan: {len(fleet.waves) * critical_path:.1f}h "
+                      f"(waves x critical path, before team cap contention)[/dim]")
+        return {"status": "dry_run_complete", "waves": fleet.waves}
+
+    def on_host(host: str, status: str):
+        console.print(f"[cyan]{host}[/cyan] {status}")
+
+    def action(orchestrator: HypervisorOrchestrator) -> Dict[str, Any]:
+        if resume:
+            return orchestrator.resume_workflow()
+        return orchestrator.execute_full_workflow(use_async=use_async)
+
+    # Process-wide metrics and trace cover every host
+    metrics = MetricsReporter(config)
+    metrics.start()
+    tracing = get_tracer().start(config)
+    try:
+        result = fleet.run(action, on_host=on_host)
+    finally:
+        metrics.stop(hosts=dict(fleet.status))
+        if tracing:
+            get_tracer().stop()
+
+    table = Table(title="Fleet Result")
+    table.add_column("Host", style="cyan")
+    table.add_column("Status")
+    table.add_column("Duration", justify="right")
+    table.add_column("Completed", justify="right")
+    table.add_column("Failed", style="red")
+    for host, status in result['hosts'].items():
+        host_result = result['results'].get(host, {})
+        table.add_row(
+            host, status,
+            f"{host_result['duration_hours']:.2f}h" if 'duration_hours' in host_result else '-',
+            str(len(host_result.get('completed_teams', []))),
+            ', '.join(host_result.get('failed_teams', [])) or host_result.get('error', '-'),
+        )
+    console.print(table)
+    console.print(f"Fleet duration: {result['duration_hours']:.2f} hours")
+    return result
+
+
+def push_fleet_artifacts(config: Dict, hosts: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Push the install payloads to every inventory host
+
+    Each payload is downloaded into the shared store at most once, however
+    many hosts need it.
+    """
+    from rich.console import Console
+    from utils.fleet import FleetScheduler
+
+    console = Console()
+    fleet = FleetScheduler(
+        config,
+        lambda host_config, team_slots: HypervisorOrchestrator(config=host_config, quiet=True),
+        hosts=hosts,
+    )
+
+    def on_host(host: str, status: str):
+        result = fleet.results.get(host, {})
+        pushed = list(result.get('pushed', {}).values())
+        detail = (f" ({pushed.count('uploaded')} uploaded, {pushed.count('cached')} already present)"
+                  if pushed else f" {result.get('error', '')}")
+        console.print(f"[cyan]{host}[/cyan] {status}{detail if status != 'running' else ''}")
+
+    return fleet.run(lambda orchestrator: orchestrator.push_artifacts(), on_host=on_host)
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Hetzner Hypervisor Setup Orchestrator")
@@ -526,13 +1460,56 @@ def main():
     parser.add_argument("--status", action="store_true", help="Show current status")
     parser.add_argument("--rollback", type=int, help="Rollback to specific phase")
     parser.add_argument("--nuclear-reset", action="store_true", help="Full server rebuild")
+    parser.add_argument("--verify", action="store_true", help="Run hypervisor verification checks")
+    parser.add_argument("--async", dest="use_async", action="store_true", default=None,
+                        help="Run team agents as asyncio coroutines")
+    parser.add_argument("--host", help="Inventory host(s) to act on, comma-separated")
+    parser.add_argument("--push-artifacts", action="store_true",
+                        help="Push install payloads from the local artifact store")
 
     args = parser.parse_args()
 
-    orchestrator = HypervisorOrchestrator(args.config)
+    config = load_config(args.config)
+
+    from utils.fleet import load_inventory, host_config
+
+    inventory = {entry['name']: entry for entry in load_inventory(config)}
+    hosts = args.host.split(',') if args.host else None
+    if hosts and not inventory:
+        parser.error("--host needs a hosts inventory in the config")
+    unknown = [host for host in hosts or [] if host not in inventory]
+    if unknown:
+        parser.error(f"Unknown hosts: {', '.join(unknown)}")
+
+    if inventory and not (hosts and len(hosts) == 1):
+        if args.status:
+            show_fleet_status(config, hosts)
+        elif args.push_artifacts:
+            result = push_fleet_artifacts(config, hosts)
+            sys.exit(0 if result['status'] == 'complete' else 1)
+        elif args.resume or not (args.verify or args.nuclear_reset or args.rollback
+                                 or args.resume_from or args.phase):
+            result = run_fleet(config, hosts, dry_run=args.dry_run, resume=args.resume,
+                               use_async=args.use_async)
+            sys.exit(0 if result['status'] in ('complete', 'dry_run_complete') else 1)
+        else:
+            parser.error("with a hosts inventory, this command needs a single --host")
+        return
 
+    if hosts:
+        config = host_config(config, inventory[hosts[0]])
     if args.status:
-        orchestrator.get_status()
+        show_status(config)
+        return
+
+    orchestrator = HypervisorOrchestrator(config=config)
+
+    if args.push_artifacts:
+        result = orchestrator.push_artifacts()
+        sys.exit(0 if result['status'] == 'complete' else 1)
+    elif args.verify:
+        report = orchestrator.verify_host()
+        sys.exit(0 if report.passed else 1)
     elif args.nuclear_reset:
         orchestrator.nuclear_reset()
     elif args.rollback:
@@ -542,9 +1519,10 @@ def main():
     elif args.resume_from:
         orchestrator.resume_from_team(args.resume_from)
     elif args.phase:
-        orchestrator.execute_phase(args.phase)
+        result = orchestrator.execute_phase(args.phase)
+        sys.exit(0 if result['status'] in ('complete', 'skipped') else 1)
     else:
-        orchestrator.execute_full_workflow(dry_run=args.dry_run)
+        orchestrator.execute_full_workflow(dry_run=args.dry_run, use_async=args.use_async)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+"""
+Test configuration - Makes the agents modules importable as in orchestrator.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
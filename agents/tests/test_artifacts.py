@@ -0,0 +1,142 @@
+"""
+ArtifactStore tests - file:// fetches, eviction and pushes over the local transport
+"""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from tools.ssh import SSHConnectionPool
+from utils.artifacts import ArtifactStore, ChecksumError, PUSH_CACHED, PUSH_UPLOADED
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def upstream(tmp_path: Path):
+    """Write a file to serve; returns its file:// URL"""
+    directory = tmp_path / 'upstream'
+    directory.mkdir()
+
+    def publish(name: str, data: bytes) -> str:
+        path = directory / name
+        path.write_bytes(data)
+        return path.as_uri()
+    return publish
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ArtifactStore:
+    return ArtifactStore(tmp_path / 'store')
+
+
+@pytest.fixture
+def pool() -> SSHConnectionPool:
+    return SSHConnectionPool({'ssh': {'host': 'localhost', 'transport': 'local', 'retry_delay': 0}})
+
+
+def test_fetch_downloads_once_then_hits(store, upstream):
+    data = b"kernel" * 1000
+    url = upstream('vmlinux.bin', data)
+
+    digest = store.fetch(url, sha256(data))
+    assert digest == sha256(data)
+    assert store.blob_path(digest).read_bytes() == data
+
+    assert store.fetch(url, sha256(data)) == digest
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_fetch_rejects_sha_mismatch_and_keeps_nothing(store, upstream):
+    url = upstream('vmlinux.bin', b"tampered")
+
+    with pytest.raises(ChecksumError):
+        store.fetch(url, '0' * 64)
+
+    assert store.stats()['blobs'] == 0
+    assert not any((store.root / 'tmp').iterdir())
+
+
+def test_require_sha256_refuses_unpinned_urls(tmp_path, upstream):
+    store = ArtifactStore(tmp_path / 'store', require_sha256=True)
+
+    with pytest.raises(ChecksumError):
+        store.fetch(upstream('flintlockd_amd64', b"binary"))
+    assert store.misses == 0
+
+
+def test_offline_store_fails_on_miss(tmp_path, upstream):
+    store = ArtifactStore(tmp_path / 'store', offline=True)
+
+    with pytest.raises(FileNotFoundError):
+        store.fetch(upstream('rootfs.ext4', b"rootfs"))
+
+
+def test_index_survives_reopening(tmp_path, upstream):
+    data = b"firecracker"
+    url = upstream('firecracker.tgz', data)
+    ArtifactStore(tmp_path / 'store').fetch(url, sha256(data))
+
+    reopened = ArtifactStore(tmp_path / 'store', offline=True)
+    assert reopened.fetch(url) == sha256(data)
+
+
+def test_evicts_least_recently_used_blobs(tmp_path, upstream):
+    store = ArtifactStore(tmp_path / 'store', max_bytes=2500)
+    blobs = [bytes([i]) * 1000 for i in range(3)]
+    urls = [upstream(f'blob{i}', data) for i, data in enumerate(blobs)]
+
+    store.fetch(urls[0], sha256(blobs[0]))
+    store.fetch(urls[1], sha256(blobs[1]))
+    store.fetch(urls[0], sha256(blobs[0]))  # now more recent than blob1
+    store.fetch(urls[2], sha256(blobs[2]))
+
+    assert store.has(sha256(blobs[0])) and store.has(sha256(blobs[2]))
+    assert not store.has(sha256(blobs[1]))
+    assert not store.blob_path(sha256(blobs[1])).exists()
+    assert store.evictions == 1
+
+
+def test_verify_removes_corrupted_blob(store, upstream):
+    data = b"cloud-hypervisor"
+    digest = store.fetch(upstream('cloud-hypervisor', data), sha256(data))
+    store.blob_path(digest).write_bytes(b"bit rot")
+
+    assert not store.verify(digest)
+    assert not store.has(digest)
+
+
+def test_push_uploads_then_skips_files_in_place(store, upstream, pool, tmp_path):
+    data = b"flintlock" * 500
+    digest = store.fetch(upstream('flintlockd_amd64', data), sha256(data))
+    dest = tmp_path / 'host' / 'artifacts' / 'flintlockd_amd64'
+
+    assert store.push(pool, [(digest, str(dest))]) == {str(dest): PUSH_UPLOADED}
+    assert dest.read_bytes() == data
+    assert not Path(str(dest) + '.part').exists()
+
+    assert store.push(pool, [(digest, str(dest))]) == {str(dest): PUSH_CACHED}
+
+    dest.write_bytes(b"stale")
+    assert store.push(pool, [(digest, str(dest))]) == {str(dest): PUSH_UPLOADED}
+    assert dest.read_bytes() == data
+
+
+def test_push_rejects_corrupted_upload(store, upstream, pool, tmp_path, monkeypatch):
+    data = b"vmlinux" * 500
+    digest = store.fetch(upstream('vmlinux.bin', data), sha256(data))
+    dest = tmp_path / 'host' / 'vmlinux.bin'
+
+    def corrupting_put(local_path, remote_path, host=None, progress=None):
+        Path(remote_path).write_bytes(b"truncated")
+    monkeypatch.setattr(pool, 'put_file', corrupting_put)
+
+    with pytest.raises(ChecksumError):
+        store.push(pool, [(digest, str(dest))])
+
+    assert not dest.exists()
+    assert not Path(str(dest) + '.part').exists()
+    assert store.has(digest)  # our copy is still good
@@ -0,0 +1,100 @@
+"""
+ContextCompactor tests - collapsing checkpointed turns across several prompts
+"""
+
+from utils.context import ContextCompactor, CHECKPOINT_TOOL, COLLAPSED_HEADER
+
+
+def prompt(text):
+    return {'role': 'user', 'content': [{'text': text}]}
+
+
+def call(tool_use_id, name, **tool_input):
+    return {'role': 'assistant',
+            'content': [{'toolUse': {'toolUseId': tool_use_id, 'name': name, 'input': tool_input}}]}
+
+
+def result(tool_use_id, text="ok", status='success'):
+    return {'role': 'user',
+            'content': [{'toolResult': {'toolUseId': tool_use_id, 'status': status,
+                                        'content': [{'text': text}]}}]}
+
+
+def reply(text):
+    return {'role': 'assistant', 'content': [{'text': text}]}
+
+
+def texts(message):
+    return [block['text'] for block in message['content'] if 'text' in block]
+
+
+def test_checkpoint_collapses_turns_of_a_single_task():
+    messages = [
+        prompt("Install the hypervisor"),
+        call('1', 'run_command', command='apt-get install -y qemu-kvm'),
+        result('1'),
+        call('2', CHECKPOINT_TOOL, step='Task 1', summary='KVM installed'),
+        result('2'),
+        reply("Task 1 done"),
+    ]
+
+    removed = ContextCompactor().compact(messages)['removed']
+
+    assert removed == 2
+    assert messages[0]['content'][0]['text'] == "Install the hypervisor"
+    assert texts(messages[0])[-1].startswith(COLLAPSED_HEADER)
+    assert messages[1]['content'][0]['toolUse']['name'] == CHECKPOINT_TOOL
+
+
+def test_later_prompt_survives_a_checkpoint_made_after_it():
+    messages = [
+        prompt("Repair sub-step 'Task 1'"),
+        call('1', 'run_command', command='systemctl restart ssh'),
+        result('1'),
+        reply("Task 1 repaired"),
+        prompt("Repair sub-step 'Task 2'"),
+        call('2', 'run_command', command='ufw --force enable'),
+        result('2'),
+        call('3', CHECKPOINT_TOOL, step='Task 2', summary='Firewall enabled'),
+        result('3'),
+    ]
+
+    ContextCompactor().compact(messages)
+
+    # The current instructions are the first message; the earlier prompt went with its turns
+    assert texts(messages[0])[0] == "Repair sub-step 'Task 2'"
+    assert texts(messages[0])[-1].startswith(COLLAPSED_HEADER)
+    assert not any("Task 1" in text for message in messages for text in texts(message))
+    assert [m['role'] for m in messages] == ['user', 'assistant', 'user']
+
+
+def test_prompt_after_the_checkpoint_is_kept_in_place():
+    messages = [
+        prompt("Repair sub-step 'Task 1'"),
+        call('1', 'run_command', command='id'),
+        result('1'),
+        call('2', CHECKPOINT_TOOL, step='Task 1', summary='fixed'),
+        result('2'),
+        reply("done"),
+        prompt("Repair sub-step 'Task 2'"),
+        call('3', 'run_command', command='id -u'),
+    ]
+
+    ContextCompactor().compact(messages)
+
+    assert texts(messages[0])[0] == "Repair sub-step 'Task 1'"
+    assert prompt("Repair sub-step 'Task 2'") in messages
+
+
+def test_aggressive_compaction_keeps_the_latest_prompt():
+    messages = [prompt("Repair sub-step 'Task 1'")]
+    for index in range(10):
+        messages += [call(str(index), 'run_command', command=f'step {index}'), result(str(index))]
+    messages += [reply("Task 1 repaired"), prompt("Repair sub-step 'Task 2'")]
+    for index in range(10, 14):
+        messages += [call(str(index), 'run_command', command=f'step {index}'), result(str(index))]
+
+    ContextCompactor({'keep_recent_messages': 4}).compact(messages, aggressive=True)
+
+    assert texts(messages[0])[0] == "Repair sub-step 'Task 2'"
+    assert messages[1]['role'] == 'assistant'
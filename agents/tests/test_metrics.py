@@ -0,0 +1,37 @@
+"""
+MetricsReporter tests - the metrics file is kept current during a run
+"""
+
+import json
+import time
+
+from utils.metrics import MetricsRegistry, MetricsReporter
+
+
+def test_metrics_file_is_flushed_before_stop(tmp_path):
+    registry = MetricsRegistry()
+    config = {
+        'project': {'base_path': str(tmp_path)},
+        'monitoring': {'enable_metrics': True, 'flush_interval_seconds': 0.05},
+    }
+    reporter = MetricsReporter(config, registry)
+    metrics_file = tmp_path / 'logs' / 'metrics.json'
+
+    reporter.start()
+    try:
+        registry.inc('ssh_commands_total', host='hetzner1', status='ok')
+        deadline = time.monotonic() + 5
+        while not metrics_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # What a crash right now would leave behind
+        partial = json.loads(metrics_file.read_text())
+        assert partial['partial'] is True
+        assert partial['counters']
+    finally:
+        reporter.stop(completed_teams=['alpha'])
+
+    final = json.loads(metrics_file.read_text())
+    assert 'partial' not in final
+    assert final['completed_teams'] == ['alpha']
+    assert not list(metrics_file.parent.glob('*.tmp'))
@@ -0,0 +1,127 @@
+"""
+Prefetcher tests - file:// sources downloaded through the local transport
+"""
+
+import hashlib
+import time
+from pathlib import Path
+
+import pytest
+
+from tools.ssh import SSHConnectionPool
+from utils.artifacts import ArtifactStore
+from utils.prefetch import Prefetcher, CACHED, DOWNLOADED, FAILED, parse_rate
+
+
+PAYLOAD = b"firecracker " * 4096
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / 'upstream' / 'firecracker.tgz'
+    path.parent.mkdir()
+    path.write_bytes(PAYLOAD)
+    return path
+
+
+@pytest.fixture
+def remote_dir(tmp_path: Path) -> Path:
+    return tmp_path / 'host' / 'artifacts'
+
+
+def make_prefetcher(remote_dir: Path, store=None, **settings) -> Prefetcher:
+    config = {
+        'ssh': {'host': 'localhost', 'transport': 'local', 'retry_delay': 0},
+        'prefetch': {'enabled': True, 'remote_dir': str(remote_dir), 'timeout': 30, **settings},
+    }
+    return Prefetcher(SSHConnectionPool(config), config, store=store)
+
+
+def prefetch(prefetcher: Prefetcher, artifact: dict):
+    """Plan one team's artifact and fetch it on this thread"""
+    prefetcher.plan({'alpha': {'artifacts': [artifact]}}, ['alpha'])
+    failed = prefetcher.ensure('alpha', timeout=30)
+    return prefetcher.team_jobs['alpha'][0], failed
+
+
+def test_downloads_then_reuses_verified_copy(source, remote_dir):
+    artifact = {'url': source.as_uri(), 'sha256': hashlib.sha256(PAYLOAD).hexdigest()}
+
+    job, failed = prefetch(make_prefetcher(remote_dir), artifact)
+    assert job.status == DOWNLOADED and not failed
+    assert (remote_dir / 'firecracker.tgz').read_bytes() == PAYLOAD
+    assert not (remote_dir / 'firecracker.tgz.part').exists()
+
+    job, failed = prefetch(make_prefetcher(remote_dir), artifact)
+    assert job.status == CACHED and not failed
+
+
+def test_sha_mismatch_fails_and_removes_part_file(source, remote_dir):
+    job, failed = prefetch(make_prefetcher(remote_dir),
+                           {'url': source.as_uri(), 'sha256': '0' * 64})
+
+    assert job.status == FAILED and failed == [job]
+    assert 'checksum' in job.error
+    assert not (remote_dir / 'firecracker.tgz').exists()
+    assert not (remote_dir / 'firecracker.tgz.part').exists()
+
+
+def test_corrupt_existing_copy_is_replaced(source, remote_dir):
+    remote_dir.mkdir(parents=True)
+    (remote_dir / 'firecracker.tgz').write_bytes(b"truncated")
+
+    job, _ = prefetch(make_prefetcher(remote_dir),
+                      {'url': source.as_uri(), 'sha256': hashlib.sha256(PAYLOAD).hexdigest()})
+
+    assert job.status == DOWNLOADED
+    assert (remote_dir / 'firecracker.tgz').read_bytes() == PAYLOAD
+
+
+def test_missing_source_fails_without_leaving_part_file(tmp_path, remote_dir):
+    missing = tmp_path / 'upstream' / 'missing.tgz'
+
+    job, failed = prefetch(make_prefetcher(remote_dir), {'url': missing.as_uri()})
+
+    assert job.status == FAILED and failed == [job]
+    assert not (remote_dir / 'missing.tgz.part').exists()
+
+
+def test_background_workers_fetch_ahead_of_team(source, remote_dir):
+    prefetcher = make_prefetcher(remote_dir)
+    prefetcher.start({'alpha': {'artifacts': [source.as_uri()]}}, ['alpha'])
+    try:
+        assert prefetcher.ensure('alpha', timeout=30) == []
+    finally:
+        prefetcher.stop()
+
+    assert prefetcher.stats() == {DOWNLOADED: 1}
+    assert (remote_dir / 'firecracker.tgz').read_bytes() == PAYLOAD
+
+
+def test_parse_rate_follows_curl_suffixes():
+    assert parse_rate("20M") == 20 * 1024 ** 2
+    assert parse_rate("512k") == 512 * 1024
+    assert parse_rate(1000) == 1000
+    assert parse_rate(None) is None
+
+
+def test_bandwidth_limit_applies_through_the_store(source, remote_dir, tmp_path):
+    store = ArtifactStore(tmp_path / 'store')
+    prefetcher = make_prefetcher(remote_dir, store=store, bandwidth_limit="256K")
+
+    start = time.monotonic()
+    job, failed = prefetch(prefetcher, {'url': source.as_uri()})
+
+    # 48 KiB paced to 256 KiB/s, once into the store and once onto the host
+    assert job.status == DOWNLOADED and not failed
+    assert time.monotonic() - start >= 2 * len(PAYLOAD) / (256 * 1024) * 0.9
+    assert (remote_dir / 'firecracker.tgz').read_bytes() == PAYLOAD
+
+
+def test_unpinned_artifact_goes_through_default_store(source, remote_dir, tmp_path):
+    prefetcher = make_prefetcher(remote_dir, store=ArtifactStore(tmp_path / 'store'))
+
+    job, failed = prefetch(prefetcher, {'url': source.as_uri()})
+
+    assert job.status == DOWNLOADED and not failed
+    assert (remote_dir / 'firecracker.tgz').read_bytes() == PAYLOAD
@@ -0,0 +1,39 @@
+"""
+SSH pool tests - retries when a transport is closed under a caller
+"""
+
+import pytest
+
+from tools.ssh import ParamikoTransport, SSHConnectionError, SSHConnectionPool, register_transport
+
+
+class DroppedTransport(ParamikoTransport):
+    """Connects, but another thread closes it before the command is sent"""
+
+    connects = 0
+
+    def connect(self):
+        DroppedTransport.connects += 1
+
+    def is_active(self) -> bool:
+        return True
+
+
+def test_closed_paramiko_transport_raises_a_retryable_error():
+    with pytest.raises(SSHConnectionError):
+        ParamikoTransport('hetzner1', {}).exec_command('true')
+
+
+def test_pool_reconnects_when_the_client_is_gone():
+    register_transport('dropped', DroppedTransport)
+    DroppedTransport.connects = 0
+    pool = SSHConnectionPool({'ssh': {'host': 'hetzner1', 'transport': 'dropped',
+                                      'retry_attempts': 3, 'retry_delay': 0}})
+
+    with pytest.raises(SSHConnectionError, match="after 3 attempts"):
+        pool.run('true')
+    with pytest.raises(SSHConnectionError, match="after 3 attempts"):
+        pool.put_file(__file__, '/tmp/never-written')
+
+    assert DroppedTransport.connects == 6
+    assert pool.stats['retries'] == 4
@@ -0,0 +1,40 @@
+"""
+VerificationRunner tests - the result cache against the local transport
+"""
+
+from pathlib import Path
+
+import pytest
+
+from tools.ssh import SSHConnectionPool
+from tools.verification import VerificationRunner, VerificationCheck, PASS, FAIL
+from utils.cache import DiskCache
+
+
+@pytest.fixture
+def runner(tmp_path: Path) -> VerificationRunner:
+    config = {
+        'ssh': {'host': 'localhost', 'transport': 'local', 'retry_delay': 0},
+        'project': {'base_path': str(tmp_path)},
+    }
+    return VerificationRunner(SSHConnectionPool(config), config,
+                              cache=DiskCache(tmp_path / 'cache', 'verification'))
+
+
+def test_live_checks_ignore_cached_passes(runner, tmp_path):
+    pidfile = tmp_path / 'flintlockd.pid'
+    pidfile.touch()
+    check = VerificationCheck('flintlock_running', f"test -e {pidfile}")
+
+    assert runner.run([check], step='flintlock').results[0].status == PASS
+
+    # The service went down: the gate and --verify must see it
+    pidfile.unlink()
+    result = runner.run([check], step='flintlock').results[0]
+    assert result.status == FAIL and not result.cached
+
+    # Re-verifying completed teams may still trust the earlier pass
+    pidfile.touch()
+    runner.run([check], step='flintlock')
+    pidfile.unlink()
+    assert runner.run([check], step='flintlock', use_cache=True).results[0].cached
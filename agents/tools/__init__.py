@@ -8,7 +8,52 @@ These tools enable agents to interact with:
 - Team coordination and signaling
 """
 
-# Tools can be implemented here or imported from separate modules
-# For now, this serves as a placeholder for future tool implementations
+from .ssh import (
+    CommandResult,
+    SSHConnectionError,
+    SSHConnectionPool,
+    OutputBuffer,
+    OutputStream,
+    Transport,
+    ParamikoTransport,
+    LocalTransport,
+    register_transport,
+    get_ssh_pool,
+    create_ssh_tools,
+)
+from .batch import BatchResult, run_batch
+from .steps import StepExecutor, StepOutcome
+from .verification import (
+    VerificationCheck,
+    VerificationReport,
+    VerificationRunner,
+    register_check,
+    register_checks,
+    get_checks,
+)
+from .progress import create_progress_tools
 
-__all__ = []
+__all__ = [
+    'CommandResult',
+    'SSHConnectionError',
+    'SSHConnectionPool',
+    'OutputBuffer',
+    'OutputStream',
+    'Transport',
+    'ParamikoTransport',
+    'LocalTransport',
+    'register_transport',
+    'get_ssh_pool',
+    'create_ssh_tools',
+    'BatchResult',
+    'run_batch',
+    'StepExecutor',
+    'StepOutcome',
+    'VerificationCheck',
+    'VerificationReport',
+    'VerificationRunner',
+    'register_check',
+    'register_checks',
+    'get_checks',
+    'create_progress_tools',
+]
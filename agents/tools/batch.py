@@ -0,0 +1,136 @@
+"""
+Batch Tools - Run many short commands in a single remote round trip
+
+Probe-heavy playbook steps (``lsmod``, ``systemctl is-active``, version
+checks) are wrapped into one generated shell script. Each command runs in
+its own subshell with captured output, and the script reports per-command
+exit code, stdout, stderr and timing in a framed, base64-encoded format
+that is parsed back into structured results.
+"""
+
+import base64
+import uuid
+from typing import Dict, Any, Optional, List
+
+from .ssh import CommandResult, SSHConnectionPool
+
+
+class BatchResult:
+    """Structured outcome of a command batch"""
+
+    def __init__(self, results: List[CommandResult], skipped: List[str],
+                 duration: float = 0.0, host: str = ""):
+        self.results = results
+        self.skipped = skipped
+        self.duration = duration
+        self.host = host
+
+    @property
+    def ok(self) -> bool:
+        """True if every command ran and succeeded"""
+        return not self.skipped and all(r.ok for r in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the batch for agents and logs"""
+        return {
+            'host': self.host,
+            'ok': self.ok,
+            'duration': round(self.duration, 3),
+            'results': [r.to_dict() for r in self.results],
+            'skipped': self.skipped,
+        }
+
+
+def _encode(text: str) -> str:
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+
+def _decode(text: str) -> str:
+    return base64.b64decode(text).decode('utf-8', errors='replace') if text else ""
+
+
+def build_batch_script(commands: List[str], marker: str,
+                       stop_on_failure: bool = False, cwd: Optional[str] = None) -> str:
+    """Generate a bash script that runs ``commands`` and frames their results"""
+    lines = [
+        '__bd=$(mktemp -d)',
+        "trap 'rm -rf \"$__bd\"' EXIT",
+    ]
+    if cwd:
+        lines.append(f'cd "$(echo {_encode(cwd)} | base64 -d)" 2>/dev/null || true')
+
+    for index, command in enumerate(commands):
+        guard = 'if [ -z "$__stop" ]; then' if stop_on_failure else 'if true; then'
+        lines.extend([
+            guard,
+            '__s=$(date +%s%N)',
+            f'( eval "$(echo {_encode(command)} | base64 -d)" ) '
+            f'>"$__bd/o" 2>"$__bd/e" </dev/null',
+            '__rc=$?',
+            '__e=$(date +%s%N)',
+            f"printf '%s|%d|%d|%s|%s|%s|%s\\n' {marker} {index} $__rc $__s $__e "
+            '"$(base64 -w0 "$__bd/o")" "$(base64 -w0 "$__bd/e")"',
+        ])
+        if stop_on_failure:
+            lines.append('[ $__rc -ne 0 ] && __stop=1')
+        lines.append('fi')
+
+    return '\n'.join(lines) + '\n'
+
+
+def parse_batch_output(output: str, marker: str, commands: List[str],
+                       host: str = "") -> Dict[int, CommandResult]:
+    """Parse framed result lines back into per-command results"""
+    results: Dict[int, CommandResult] = {}
+
+    for line in output.splitlines():
+        if not line.startswith(marker + '|'):
+            continue
+
+        _, index, exit_code, start_ns, end_ns, out, err = line.split('|', 6)
+        index = int(index)
+
+        try:
+            duration = (int(end_ns) - int(start_ns)) / 1e9
+        except ValueError:
+            duration = 0.0
+
+        results[index] = CommandResult(
+            command=commands[index],
+            exit_code=int(exit_code),
+            stdout=_decode(out),
+            stderr=_decode(err),
+            duration=duration,
+            host=host,
+        )
+
+    return results
+
+
+def run_batch(pool: SSHConnectionPool, commands: List[str], host: Optional[str] = None,
+              stop_on_failure: bool = False, timeout: Optional[float] = None,
+              cwd: Optional[str] = None) -> BatchResult:
+    """Run a list of commands on one host in a single remote session
+
+    With ``stop_on_failure`` the batch halts at the first non-zero exit and
+    the remaining commands are reported as skipped; otherwise every command
+    runs regardless of earlier failures. Commands start in ``cwd`` when that
+    directory exists.
+    """
+    marker = f"__BATCH_{uuid.uuid4().hex}"
+    script = build_batch_script(commands, marker, stop_on_failure, cwd)
+
+    raw = pool.run(f"bash -c \"$(echo {_encode(script)} | base64 -d)\"",
+                   host=host, timeout=timeout)
+
+    parsed = parse_batch_output(raw.stdout, marker, commands, raw.host)
+    results = [parsed[i] for i in sorted(parsed)]
+    skipped = [cmd for i, cmd in enumerate(commands) if i not in parsed]
+
+    if (raw.timed_out or raw.connection_lost) and skipped:
+        # The command in flight when the batch timed out or lost its
+        # connection gets that result
+        results.append(CommandResult(skipped.pop(0), raw.exit_code, "", raw.stderr, host=raw.host,
+                                     timed_out=raw.timed_out, connection_lost=raw.connection_lost))
+
+    return BatchResult(results, skipped, raw.duration, raw.host)
@@ -0,0 +1,39 @@
+"""
+Progress Tools - Sub-step checkpointing for team agents
+
+Teams record each verified sub-step of their ``step_file`` through
+``StateManager.checkpoint``. When a team is resumed after a failure it is
+told which sub-steps are already done, together with the summaries it
+wrote, and continues from the next one instead of starting over.
+"""
+
+from typing import Dict, Any, List
+
+from utils.state_manager import StateManager
+from utils.tracing import get_tracer
+
+
+def create_progress_tools(state_manager: StateManager, team_id: str) -> List[Any]:
+    """Build the strands tools that let a team agent checkpoint its sub-steps"""
+    from strands import tool
+
+    @tool
+    def record_step_checkpoint(step: str, summary: str) -> Dict[str, Any]:
+        """Record that a sub-step of your step documentation is complete and verified.
+
+        Call this only after the sub-step's verification commands pass. If the
+        run is interrupted, the team resumes after the last recorded sub-step
+        with these summaries as context.
+
+        Args:
+            step: Sub-step name as it appears in the step file (e.g. "Task 2: Configure Firewall")
+            summary: Short summary of what was done and anything a resumed run must know
+
+        Returns:
+            The sub-steps recorded so far
+        """
+        with get_tracer().span('record_step_checkpoint', 'tool', step=step):
+            steps = state_manager.record_team_step(team_id, step, summary)
+        return {'team_id': team_id, 'completed_steps': [s['step'] for s in steps]}
+
+    return [record_step_checkpoint]
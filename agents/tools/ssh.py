@@ -0,0 +1,749 @@
+"""
+SSH Tools - Pooled, persistent SSH connections shared by all team agents
+
+One authenticated transport is kept per host and every command opens a
+new channel on it, so agents pay the TCP + key exchange + auth handshake
+once per host instead of once per command. Transports are pluggable: the
+``local`` backend runs commands through a local shell for tests and dry
+environments.
+
+Output is read incrementally. Agent commands keep only a bounded head and
+tail of it and stream every line to a consumer (the team log and live
+display) through a bounded queue; when the consumer falls behind, reading
+pauses, so the remote side is throttled by SSH flow control instead of
+output piling up in memory.
+"""
+
+import os
+import json
+import queue
+import math
+import select
+import selectors
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple, Type, Callable
+
+from utils.metrics import get_metrics
+from utils.tracing import get_tracer
+
+
+class CommandResult:
+    """Outcome of a single remote command
+
+    ``omitted_bytes`` counts output dropped from the middle of stdout and
+    stderr by a bounded capture. ``connection_lost`` means the connection
+    dropped after the command started, so it may or may not have finished
+    on the host (exit code 255, like ssh).
+    """
+
+    def __init__(self, command: str, exit_code: int, stdout: str = "", stderr: str = "",
+                 duration: float = 0.0, host: str = "", timed_out: bool = False,
+                 omitted_bytes: int = 0, connection_lost: bool = False):
+        self.command = command
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.host = host
+        self.timed_out = timed_out
+        self.omitted_bytes = omitted_bytes
+        self.connection_lost = connection_lost
+
+    @property
+    def ok(self) -> bool:
+        """True if the command exited with status 0"""
+        return self.exit_code == 0 and not self.timed_out and not self.connection_lost
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the result for agents and logs"""
+        result = {
+            'host': self.host,
+            'command': self.command,
+            'exit_code': self.exit_code,
+            'stdout': self.stdout,
+            'stderr': self.stderr,
+            'duration': round(self.duration, 3),
+            'timed_out': self.timed_out,
+        }
+        if self.omitted_bytes:
+            result['omitted_bytes'] = self.omitted_bytes
+        if self.connection_lost:
+            result['connection_lost'] = True
+        return result
+
+    def __repr__(self) -> str:
+        return f"CommandResult({self.command!r}, exit_code={self.exit_code})"
+
+
+class SSHConnectionError(Exception):
+    """Raised when a host cannot be reached after all retry attempts"""
+
+
+class OutputBuffer:
+    """First ``head`` and last ``tail`` bytes of a stream (everything if ``head`` is None)"""
+
+    def __init__(self, head: Optional[int] = None, tail: int = 0):
+        self.head_limit = head
+        self.tail_limit = tail
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        if self.head_limit is None:
+            self.head += data
+            return
+
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_limit:
+            self.tail += data[-self.tail_limit:]
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        """Bytes dropped between head and tail"""
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode('utf-8', errors='replace')
+        if not self.omitted:
+            return head + self.tail.decode('utf-8', errors='replace')
+        return (f"{head}\n[... {self.omitted} bytes omitted ...]\n"
+                f"{self.tail.decode('utf-8', errors='replace')}")
+
+
+class OutputStream:
+    """Captures a command's stdout and stderr and streams lines to ``on_output``
+
+    Transports ``write`` raw chunks as they arrive. Lines are handed to
+    ``on_output(stream, line)`` on a separate thread through a queue of at
+    most ``max_chunks`` chunks; a full queue blocks the writer, which stops
+    reading from the channel until the consumer catches up.
+    """
+
+    MAX_LINE = 4096
+
+    def __init__(self, on_output: Optional[Callable[[str, str], None]] = None,
+                 head: Optional[int] = None, tail: int = 0, max_chunks: int = 64):
+        self.buffers = {'stdout': OutputBuffer(head, tail), 'stderr': OutputBuffer(head, tail)}
+        self.on_output = on_output
+        self.stalls = 0
+        self._queue: Optional[queue.Queue] = None
+        self._consumer: Optional[threading.Thread] = None
+        if on_output:
+            self._queue = queue.Queue(maxsize=max(1, max_chunks))
+            self._consumer = threading.Thread(target=self._consume, name="ssh-output", daemon=True)
+            self._consumer.start()
+
+    @property
+    def stdout(self) -> OutputBuffer:
+        return self.buffers['stdout']
+
+    @property
+    def stderr(self) -> OutputBuffer:
+        return self.buffers['stderr']
+
+    @property
+    def omitted(self) -> int:
+        return self.stdout.omitted + self.stderr.omitted
+
+    def write(self, stream: str, data: bytes):
+        """Record a chunk of ``stdout`` or ``stderr``; may block on a slow consumer"""
+        if not data:
+            return
+        self.buffers[stream].write(data)
+        if self._queue is not None:
+            if self._queue.full():
+                self.stalls += 1
+            self._queue.put((stream, data))
+
+    def close(self):
+        """Flush partial lines and wait for the consumer to finish"""
+        if self._queue is not None:
+            self._queue.put(None)
+            self._consumer.join()
+            self._queue = None
+            if self.stalls:
+                get_metrics().inc('ssh_output_stalls_total', self.stalls)
+
+    def _consume(self):
+        pending = {'stdout': b'', 'stderr': b''}
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            stream, data = item
+            lines = (pending[stream] + data).replace(b'\r', b'\n').split(b'\n')
+            pending[stream] = lines.pop()
+            if len(pending[stream]) > self.MAX_LINE:
+                lines.append(pending[stream])
+                pending[stream] = b''
+            self._emit(stream, lines)
+
+        for stream, rest in pending.items():
+            self._emit(stream, [rest])
+
+    def _emit(self, stream: str, lines: List[bytes]):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self.on_output(stream, line.decode('utf-8', errors='replace'))
+            except Exception as e:
+                print(f"Warning: Command output consumer failed: {e}")
+
+    def result(self, command: str, exit_code: int, duration: float, host: str,
+               timed_out: bool = False, connection_lost: bool = False) -> CommandResult:
+        """Close the stream and build the command's result from what was kept"""
+        self.close()
+        return CommandResult(command, exit_code, self.stdout.text(), self.stderr.text(),
+                             duration, host, timed_out, omitted_bytes=self.omitted,
+                             connection_lost=connection_lost)
+
+
+class Transport:
+    """Base class for a persistent connection to a single host"""
+
+    def __init__(self, host: str, ssh_config: Dict):
+        self.host = host
+        self.ssh_config = ssh_config
+
+    def connect(self):
+        """Establish the connection"""
+        raise NotImplementedError
+
+    def is_active(self) -> bool:
+        """True if the connection can accept new commands"""
+        raise NotImplementedError
+
+    def exec_command(self, command: str, timeout: Optional[float] = None,
+                     output: Optional[OutputStream] = None) -> CommandResult:
+        """Run a command and wait for it to finish
+
+        Output is written to ``output`` as it arrives; without one it is
+        captured in full. Connection errors may only be raised before the
+        command starts; once it has, a dropped connection is reported as a
+        ``connection_lost`` result so the command is never run twice. On
+        timeout the command must be stopped on the host, not just abandoned.
+        """
+        raise NotImplementedError
+
+    def put_file(self, local_path: str, remote_path: str,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """Copy a local file to ``remote_path`` on the host
+
+        ``progress`` is called with the bytes sent so far and the file size
+        after each chunk; it may sleep to pace the transfer.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Tear down the connection"""
+
+
+class ParamikoTransport(Transport):
+    """SSH transport multiplexing channels over one paramiko connection
+
+    Agents share one transport per host from many threads, and the pool may
+    close it from any of them, so ``client`` and ``sftp`` are only read and
+    replaced under ``_lock``. A closed transport raises
+    ``SSHConnectionError``, which the pool retries on a new connection.
+    """
+
+    KILL_GRACE = 10
+
+    def __init__(self, host: str, ssh_config: Dict):
+        super().__init__(host, ssh_config)
+        self.client = None
+        self.sftp = None
+        self._lock = threading.Lock()
+        self._upload_lock = threading.Lock()
+
+    def _resolve_host(self) -> Dict[str, Any]:
+        """Resolve a host alias (e.g. ``hetzner1``) through ~/.ssh/config"""
+        import paramiko
+
+        params: Dict[str, Any] = {
+            'hostname': self.host,
+            'username': self.ssh_config.get('user'),
+            'port': self.ssh_config.get('port', 22),
+        }
+
+        config_path = os.path.expanduser('~/.ssh/config')
+        if os.path.exists(config_path):
+            ssh_file_config = paramiko.SSHConfig.from_path(config_path)
+            entry = ssh_file_config.lookup(self.host)
+            params['hostname'] = entry.get('hostname', self.host)
+            params['username'] = self.ssh_config.get('user') or entry.get('user')
+            params['port'] = int(entry.get('port', params['port']))
+            if 'identityfile' in entry:
+                params['key_filename'] = entry['identityfile']
+
+        if self.ssh_config.get('key_file'):
+            params['key_filename'] = os.path.expanduser(self.ssh_config['key_file'])
+
+        return params
+
+    def connect(self):
+        """Open the SSH connection and enable keepalives"""
+        import paramiko
+
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(paramiko.RejectPolicy())
+
+        client.connect(
+            timeout=self.ssh_config.get('connection_timeout', 30),
+            banner_timeout=self.ssh_config.get('connection_timeout', 30),
+            **self._resolve_host()
+        )
+
+        keepalive = self.ssh_config.get('keepalive_interval', 30)
+        if keepalive:
+            client.get_transport().set_keepalive(keepalive)
+
+        with self._lock:
+            self.client = client
+
+    def _transport(self):
+        """The live paramiko transport, or SSHConnectionError once closed"""
+        with self._lock:
+            client = self.client
+        transport = client.get_transport() if client else None
+        if transport is None or not transport.is_active():
+            raise SSHConnectionError(f"Connection to {self.host} is closed")
+        return transport
+
+    def is_active(self) -> bool:
+        """True if the underlying transport is still authenticated"""
+        try:
+            self._transport()
+        except SSHConnectionError:
+            return False
+        return True
+
+    def exec_command(self, command: str, timeout: Optional[float] = None,
+                     output: Optional[OutputStream] = None) -> CommandResult:
+        """Run a command on a fresh channel of the shared transport
+
+        With a timeout the command runs under coreutils ``timeout``, which
+        kills its whole process group on the host; closing the channel alone
+        would leave it running. The local deadline allows ``KILL_GRACE``
+        more seconds for that to happen.
+        """
+        start = time.monotonic()
+        deadline = start + timeout + self.KILL_GRACE if timeout else None
+        output = output or OutputStream()
+
+        channel = self._transport().open_session(
+            timeout=self.ssh_config.get('connection_timeout', 30)
+        )
+        timed_out = False
+        remote_command = command
+        if timeout:
+            remote_command = (f"timeout -k {self.KILL_GRACE} {math.ceil(timeout)} "
+                              f"bash -c {shlex.quote(command)}")
+
+        try:
+            channel.exec_command(remote_command)
+
+            while True:
+                # Not reading while output.write blocks lets the SSH window fill up
+                if channel.recv_ready():
+                    output.write('stdout', channel.recv(65536))
+                if channel.recv_stderr_ready():
+                    output.write('stderr', channel.recv_stderr(65536))
+
+                if (channel.exit_status_ready() and not channel.recv_ready()
+                        and not channel.recv_stderr_ready()):
+                    break
+
+                if deadline and time.monotonic() > deadline:
+                    timed_out = True
+                    break
+
+                select.select([channel], [], [], 0.5)
+
+            if timed_out:
+                exit_code = 124
+            else:
+                exit_code = channel.recv_exit_status()
+                # paramiko closes channels without an exit status when the transport dies
+                if exit_code == -1 and not self.is_active():
+                    raise EOFError("SSH transport closed")
+        except (OSError, EOFError, _ssh_exception()) as e:
+            output.write('stderr', f"\nConnection lost while the command ran: {e}\n".encode())
+            return output.result(command, 255, time.monotonic() - start, self.host,
+                                 connection_lost=True)
+        finally:
+            channel.close()
+
+        duration = time.monotonic() - start
+        # coreutils timeout exits 124, or 137 once it had to SIGKILL
+        if timeout and exit_code in (124, 137) and duration >= timeout:
+            timed_out, exit_code = True, 124
+        return output.result(command, exit_code, duration, self.host, timed_out)
+
+    def put_file(self, local_path: str, remote_path: str,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """Upload over the SFTP channel of the shared transport, one file at a time"""
+        with self._upload_lock:
+            with self._lock:
+                sftp = self.sftp
+            if sftp is None:
+                transport = self._transport()
+                import paramiko
+                sftp = paramiko.SFTPClient.from_transport(transport)
+                with self._lock:
+                    self.sftp = sftp
+            sftp.put(local_path, remote_path, callback=progress)
+
+    def close(self):
+        """Close the SSH connection"""
+        with self._lock:
+            sftp, self.sftp = self.sftp, None
+            client, self.client = self.client, None
+        if sftp:
+            sftp.close()
+        if client:
+            client.close()
+
+
+class LocalTransport(Transport):
+    """Runs commands in a local shell; stands in for a real host in tests"""
+
+    def __init__(self, host: str, ssh_config: Dict):
+        super().__init__(host, ssh_config)
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def is_active(self) -> bool:
+        return self.connected
+
+    def exec_command(self, command: str, timeout: Optional[float] = None,
+                     output: Optional[OutputStream] = None) -> CommandResult:
+        """Run the command with ``bash -c`` on the local machine"""
+        start = time.monotonic()
+        deadline = start + timeout if timeout else None
+        output = output or OutputStream()
+        timed_out = False
+
+        proc = subprocess.Popen(['bash', '-c', command], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                start_new_session=True)
+        with selectors.DefaultSelector() as selector:
+            selector.register(proc.stdout, selectors.EVENT_READ, 'stdout')
+            selector.register(proc.stderr, selectors.EVENT_READ, 'stderr')
+            while selector.get_map():
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    timed_out = True
+                    # Kill the whole group so children do not outlive the timeout
+                    os.killpg(proc.pid, signal.SIGKILL)
+                    break
+                for key, _ in selector.select(wait):
+                    data = os.read(key.fd, 65536)
+                    if data:
+                        output.write(key.data, data)
+                    else:
+                        selector.unregister(key.fileobj)
+
+        proc.stdout.close()
+        proc.stderr.close()
+        exit_code = 124 if timed_out else proc.wait()
+        proc.wait()
+        return output.result(command, exit_code, time.monotonic() - start, self.host, timed_out)
+
+    def put_file(self, local_path: str, remote_path: str,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """Copy the file on the local machine"""
+        if progress is None:
+            shutil.copyfile(local_path, remote_path)
+            return
+
+        size = os.path.getsize(local_path)
+        sent = 0
+        with open(local_path, 'rb') as source, open(remote_path, 'wb') as dest:
+            for chunk in iter(lambda: source.read(32768), b''):
+                dest.write(chunk)
+                sent += len(chunk)
+                progress(sent, size)
+
+    def close(self):
+        self.connected = False
+
+
+TRANSPORTS: Dict[str, Type[Transport]] = {
+    'paramiko': ParamikoTransport,
+    'local': LocalTransport,
+}
+
+
+def register_transport(name: str, transport_class: Type[Transport]):
+    """Register a custom transport backend usable via ``ssh.transport``"""
+    TRANSPORTS[name] = transport_class
+
+
+class SSHConnectionPool:
+    """Per-host pool of persistent transports shared across team agents"""
+
+    def __init__(self, config: Dict, transport: Optional[str] = None):
+        """Initialize the pool from the ``ssh`` and ``advanced`` config sections"""
+        self.ssh_config = config.get('ssh', {})
+        self.default_host = self.ssh_config.get('host')
+        self.keep_alive = config.get('advanced', {}).get('keep_ssh_connections_alive', True)
+        self.debug = config.get('advanced', {}).get('debug_ssh_commands', False)
+        self.output_head = int(self.ssh_config.get('output_head_kb', 16) * 1024)
+        self.output_tail = int(self.ssh_config.get('output_tail_kb', 48) * 1024)
+        self.output_queue = self.ssh_config.get('output_queue_chunks', 64)
+
+        transport_name = transport or self.ssh_config.get('transport', 'paramiko')
+        if transport_name not in TRANSPORTS:
+            raise ValueError(f"Unsupported SSH transport: {transport_name}")
+        self.transport_class = TRANSPORTS[transport_name]
+
+        self._connections: Dict[str, Transport] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'connects': 0, 'reconnects': 0, 'commands': 0, 'retries': 0}
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self._lock:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.Lock()
+            return self._host_locks[host]
+
+    def get_connection(self, host: Optional[str] = None) -> Transport:
+        """Return a live transport for the host, connecting if necessary"""
+        host = host or self.default_host
+
+        with self._host_lock(host):
+            connection = self._connections.get(host)
+            if connection and connection.is_active():
+                return connection
+
+            if connection:
+                connection.close()
+                self.stats['reconnects'] += 1
+
+            connection = self.transport_class(host, self.ssh_config)
+            connection.connect()
+            self.stats['connects'] += 1
+            get_metrics().inc('ssh_connects_total', host=host)
+            self._connections[host] = connection
+            return connection
+
+    def _drop_connection(self, host: str):
+        """Forget a broken connection so the next call reconnects"""
+        with self._host_lock(host):
+            connection = self._connections.pop(host, None)
+        if connection:
+            connection.close()
+
+    def run(self, command: str, host: Optional[str] = None, timeout: Optional[float] = None,
+            on_output: Optional[Callable[[str, str], None]] = None,
+            bounded: bool = False) -> CommandResult:
+        """Run a command on a host, reconnecting and retrying on connection errors
+
+        Non-zero exit codes are returned, not retried; only failures to reach
+        the host (connect, open a channel) count against ``ssh.retry_attempts``.
+        A command that started is never run again: if the connection drops
+        while it runs, the result has ``connection_lost`` set. ``on_output(stream,
+        line)`` receives output lines while the command runs; with
+        ``bounded`` the result keeps only ``ssh.output_head_kb`` and
+        ``ssh.output_tail_kb`` of each stream.
+        """
+        host = host or self.default_host
+        timeout = timeout if timeout is not None else self.ssh_config.get('command_timeout')
+        attempts = max(1, self.ssh_config.get('retry_attempts', 3))
+        delay = self.ssh_config.get('retry_delay', 5)
+
+        if self.debug:
+            print(f"[ssh {host}] {command}")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1, attempts + 1):
+            output = OutputStream(on_output, head=self.output_head if bounded else None,
+                                  tail=self.output_tail, max_chunks=self.output_queue)
+            try:
+                with get_tracer().span('ssh', 'ssh', host=host, command=command[:200],
+                                       attempt=attempt) as span:
+                    result = self.get_connection(host).exec_command(command, timeout=timeout,
+                                                                    output=output)
+                    span.set(exit_code=result.exit_code)
+                self.stats['commands'] += 1
+                metrics = get_metrics()
+                metrics.observe('ssh_command_seconds', result.duration, host=host)
+                metrics.inc('ssh_commands_total', host=host, status=self._status(result))
+                if result.connection_lost or not self.keep_alive:
+                    self._drop_connection(host)
+                return result
+            except _connection_errors() as e:
+                last_error = e
+                self._drop_connection(host)
+                if attempt < attempts:
+                    self.stats['retries'] += 1
+                    get_metrics().inc('ssh_retries_total', host=host)
+                    time.sleep(delay)
+            finally:
+                output.close()
+
+        get_metrics().inc('ssh_commands_total', host=host, status='unreachable')
+        raise SSHConnectionError(f"Failed to run command on {host} after {attempts} attempts: {last_error}")
+
+    def _status(self, result: CommandResult) -> str:
+        if result.connection_lost:
+            return 'connection_lost'
+        if result.timed_out:
+            return 'timeout'
+        return 'ok' if result.ok else 'error'
+
+    def put_file(self, local_path: str, remote_path: str, host: Optional[str] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        """Upload a file over the host's pooled connection
+
+        The remote directory must exist. Connection failures are retried
+        like ``run``; the upload restarts from scratch on each attempt.
+        ``progress`` is passed to the transport (see ``Transport.put_file``).
+        """
+        host = host or self.default_host
+        size = os.path.getsize(local_path)
+        attempts = max(1, self.ssh_config.get('retry_attempts', 3))
+        delay = self.ssh_config.get('retry_delay', 5)
+
+        if self.debug:
+            print(f"[ssh {host}] put {local_path} -> {remote_path}")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1, attempts + 1):
+            try:
+                start = time.monotonic()
+                with get_tracer().span('ssh.put', 'ssh', host=host, path=remote_path,
+                                       bytes=size, attempt=attempt):
+                    self.get_connection(host).put_file(local_path, remote_path, progress)
+                metrics = get_metrics()
+                metrics.observe('ssh_upload_seconds', time.monotonic() - start, host=host)
+                metrics.inc('ssh_upload_bytes_total', size, host=host)
+                if not self.keep_alive:
+                    self._drop_connection(host)
+                return
+            except _connection_errors() as e:
+                last_error = e
+                self._drop_connection(host)
+                if attempt < attempts:
+                    self.stats['retries'] += 1
+                    get_metrics().inc('ssh_retries_total', host=host)
+                    time.sleep(delay)
+
+        raise SSHConnectionError(f"Failed to upload {local_path} to {host} after {attempts} attempts: "
+                                 f"{last_error}")
+
+    def close(self, host: Optional[str] = None):
+        """Close one host's connection, or all of them"""
+        hosts = [host] if host else list(self._connections)
+        for h in hosts:
+            self._drop_connection(h)
+
+
+def _connection_errors() -> Tuple[Type[Exception], ...]:
+    """Exceptions meaning the host was not reached; the pool retries these"""
+    return (OSError, EOFError, SSHConnectionError, _ssh_exception())
+
+
+def _ssh_exception() -> Type[Exception]:
+    """paramiko's base SSH exception, or a never-raised stand-in without paramiko"""
+    try:
+        import paramiko
+        return paramiko.SSHException
+    except ImportError:
+        return SSHConnectionError
+
+
+_shared_pools: Dict[str, SSHConnectionPool] = {}
+_shared_lock = threading.Lock()
+
+
+def get_ssh_pool(config: Dict) -> SSHConnectionPool:
+    """Return the process-wide pool for these SSH settings, creating it on first use"""
+    with _shared_lock:
+        key = json.dumps([config.get('ssh', {}), config.get('advanced', {})],
+                         sort_keys=True, default=str)
+        if key not in _shared_pools:
+            _shared_pools[key] = SSHConnectionPool(config)
+        return _shared_pools[key]
+
+
+def in_directory(command: str, cwd: Optional[str]) -> str:
+    """``command`` run from ``cwd`` when that directory exists on the host"""
+    if not cwd:
+        return command
+    return f"cd {shlex.quote(cwd)} 2>/dev/null || true\n{command}"
+
+
+def create_ssh_tools(pool: SSHConnectionPool,
+                     on_output: Optional[Callable[[str, str], None]] = None,
+                     cwd: Optional[str] = None) -> List[Any]:
+    """Build the strands tools that expose the pool to a team agent
+
+    ``on_output(stream, line)`` receives the output of
+    ``execute_remote_command`` while it runs; the agent gets its bounded
+    head and tail. Every command starts in ``cwd`` (when it exists): each
+    one runs on a new channel, so an agent's ``cd`` does not carry over.
+    """
+    from strands import tool
+    from .batch import run_batch
+
+    @tool
+    def execute_remote_command(command: str, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """Execute a shell command on the Hetzner server over SSH.
+
+        Args:
+            command: Shell command to run on the remote host
+            timeout: Optional timeout in seconds (defaults to ssh.command_timeout)
+
+        Returns:
+            Exit code, stdout, stderr and duration of the command. Very long
+            output is cut to its beginning and end (see omitted_bytes)
+        """
+        with get_tracer().span('execute_remote_command', 'tool'):
+            result = pool.run(in_directory(command, cwd), timeout=timeout, on_output=on_output,
+                              bounded=True)
+            result.command = command
+            return result.to_dict()
+
+    @tool
+    def execute_remote_batch(commands: List[str], stop_on_first_failure: bool = False,
+                             timeout: Optional[int] = None) -> Dict[str, Any]:
+        """Execute several shell commands on the Hetzner server in one SSH round trip.
+
+        Prefer this over repeated execute_remote_command calls for sequences
+        of short probes (lsmod, systemctl is-active, ls /dev/kvm, version checks).
+        Each command runs in its own subshell.
+
+        Args:
+            commands: Shell commands to run, in order
+            stop_on_first_failure: Stop at the first non-zero exit; remaining
+                commands are reported as skipped
+            timeout: Optional timeout in seconds for the whole batch
+
+        Returns:
+            Per-command exit code, stdout, stderr and duration, plus skipped commands
+        """
+        with get_tracer().span('execute_remote_batch', 'tool', commands=len(commands)):
+            return run_batch(pool, commands, stop_on_failure=stop_on_first_failure,
+                             timeout=timeout, cwd=cwd).to_dict()
+
+    return [execute_remote_command, execute_remote_batch]
@@ -0,0 +1,115 @@
+"""
+Step Tools - Runs parsed step-doc tasks directly over the SSH pool
+
+A ``StepTask`` (see ``utils.step_docs``) is executed without a model: its
+command blocks run as one ``set -e`` script, then its checks run in a
+single batch round trip. The outcome says which stage failed and carries
+the output, so the orchestrator can hand just that failure to the team
+agent for repair.
+"""
+
+import re
+import shlex
+import time
+from typing import Dict, Optional, List, Callable
+
+from utils.metrics import get_metrics
+from utils.step_docs import StepTask, StepCheck
+from utils.tracing import get_tracer
+from .batch import run_batch
+from .ssh import CommandResult, SSHConnectionPool
+
+
+COMMANDS = 'commands'
+VERIFICATION = 'verification'
+
+
+def check_passed(check: StepCheck, result: CommandResult) -> bool:
+    """True if the check exited 0 and shows its expected text as a whole word"""
+    if not result.ok:
+        return False
+    if not check.expect:
+        return True
+    pattern = r'(?<![\w-])' + re.escape(check.expect) + r'(?![\w-])'
+    return re.search(pattern, result.stdout + result.stderr, re.IGNORECASE) is not None
+
+
+class StepOutcome:
+    """Result of running one step task"""
+
+    def __init__(self, task: StepTask, stage: Optional[str] = None,
+                 result: Optional[CommandResult] = None, failures: Optional[List[str]] = None,
+                 duration: float = 0.0):
+        self.task = task
+        self.stage = stage
+        self.result = result
+        self.failures = failures or []
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.stage is None
+
+    def describe(self, max_chars: int = 4000) -> str:
+        """What failed, with the tail of its output, for logs and repair prompts"""
+        if self.ok:
+            return "passed"
+        if self.stage == COMMANDS:
+            result = self.result
+            status = "timed out" if result.timed_out else f"exited with {result.exit_code}"
+            return f"Command block {status}. Output (end):\n{(result.stdout + result.stderr)[-max_chars:]}"
+        return "Verification failed:\n" + "\n".join(f"- {failure}" for failure in self.failures)
+
+
+class StepExecutor:
+    """Executes step tasks on a host, without the model
+
+    Command blocks run in ``ssh.remote_project_path`` when it exists, with
+    the SSH command timeout; their output is streamed to ``on_output`` like
+    agent commands. Checks use absolute paths, as the docs do.
+    """
+
+    def __init__(self, pool: SSHConnectionPool, config: Dict, host: Optional[str] = None):
+        self.pool = pool
+        self.host = host
+        self.project_path = config.get('ssh', {}).get('remote_project_path')
+
+    def run(self, task: StepTask,
+            on_output: Optional[Callable[[str, str], None]] = None) -> StepOutcome:
+        """Run the task's command blocks, then its checks"""
+        start = time.monotonic()
+        with get_tracer().span('step', 'steps', task=task.name) as span:
+            outcome = self._run_commands(task, on_output) if task.commands else None
+            if outcome is None:
+                outcome = self.verify(task)
+            span.set(stage=outcome.stage or 'passed')
+        outcome.duration = time.monotonic() - start
+        get_metrics().inc('scripted_steps_total', result='ok' if outcome.ok else f"{outcome.stage}_failed")
+        return outcome
+
+    def _run_commands(self, task: StepTask,
+                      on_output: Optional[Callable[[str, str], None]]) -> Optional[StepOutcome]:
+        prologue = "set -e\ntrap 'echo \"Failed (exit $?): $BASH_COMMAND\" >&2' ERR\n"
+        if self.project_path:
+            prologue += f"cd {shlex.quote(self.project_path)} 2>/dev/null || true\n"
+        result = self.pool.run(f"bash -c {shlex.quote(prologue + task.script)}", host=self.host,
+                               on_output=on_output, bounded=True)
+        if result.ok:
+            return None
+        return StepOutcome(task, COMMANDS, result=result)
+
+    def verify(self, task: StepTask) -> StepOutcome:
+        """Run only the task's checks, in one round trip"""
+        if not task.checks:
+            return StepOutcome(task)
+
+        batch = run_batch(self.pool, [check.command for check in task.checks], host=self.host)
+        failures = []
+        for check, result in zip(task.checks, batch.results):
+            if not check_passed(check, result):
+                expected = f" (expected '{check.expect}')" if check.expect else ""
+                output = (result.stdout.strip() or result.stderr.strip())[-300:]
+                failures.append(f"`{check.command}` exited {result.exit_code}{expected}: {output}")
+        failures.extend(f"`{command}` did not run" for command in batch.skipped)
+
+        return StepOutcome(task, VERIFICATION if failures else None, failures=failures)
@@ -0,0 +1,365 @@
+"""
+Verification Tools - Declarative, parallel host verification checks
+
+Checks are plain data (name, command, optional expected output) registered
+per step, so each team's step can contribute its own. The runner executes
+them concurrently over the pooled SSH transport with per-check timeouts
+and returns machine-readable pass/fail/latency results that the
+orchestrator gates teams on.
+"""
+
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from .ssh import SSHConnectionPool
+from utils.cache import DiskCache, make_key, hash_file
+from utils.tracing import get_tracer
+
+
+PASS = "pass"
+FAIL = "fail"
+WARN = "warn"
+ERROR = "error"
+
+
+class VerificationCheck:
+    """A single declarative check run on the host"""
+
+    def __init__(self, name: str, command: str, expect: Optional[str] = None,
+                 timeout: Optional[float] = None, required: bool = True,
+                 description: str = ""):
+        """
+        Args:
+            name: Unique check name within its step
+            command: Shell command; exit code 0 means pass
+            expect: Optional regex that stdout must also match
+            timeout: Per-check timeout in seconds
+            required: If False, a failure is reported as a warning
+            description: Human readable explanation
+        """
+        self.name = name
+        self.command = command
+        self.expect = expect
+        self.timeout = timeout
+        self.required = required
+        self.description = description or name
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'VerificationCheck':
+        """Build a check from a config/registry mapping"""
+        return cls(
+            name=data['name'],
+            command=data['command'],
+            expect=data.get('expect'),
+            timeout=data.get('timeout'),
+            required=data.get('required', True),
+            description=data.get('description', ''),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'command': self.command,
+            'expect': self.expect,
+            'timeout': self.timeout,
+            'required': self.required,
+            'description': self.description,
+        }
+
+
+class CheckResult:
+    """Outcome of one verification check"""
+
+    def __init__(self, check: VerificationCheck, status: str, latency: float,
+                 exit_code: Optional[int] = None, output: str = "", error: str = "",
+                 cached_from: Optional[float] = None):
+        self.check = check
+        self.status = status
+        self.latency = latency
+        self.exit_code = exit_code
+        self.output = output
+        self.error = error
+        self.cached = cached_from is not None
+        self.saved = cached_from or 0.0
+
+    @property
+    def blocking(self) -> bool:
+        """True if this result should fail the verification gate"""
+        return self.status in (FAIL, ERROR) and self.check.required
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.check.name,
+            'status': self.status,
+            'latency': round(self.latency, 3),
+            'exit_code': self.exit_code,
+            'output': self.output,
+            'error': self.error,
+            'cached': self.cached,
+        }
+
+
+class VerificationReport:
+    """Aggregated results for a set of checks"""
+
+    def __init__(self, step: str, results: List[CheckResult], duration: float):
+        self.step = step
+        self.results = results
+        self.duration = duration
+
+    @property
+    def passed(self) -> bool:
+        """True if no required check failed"""
+        return not any(r.blocking for r in self.results)
+
+    @property
+    def failures(self) -> List[str]:
+        """Names of checks that block the gate"""
+        return [r.check.name for r in self.results if r.blocking]
+
+    def summary(self) -> Dict[str, int]:
+        counts = {PASS: 0, FAIL: 0, WARN: 0, ERROR: 0}
+        for result in self.results:
+            counts[result.status] += 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'step': self.step,
+            'passed': self.passed,
+            'duration': round(self.duration, 3),
+            'cached': sum(1 for r in self.results if r.cached),
+            'seconds_saved': round(sum(r.saved for r in self.results), 3),
+            'summary': self.summary(),
+            'results': [r.to_dict() for r in self.results],
+        }
+
+
+# Step id -> registered checks
+CHECK_REGISTRY: Dict[str, List[VerificationCheck]] = {}
+
+
+def register_check(step: str, name: str, command: str, **kwargs) -> VerificationCheck:
+    """Register a check for a step (a team id, or ``hypervisor`` for the base install)"""
+    check = VerificationCheck(name, command, **kwargs)
+    checks = CHECK_REGISTRY.setdefault(step, [])
+    checks[:] = [c for c in checks if c.name != name]
+    checks.append(check)
+    return check
+
+
+def register_checks(step: str, checks: List[Dict[str, Any]]):
+    """Register several declarative checks for a step"""
+    for data in checks:
+        data = dict(data)
+        register_check(step, data.pop('name'), data.pop('command'), **data)
+
+
+def get_checks(step: str, config: Optional[Dict] = None) -> List[VerificationCheck]:
+    """Checks for a step: registered ones plus any declared under ``teams.<step>.verification``"""
+    checks = list(CHECK_REGISTRY.get(step, []))
+
+    if config:
+        declared = config.get('teams', {}).get(step, {}).get('verification', [])
+        names = {c.name for c in checks}
+        for data in declared:
+            check = VerificationCheck.from_dict(data)
+            if check.name in names:
+                checks = [c for c in checks if c.name != check.name]
+            checks.append(check)
+
+    return checks
+
+
+class VerificationRunner:
+    """Runs verification checks concurrently over the shared SSH pool
+
+    With a cache, passing results are stored under a key combining the
+    host fingerprint, the check definition and the hash of the step's
+    ``step_file``; a later ``use_cache`` run with unchanged inputs reuses
+    them instead of re-running the check. Failures are never cached. Only
+    re-verification of already completed teams reads the cache: a cached
+    pass says nothing about whether a service is still up, so ``--verify``
+    and the gate after a team always run the checks.
+    """
+
+    FINGERPRINT_COMMAND = "hostname; cat /etc/machine-id 2>/dev/null; uname -r"
+
+    def __init__(self, pool: SSHConnectionPool, config: Dict,
+                 cache: Optional[DiskCache] = None):
+        self.pool = pool
+        self.config = config
+        self.cache = cache
+        self._fingerprints: Dict[str, str] = {}
+        verification_config = config.get('verification', {})
+        self.timeout = verification_config.get('timeout_seconds', 300)
+        self.check_timeout = verification_config.get('check_timeout_seconds', 60)
+        self.max_parallel = verification_config.get('max_parallel_checks', 8)
+
+    def host_fingerprint(self, host: Optional[str] = None) -> str:
+        """Identity of the host's installation; changes after a rebuild"""
+        host = host or self.pool.default_host
+        if host not in self._fingerprints:
+            result = self.pool.run(self.FINGERPRINT_COMMAND, host=host, timeout=self.check_timeout)
+            if not result.ok:
+                return ""
+            self._fingerprints[host] = make_key(host, result.stdout)
+        return self._fingerprints[host]
+
+    def step_hash(self, step: str) -> str:
+        """Hash of the step documentation a team follows"""
+        step_file = self.config.get('teams', {}).get(step, {}).get('step_file')
+        if not step_file:
+            return ""
+        return hash_file(Path(self.config['project']['base_path']) / step_file)
+
+    def run_check(self, check: VerificationCheck, host: Optional[str] = None,
+                  cache_key: Optional[str] = None, use_cache: bool = False) -> CheckResult:
+        """Run a single check and classify the outcome"""
+        with get_tracer().span(check.name, 'verification') as span:
+            result = self._run_check(check, host, cache_key, use_cache)
+            span.set(status=result.status, cached=result.cached)
+            return result
+
+    def _run_check(self, check: VerificationCheck, host: Optional[str],
+                   cache_key: Optional[str], use_cache: bool = False) -> CheckResult:
+        if use_cache and cache_key and self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return CheckResult(check, cached['status'], 0.0, cached['exit_code'],
+                                   cached['output'], cached_from=cached['latency'])
+
+        start = time.monotonic()
+        try:
+            result = self.pool.run(check.command, host=host,
+                                   timeout=check.timeout or self.check_timeout)
+        except Exception as e:
+            return CheckResult(check, ERROR, time.monotonic() - start, error=str(e))
+
+        output = (result.stdout or result.stderr).strip()
+        passed = result.ok and (not check.expect or re.search(check.expect, result.stdout))
+
+        if passed:
+            status = PASS
+        elif not check.required:
+            status = WARN
+        else:
+            status = FAIL
+
+        error = "timed out" if result.timed_out else ""
+        check_result = CheckResult(check, status, result.duration, result.exit_code, output, error)
+
+        if cache_key and self.cache and status == PASS:
+            self.cache.set(cache_key, check_result.to_dict())
+
+        return check_result
+
+    def run(self, checks: List[VerificationCheck], step: str = "",
+            host: Optional[str] = None, use_cache: bool = False) -> VerificationReport:
+        """Run checks in parallel, returning results in declaration order
+
+        Checks still running when ``verification.timeout_seconds`` elapses
+        are reported as errors. Passing results are always stored in the
+        cache; ``use_cache`` also serves them from it.
+        """
+        start = time.monotonic()
+
+        if not checks:
+            return VerificationReport(step, [], 0.0)
+
+        keys: List[Optional[str]] = [None] * len(checks)
+        if self.cache:
+            fingerprint = self.host_fingerprint(host)
+            if fingerprint:
+                step_hash = self.step_hash(step)
+                keys = [make_key(fingerprint, check.to_dict(), step_hash) for check in checks]
+
+        from concurrent.futures import ThreadPoolExecutor, wait
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_parallel, len(checks)),
+                                      thread_name_prefix='verify')
+        track = get_tracer().current_track()
+        futures = [executor.submit(self._run_on_track, track, check, host, key, use_cache)
+                   for check, key in zip(checks, keys)]
+        wait(futures, timeout=self.timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for check, future in zip(checks, futures):
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                results.append(CheckResult(check, ERROR, time.monotonic() - start,
+                                           error="verification timed out"))
+
+        return VerificationReport(step, results, time.monotonic() - start)
+
+    def _run_on_track(self, track: Optional[str], check: VerificationCheck, host: Optional[str],
+                      cache_key: Optional[str], use_cache: bool) -> CheckResult:
+        """Run a check on the worker's own sub-track of the calling team's track
+
+        Concurrent checks sharing the team's track would overlap without
+        nesting, which trace viewers cannot draw.
+        """
+        if track is None:
+            return self.run_check(check, host, cache_key, use_cache)
+        worker = threading.current_thread().name.rsplit('_', 1)[-1]
+        with get_tracer().track(f"{track}/verify-{worker}"):
+            return self.run_check(check, host, cache_key, use_cache)
+
+    def verify_step(self, step: str, host: Optional[str] = None,
+                    use_cache: bool = False) -> VerificationReport:
+        """Run every check registered or declared for a step"""
+        with get_tracer().span(f'verify:{step}', 'verification'):
+            return self.run(get_checks(step, self.config), step=step, host=host, use_cache=use_cache)
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Cache hit/miss counters, or None when caching is disabled"""
+        return self.cache.stats() if self.cache else None
+
+
+# Base install checks (ported from scripts/verify-setup.sh)
+register_checks("hypervisor", [
+    {'name': 'cpu_virtualization', 'command': "grep -qE '(vmx|svm)' /proc/cpuinfo",
+     'description': 'CPU virtualization extensions'},
+    {'name': 'kvm_device', 'command': 'test -e /dev/kvm',
+     'description': '/dev/kvm device exists'},
+    {'name': 'kvm_modules', 'command': 'lsmod | grep -q kvm',
+     'description': 'KVM kernel modules loaded'},
+    {'name': 'firecracker', 'command': 'test -x /usr/local/bin/firecracker && firecracker --version 2>&1 | head -1',
+     'description': 'Firecracker installed'},
+    {'name': 'firecracker_test_config', 'command': 'test -f /root/firecracker-test/vm_config.json',
+     'required': False, 'description': 'Firecracker test configuration exists'},
+    {'name': 'cloud_hypervisor', 'command': 'test -x /usr/local/bin/cloud-hypervisor && cloud-hypervisor --version 2>&1',
+     'description': 'Cloud Hypervisor installed'},
+    {'name': 'flintlock', 'command': 'test -x /usr/local/bin/flintlock && flintlock version 2>&1',
+     'description': 'Flintlock installed'},
+    {'name': 'flintlock_service', 'command': 'systemctl is-active --quiet flintlock',
+     'description': 'Flintlock service is running'},
+    {'name': 'flintlock_port', 'command': "ss -tln | grep -q ':9090'",
+     'required': False, 'description': 'Flintlock listening on port 9090'},
+    {'name': 'network_interface', 'command': "ip -br link show | grep -v lo | grep UP | head -1 | awk '{print $1}'",
+     'expect': r'\S', 'description': 'Primary network interface is up'},
+])
+
+# Step 01: Security baseline (docs/steps/step-01-security-baseline.md)
+register_checks("alpha", [
+    {'name': 'tls_certificates', 'command': 'test -f /etc/flintlock/certs/cert.pem && test -f /etc/flintlock/certs/key.pem',
+     'description': 'Flintlock TLS certificates present'},
+    {'name': 'firewall_active', 'command': 'ufw status', 'expect': r'Status: active',
+     'description': 'UFW firewall active'},
+    {'name': 'ssh_password_auth_disabled', 'command': 'sshd -T | grep -i passwordauthentication',
+     'expect': r'passwordauthentication no', 'description': 'SSH password authentication disabled'},
+    {'name': 'flintlock_running', 'command': 'systemctl is-active --quiet flintlock',
+     'description': 'Flintlock service active'},
+    # The unit must pass the cert and the gRPC port must complete a TLS handshake
+    {'name': 'flintlock_tls',
+     'command': "systemctl cat flintlock | grep -q -- '--tls-cert=' && "
+                "echo | timeout 10 openssl s_client -connect 127.0.0.1:9090 -alpn h2 2>/dev/null",
+     'expect': r'BEGIN CERTIFICATE', 'description': 'Flintlock gRPC endpoint serves TLS'},
+    {'name': 'fail2ban_active', 'command': 'systemctl is-active --quiet fail2ban',
+     'description': 'fail2ban active'},
+])
@@ -4,5 +4,10 @@ Utility modules for Strands Agent Framework orchestration
 
 from .state_manager import StateManager
 from .logger import setup_logger
+from .scheduler import DAGScheduler
+from .plan import WorkflowPlan
+from .events import EventBus, TeamEvent
+from .metrics import MetricsRegistry, get_metrics
 
-__all__ = ['StateManager', 'setup_logger']
+__all__ = ['StateManager', 'setup_logger', 'DAGScheduler', 'WorkflowPlan', 'EventBus', 'TeamEvent',
+           'MetricsRegistry', 'get_metrics']
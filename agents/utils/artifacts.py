@@ -0,0 +1,353 @@
+"""
+Artifacts - Content-addressed artifact store on the control machine
+
+Binaries, kernels and rootfs images are downloaded once, verified and kept
+under ``artifact_store.path`` by their SHA-256, then pushed to hosts over
+the pooled SSH transport. A host that already has a file with the right
+hash is skipped, so rebuilds (``nuclear_reset``) and fleet bring-ups stop
+depending on upstream bandwidth. Least recently used blobs are evicted
+once the store grows past ``max_gb``. Sources can be any URL urllib
+understands, including ``file://`` for a fully offline store.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import shlex
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from .metrics import get_metrics
+from .tracing import get_tracer
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# Push outcomes
+PUSH_CACHED = 'cached'
+PUSH_UPLOADED = 'uploaded'
+
+
+class ChecksumError(Exception):
+    """Raised when an artifact does not match its expected SHA-256"""
+
+
+class Pacer:
+    """Sleeps just enough to keep a transfer at ``bytes_per_second`` on average
+
+    Called with the bytes transferred so far (the signature of paramiko's
+    and ``Transport.put_file``'s progress callbacks); a count that goes
+    backwards means the transfer restarted and the clock restarts with it.
+    """
+
+    def __init__(self, bytes_per_second: float):
+        self.rate = bytes_per_second
+        self.start = time.monotonic()
+        self.last = 0
+
+    def __call__(self, transferred: int, total: int = 0):
+        if transferred < self.last:
+            self.start = time.monotonic()
+        self.last = transferred
+        delay = transferred / self.rate - (time.monotonic() - self.start)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ArtifactStore:
+    """Files kept by content hash, with an index of the URLs they came from
+
+    Blobs live at ``<root>/sha256/<first 2 hex>/<hash>``; ``index.json``
+    maps source URLs to hashes and records each blob's size and last use.
+    With ``offline`` set, misses raise instead of downloading. With
+    ``require_sha256`` every fetch needs a pinned hash: a store that only
+    checks a file against its own first download proves nothing.
+    """
+
+    def __init__(self, root: Path, max_bytes: Optional[int] = None, offline: bool = False,
+                 timeout: float = 600, require_sha256: bool = False):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.timeout = timeout
+        self.require_sha256 = require_sha256
+
+        self.index_file = self.root / 'index.json'
+        self.blobs: Dict[str, Dict[str, Any]] = {}
+        self.urls: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            self.blobs = data.get('blobs', {})
+            self.urls = data.get('urls', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to load artifact index: {e}")
+
+        # Blobs removed behind our back are forgotten
+        for digest in [d for d in self.blobs if not self.blob_path(d).exists()]:
+            self._forget(digest)
+
+    def _save_index(self):
+        tmp_file = self.index_file.with_suffix('.tmp')
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump({'blobs': self.blobs, 'urls': self.urls}, f, indent=2)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"Warning: Failed to save artifact index: {e}")
+
+    def blob_path(self, digest: str) -> Path:
+        """Where the blob with this SHA-256 lives"""
+        return self.root / 'sha256' / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return digest in self.blobs and self.blob_path(digest).exists()
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Hash of the blob previously fetched from ``url``, if still stored"""
+        digest = self.urls.get(url)
+        return digest if digest and self.has(digest) else None
+
+    def _touch(self, digest: str):
+        self.blobs[digest]['last_used'] = time.time()
+
+    def _forget(self, digest: str):
+        self.blobs.pop(digest, None)
+        for url in [u for u, d in self.urls.items() if d == digest]:
+            del self.urls[url]
+
+    def _install(self, tmp_path: Path, digest: str, url: Optional[str]) -> str:
+        """Move a verified file into the store and index it"""
+        with self._lock:
+            blob = self.blob_path(digest)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, blob)
+            entry = self.blobs.setdefault(digest, {'size': blob.stat().st_size, 'urls': []})
+            if url:
+                if url not in entry['urls']:
+                    entry['urls'].append(url)
+                self.urls[url] = digest
+            self._touch(digest)
+            self.evict(keep=(digest,))
+            self._save_index()
+        return digest
+
+    def _copy_hashing(self, source, expected: Optional[str],
+                      pace: Optional[Pacer] = None) -> Tuple[Path, str]:
+        """Stream ``source`` into a temp file in the store, returning it and its hash"""
+        # Directories are created on first write, so --dry-run leaves none behind
+        (self.root / 'tmp').mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root / 'tmp')
+        sha = hashlib.sha256()
+        copied = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                # Small reads when paced, so the rate holds within a chunk too
+                size = min(CHUNK_SIZE, max(4096, int(pace.rate / 10))) if pace else CHUNK_SIZE
+                for chunk in iter(lambda: source.read(size), b''):
+                    sha.update(chunk)
+                    out.write(chunk)
+                    copied += len(chunk)
+                    if pace:
+                        pace(copied)
+            digest = sha.hexdigest()
+            if expected and digest != expected.lower():
+                raise ChecksumError(f"SHA-256 mismatch: expected {expected}, got {digest}")
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return Path(tmp_name), digest
+
+    def add_file(self, path: Path, sha256: Optional[str] = None, url: Optional[str] = None) -> str:
+        """Import a local file (e.g. a mirrored download); returns its hash"""
+        with open(path, 'rb') as f:
+            tmp_path, digest = self._copy_hashing(f, sha256)
+        return self._install(tmp_path, digest, url)
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def fetch(self, url: str, sha256: Optional[str] = None,
+              rate_limit: Optional[float] = None) -> str:
+        """Hash of the artifact at ``url``, downloading it only on a miss
+
+        With a known ``sha256`` any blob with that hash is a hit, whatever
+        URL it came from; otherwise the URL index is consulted. Concurrent
+        fetches of one URL (e.g. from several fleet hosts) download it once.
+        ``rate_limit`` caps the download in bytes per second.
+        """
+        if self.require_sha256 and not sha256:
+            raise ChecksumError(f"No sha256 pinned for {url}")
+        with self._url_lock(url):
+            return self._fetch(url, sha256, rate_limit)
+
+    def _fetch(self, url: str, sha256: Optional[str], rate_limit: Optional[float]) -> str:
+        with self._lock:
+            digest = sha256.lower() if sha256 and self.has(sha256.lower()) else self.lookup(url)
+            if digest and (not sha256 or digest == sha256.lower()):
+                self.hits += 1
+                self._touch(digest)
+                self._save_index()
+                get_metrics().inc('artifact_store_total', result='hit')
+                return digest
+            self.misses += 1
+
+        if self.offline:
+            get_metrics().inc('artifact_store_total', result='miss')
+            raise FileNotFoundError(f"Artifact not in the offline store: {url}")
+
+        import urllib.request
+
+        with get_tracer().span('artifact.download', 'artifacts', url=url):
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    tmp_path, digest = self._copy_hashing(
+                        response, sha256, Pacer(rate_limit) if rate_limit else None)
+            except ChecksumError:
+                get_metrics().inc('artifact_store_total', result='corrupt')
+                raise
+        get_metrics().inc('artifact_store_total', result='download')
+        return self._install(tmp_path, digest, url)
+
+    def verify(self, digest: str) -> bool:
+        """Re-hash a stored blob; corrupted blobs are removed"""
+        blob = self.blob_path(digest)
+        try:
+            with open(blob, 'rb') as f:
+                ok = hashlib.file_digest(f, 'sha256').hexdigest() == digest
+        except OSError:
+            ok = False
+
+        if not ok:
+            with self._lock:
+                blob.unlink(missing_ok=True)
+                self._forget(digest)
+                self._save_index()
+        return ok
+
+    def evict(self, keep: Tuple[str, ...] = ()) -> int:
+        """Remove least recently used blobs until the store fits ``max_bytes``"""
+        if not self.max_bytes:
+            return 0
+
+        removed = 0
+        with self._lock:
+            total = sum(entry['size'] for entry in self.blobs.values())
+            for digest in sorted(self.blobs, key=lambda d: self.blobs[d].get('last_used', 0)):
+                if total <= self.max_bytes:
+                    break
+                if digest in keep:
+                    continue
+                total -= self.blobs[digest]['size']
+                self.blob_path(digest).unlink(missing_ok=True)
+                self._forget(digest)
+                removed += 1
+            self.evictions += removed
+        return removed
+
+    def push(self, pool, items: List[Tuple[str, str]], host: Optional[str] = None,
+             rate_limit: Optional[float] = None) -> Dict[str, str]:
+        """Copy blobs to the host, skipping files it already has
+
+        ``items`` are ``(sha256, remote_path)`` pairs. One ``sha256sum``
+        round trip finds the files already in place; the rest are uploaded
+        to ``<path>.part``, checked on the host and renamed, at most
+        ``rate_limit`` bytes per second each. Returns the outcome per remote
+        path.
+        """
+        if not items:
+            return {}
+
+        paths = ' '.join(shlex.quote(path) for _, path in items)
+        present = {}
+        listing = pool.run(f"sha256sum {paths} 2>/dev/null", host=host)
+        for line in listing.stdout.splitlines():
+            digest, _, path = line.partition('  ')
+            present[path] = digest
+
+        outcome = {}
+        for digest, path in items:
+            if present.get(path) == digest:
+                outcome[path] = PUSH_CACHED
+                get_metrics().inc('artifact_push_total', result='cached')
+                continue
+
+            with get_tracer().span('artifact.push', 'artifacts', path=path):
+                self._upload(pool, digest, path, host, rate_limit)
+            outcome[path] = PUSH_UPLOADED
+            get_metrics().inc('artifact_push_total', result='uploaded')
+        return outcome
+
+    def _upload(self, pool, digest: str, path: str, host: Optional[str],
+                rate_limit: Optional[float] = None):
+        part = path + '.part'
+        directory = posixpath.dirname(path) or '.'
+        pool.run(f"mkdir -p {shlex.quote(directory)}", host=host)
+        pool.put_file(str(self.blob_path(digest)), part, host=host,
+                      progress=Pacer(rate_limit) if rate_limit else None)
+
+        check = pool.run(f"echo {digest}'  '{shlex.quote(part)} | sha256sum -c --status "
+                         f"&& mv -f {shlex.quote(part)} {shlex.quote(path)}", host=host)
+        if not check.ok:
+            pool.run(f"rm -f {shlex.quote(part)}", host=host)
+            # Either the transfer or our copy is bad; drop ours if it is
+            self.verify(digest)
+            raise ChecksumError(f"SHA-256 mismatch after uploading {path} to {host or pool.default_host}")
+
+        with self._lock:
+            if digest in self.blobs:
+                self._touch(digest)
+                self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss/eviction counters"""
+        return {
+            'blobs': len(self.blobs),
+            'bytes': sum(entry['size'] for entry in self.blobs.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+_stores: Dict[Path, ArtifactStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(config: Dict) -> Optional[ArtifactStore]:
+    """Process-wide store for the ``artifact_store`` section, or None if disabled
+
+    Fleet hosts share one store (and one index) per path.
+    """
+    settings = config.get('artifact_store', {})
+    if not settings.get('enabled', False):
+        return None
+
+    root = Path(config['project']['base_path']) / settings.get('path', 'cache/artifacts')
+    with _stores_lock:
+        if root not in _stores:
+            max_gb = settings.get('max_gb')
+            _stores[root] = ArtifactStore(
+                root,
+                max_bytes=int(max_gb * 1024 ** 3) if max_gb else None,
+                offline=settings.get('offline', False),
+                timeout=settings.get('timeout', 600),
+                require_sha256=settings.get('require_sha256', False),
+            )
+        return _stores[root]
@@ -0,0 +1,199 @@
+"""
+Cache - Persistent on-disk key/value cache with TTL and size-based eviction
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """Stable content hash of arbitrary JSON-serializable key parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's contents, or an empty string if it doesn't exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except OSError:
+        return ""
+
+
+class DiskCache:
+    """JSON-file cache keyed by content hash
+
+    Each entry is one file under ``<cache_dir>/<namespace>/``, created on
+    the first write so read-only commands leave no trace. Reads refresh
+    the entry's mtime so eviction is least-recently-used once the namespace
+    exceeds ``max_bytes``. Entries older than ``ttl`` seconds are treated as
+    misses and removed.
+
+    Writes keep a running total of the namespace size (measured once, on the
+    first write) and only scan the directory when it crosses ``max_bytes``;
+    eviction then goes down to ``EVICT_TO`` of the cap so the next scan is
+    many writes away, and resyncs the total with what other processes wrote.
+    """
+
+    EVICT_TO = 0.9
+
+    def __init__(self, cache_dir: Path, namespace: str, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.path = Path(cache_dir) / namespace
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes: Optional[int] = None
+        self._created = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict, namespace: str) -> Optional['DiskCache']:
+        """Create a cache from the ``advanced`` config section, or None if disabled"""
+        advanced = config.get('advanced', {})
+        if not advanced.get('enable_caching', False):
+            return None
+
+        cache_dir = Path(config['project']['base_path']) / advanced.get('cache_dir', 'cache')
+        ttl_hours = advanced.get('cache_ttl_hours')
+        max_mb = advanced.get('cache_max_mb')
+
+        return cls(
+            cache_dir,
+            namespace,
+            ttl=ttl_hours * 3600 if ttl_hours else None,
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached value, counting the lookup as a hit or miss"""
+        entry_path = self._entry_path(key)
+
+        try:
+            with open(entry_path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return default
+
+        if self.ttl and time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(entry_path)
+            with self._lock:
+                self.misses += 1
+            return default
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return entry.get('value')
+
+    def set(self, key: str, value: Any):
+        """Store a value atomically, then evict if over the size cap"""
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        try:
+            if not self._created:
+                self.path.mkdir(parents=True, exist_ok=True)
+                self._created = True
+            with open(tmp_path, 'w') as f:
+                json.dump({'created': time.time(), 'value': value}, f, default=str)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            try:
+                replaced = entry_path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"Warning: Failed to write cache entry: {e}")
+            self._remove(tmp_path)
+            return
+
+        if self.max_bytes:
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = sum(size for _, size, _ in self._entries())
+                else:
+                    self._total_bytes += size - replaced
+                over = self._total_bytes > self.max_bytes
+            if over:
+                self._evict()
+
+    def delete(self, key: str):
+        """Remove a single entry"""
+        self._remove(self._entry_path(key))
+
+    def clear(self):
+        """Remove every entry in this namespace"""
+        for entry_path in self.path.glob('*.json'):
+            self._remove(entry_path)
+        with self._lock:
+            self._total_bytes = None
+
+    def _remove(self, path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _entries(self):
+        """(mtime, size, path) for every entry, oldest first"""
+        entries = []
+        for entry_path in self.path.glob('*.json'):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return sorted(entries)
+
+    def _evict(self):
+        """Drop least recently used entries until under ``EVICT_TO`` of ``max_bytes``"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.EVICT_TO if total > self.max_bytes else total
+
+        evicted = 0
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            self._remove(entry_path)
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self.evictions += evicted
+            self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current footprint"""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
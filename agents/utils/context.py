@@ -0,0 +1,240 @@
+"""
+Context - Compaction of team agent conversations
+
+A team works through its step file for hours, and every model call resends
+the whole conversation. ``ContextCompactor`` keeps that conversation small
+by rewriting the message list in place (strands message format):
+
+- Tool results are cut to their beginning, end and any error-looking
+  lines: the newest ones generously, older ones hard
+- When the same tool is called again with the same input, the older result
+  is replaced by a pointer to the newer one
+- Once ``record_step_checkpoint`` succeeds, the turns that led up to it
+  are dropped; the checkpoint summaries stay in the first message, which
+  is always the prompt the agent is currently working on
+
+Token counts are estimated from message size (about 4 characters per
+token), which is all the compaction decisions need.
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+
+CHARS_PER_TOKEN = 4
+
+CHECKPOINT_TOOL = 'record_step_checkpoint'
+COLLAPSED_HEADER = "[Earlier turns of this conversation were removed to save context.]"
+SUPERSEDED = "[Superseded: the same call was made again later; see the newer result]"
+
+_LINE_SPLIT = re.compile(r'\\n|\n')
+_NOTABLE = re.compile(r'error|fail|fatal|denied|not found|cannot|unable|warn|panic|refused|timed? ?out',
+                      re.IGNORECASE)
+
+
+def _block_chars(block: Dict[str, Any]) -> int:
+    if 'text' in block:
+        return len(block['text'])
+    if 'toolUse' in block:
+        tool_use = block['toolUse']
+        return len(tool_use.get('name', '')) + len(json.dumps(tool_use.get('input'), default=str))
+    if 'toolResult' in block:
+        return sum(_block_chars(item) for item in block['toolResult'].get('content', []))
+    if 'json' in block:
+        return len(json.dumps(block['json'], default=str))
+    return len(json.dumps(block, default=str))
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Approximate token count of a conversation"""
+    chars = sum(_block_chars(block) for message in messages for block in message.get('content', []))
+    return -(-chars // CHARS_PER_TOKEN)
+
+
+def summarize_text(text: str, limit: int) -> str:
+    """``text`` cut to about ``limit`` characters: head, notable lines, tail"""
+    if len(text) <= limit:
+        return text
+
+    omitted = f"\n[... {len(text) - limit} of {len(text)} characters omitted ...]\n"
+    budget = max(0, limit - len(omitted) - 40)
+    head = text[:int(budget * 0.4)]
+    tail = text[len(text) - int(budget * 0.4):]
+
+    middle = text[len(head):len(text) - len(tail)]
+    notable: List[str] = []
+    room = budget - len(head) - len(tail)
+    for line in _LINE_SPLIT.split(middle):
+        line = line.strip()[:200]
+        if line and _NOTABLE.search(line) and line not in notable and len(line) + 1 <= room:
+            notable.append(line)
+            room -= len(line) + 1
+
+    if notable:
+        omitted += "[notable lines]\n" + "\n".join(notable) + "\n[...]\n"
+    return head + omitted + tail
+
+
+class ContextCompactor:
+    """Rewrites one agent's message list to keep it within budget
+
+    Configured from the ``context`` section: ``max_tool_result_chars``
+    (the ``keep_recent_results`` newest results), ``max_old_tool_result_chars``
+    (everything older), ``dedupe_probes`` and ``collapse_verified_steps``.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        self.max_recent_chars = settings.get('max_tool_result_chars', 16000)
+        self.max_old_chars = settings.get('max_old_tool_result_chars', 2000)
+        self.keep_recent_results = settings.get('keep_recent_results', 2)
+        self.dedupe = settings.get('dedupe_probes', True)
+        self.collapse = settings.get('collapse_verified_steps', True)
+        self.keep_recent_messages = settings.get('keep_recent_messages', 6)
+
+        self.collapsed_steps: List[Tuple[str, str]] = []
+        self.removed_messages = 0
+
+    def compact(self, messages: List[Dict[str, Any]], aggressive: bool = False) -> Dict[str, int]:
+        """Compact ``messages`` in place; returns token counts and what changed
+
+        ``aggressive`` (used when the provider reports a context overflow)
+        halves the result limits and also drops old turns that no
+        checkpoint covers, keeping the last ``keep_recent_messages``.
+        """
+        before = estimate_tokens(messages)
+        stats = {'tokens_before': before, 'removed': 0, 'deduplicated': 0, 'truncated': 0}
+
+        if self.collapse:
+            stats['removed'] += self._collapse_verified(messages)
+        if aggressive:
+            stats['removed'] += self._drop_old_turns(messages)
+        if self.dedupe:
+            stats['deduplicated'] = self._dedupe(messages)
+        stats['truncated'] = self._truncate(messages, divisor=2 if aggressive else 1)
+
+        self.removed_messages += stats['removed']
+        stats['tokens_after'] = estimate_tokens(messages) if any(
+            stats[k] for k in ('removed', 'deduplicated', 'truncated')) else before
+        return stats
+
+    def _tool_uses(self, messages: List[Dict[str, Any]]) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+        """toolUseId -> (message index, toolUse block)"""
+        uses = {}
+        for index, message in enumerate(messages):
+            for block in message.get('content', []):
+                if 'toolUse' in block:
+                    uses[block['toolUse'].get('toolUseId')] = (index, block['toolUse'])
+        return uses
+
+    def _tool_results(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [block['toolResult'] for message in messages
+                for block in message.get('content', []) if 'toolResult' in block]
+
+    def _is_task_message(self, message: Dict[str, Any]) -> bool:
+        return message.get('role') == 'user' and not any(
+            'toolResult' in block for block in message.get('content', []))
+
+    def _remove_range(self, messages: List[Dict[str, Any]], end: int) -> int:
+        """Drop the turns before messages[end], recording any checkpoints made in them
+
+        The latest task prompt before ``end`` stays, as the new first
+        message. That is usually the first message; an agent given several
+        prompts (scripted-step repairs) keeps the one it is working on, and
+        the earlier prompts go with their turns.
+        """
+        if end <= 1 or end >= len(messages) or messages[end].get('role') != 'assistant':
+            return 0
+        anchor = next((i for i in range(end - 1, -1, -1) if self._is_task_message(messages[i])), None)
+        if anchor is None:
+            return 0
+
+        removed = messages[:anchor] + messages[anchor + 1:end]
+        for message in removed:
+            for block in message.get('content', []):
+                tool_use = block.get('toolUse')
+                if tool_use and tool_use.get('name') == CHECKPOINT_TOOL:
+                    step_input = tool_use.get('input') or {}
+                    self.collapsed_steps.append((str(step_input.get('step', '')),
+                                                 str(step_input.get('summary', ''))))
+        messages[:end] = [messages[anchor]]
+        self._write_collapsed_note(messages[0])
+        return len(removed)
+
+    def _write_collapsed_note(self, task_message: Dict[str, Any]):
+        content = [block for block in task_message.get('content', [])
+                   if not block.get('text', '').startswith(COLLAPSED_HEADER)]
+        note = COLLAPSED_HEADER
+        if self.collapsed_steps:
+            note += "\nSub-steps already completed and verified:\n" + "\n".join(
+                f"- {step}: {summary}" for step, summary in self.collapsed_steps)
+        content.append({'text': note})
+        task_message['content'] = content
+
+    def _collapse_verified(self, messages: List[Dict[str, Any]]) -> int:
+        """Drop the turns before the latest successful sub-step checkpoint"""
+        uses = self._tool_uses(messages)
+        latest = None
+        for result in self._tool_results(messages):
+            index, tool_use = uses.get(result.get('toolUseId'), (None, None))
+            if tool_use and tool_use.get('name') == CHECKPOINT_TOOL and result.get('status') == 'success':
+                latest = index if latest is None else max(latest, index)
+        if latest is None:
+            return 0
+        return self._remove_range(messages, latest)
+
+    def _drop_old_turns(self, messages: List[Dict[str, Any]]) -> int:
+        """Drop all but the last ``keep_recent_messages``, starting at an assistant turn"""
+        end = max(1, len(messages) - self.keep_recent_messages)
+        while end < len(messages) and messages[end].get('role') != 'assistant':
+            end += 1
+        if end >= len(messages):
+            return 0
+        return self._remove_range(messages, end)
+
+    def _dedupe(self, messages: List[Dict[str, Any]]) -> int:
+        """Replace results of calls that were later repeated with the same input"""
+        uses = self._tool_uses(messages)
+        results = {result.get('toolUseId'): result for result in self._tool_results(messages)}
+
+        latest: Dict[str, str] = {}
+        for tool_use_id, (_, tool_use) in sorted(uses.items(), key=lambda item: item[1][0]):
+            if tool_use_id in results:
+                key = tool_use.get('name', '') + json.dumps(tool_use.get('input'), sort_keys=True,
+                                                            default=str)
+                latest[key] = tool_use_id
+
+        replaced = 0
+        keep = set(latest.values())
+        for tool_use_id, result in results.items():
+            if tool_use_id in keep or tool_use_id not in uses:
+                continue
+            if result.get('content') != [{'text': SUPERSEDED}]:
+                result['content'] = [{'text': SUPERSEDED}]
+                replaced += 1
+        return replaced
+
+    def _truncate(self, messages: List[Dict[str, Any]], divisor: int = 1) -> int:
+        """Cut oversized tool results, the newest ones less than the rest"""
+        results = self._tool_results(messages)
+        recent = len(results) - self.keep_recent_results
+        truncated = 0
+
+        for position, result in enumerate(results):
+            limit = (self.max_recent_chars if position >= recent else self.max_old_chars) // divisor
+            content = []
+            changed = False
+            for item in result.get('content', []):
+                if 'json' in item:
+                    text = json.dumps(item['json'], default=str)
+                    if len(text) > limit:
+                        item = {'text': text}
+                if 'text' in item and len(item['text']) > limit:
+                    item = {'text': summarize_text(item['text'], limit)}
+                    changed = True
+                content.append(item)
+            if changed:
+                result['content'] = content
+                truncated += 1
+        return truncated
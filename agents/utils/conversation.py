@@ -0,0 +1,90 @@
+"""
+Conversation - strands conversation manager that compacts team agent context
+"""
+
+from typing import Dict, Any, Optional
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+from .context import ContextCompactor
+from .metrics import get_metrics
+
+
+class CompactingConversationManager(ConversationManager):
+    """Runs ``ContextCompactor`` whenever a message is added to the conversation
+
+    Compacting on every added message (not only after the invocation, when
+    strands calls ``apply_management``) keeps each model call within a
+    multi-hour team run small. Estimated token counts before and after are
+    logged to the team log and recorded as metrics.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, team_logger=None):
+        super().__init__()
+        self.removed_message_count = getattr(self, 'removed_message_count', 0)
+        self.compactor = ContextCompactor(settings)
+        self.team_logger = team_logger
+        self.tokens_saved = 0
+        self.peak_tokens = 0
+        self.last_tokens = 0
+
+    def register_hooks(self, registry, **kwargs):
+        from strands.hooks import MessageAddedEvent
+
+        registry.add_callback(MessageAddedEvent, lambda event: self._compact(event.agent))
+
+    def _compact(self, agent, aggressive: bool = False) -> Dict[str, int]:
+        stats = self.compactor.compact(agent.messages, aggressive=aggressive)
+        self.removed_message_count += stats['removed']
+        self.peak_tokens = max(self.peak_tokens, stats['tokens_before'])
+        self.last_tokens = stats['tokens_after']
+
+        saved = stats['tokens_before'] - stats['tokens_after']
+        metrics = get_metrics()
+        metrics.observe('agent_context_tokens', stats['tokens_after'],
+                        buckets=(1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000))
+        if saved > 0:
+            self.tokens_saved += saved
+            metrics.inc('agent_context_tokens_saved_total', saved)
+            if self.team_logger:
+                self.team_logger.info(
+                    "Context compacted: ~%d -> ~%d tokens (%d messages removed, "
+                    "%d repeated results, %d results truncated)",
+                    stats['tokens_before'], stats['tokens_after'], stats['removed'],
+                    stats['deduplicated'], stats['truncated'])
+        return stats
+
+    def apply_management(self, agent, **kwargs):
+        """Compact after each invocation too (covers direct message edits)"""
+        self._compact(agent)
+
+    def reduce_context(self, agent, e: Optional[Exception] = None, **kwargs):
+        """Compact harder after a context overflow; raise if nothing could be removed"""
+        stats = self._compact(agent, aggressive=True)
+        if stats['tokens_after'] >= stats['tokens_before']:
+            raise ContextWindowOverflowException("Unable to reduce the conversation context") from e
+
+    def stats(self) -> Dict[str, int]:
+        """Estimated token counts over the agent's life"""
+        return {
+            'peak_tokens': self.peak_tokens,
+            'current_tokens': self.last_tokens,
+            'tokens_saved': self.tokens_saved,
+            'removed_messages': self.removed_message_count,
+        }
+
+
+def conversation_kwargs(config: Dict, team_logger=None) -> Dict[str, Any]:
+    """``Agent`` keyword arguments installing the compacting manager, if enabled"""
+    settings = config.get('context', {})
+    if not settings.get('compaction', True):
+        return {}
+
+    manager = CompactingConversationManager(settings, team_logger)
+    kwargs: Dict[str, Any] = {'conversation_manager': manager}
+
+    # Newer strands registers the conversation manager's hooks itself
+    if not hasattr(ConversationManager, 'register_hooks'):
+        kwargs['hooks'] = [manager]
+    return kwargs
@@ -0,0 +1,111 @@
+"""
+Durations - Per-team run times learned across workflow runs
+
+Every team that completes in one go has its wall time recorded in
+``durations.file``. The learned estimate (an EWMA by default, or a
+percentile of the recent runs) replaces the hand-written
+``duration_estimate`` for critical-path priorities, the dry-run makespan
+projection and the live ETA once a team has ``min_samples`` runs.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+ESTIMATORS = ('ewma', 'p50', 'p75', 'p90')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class DurationHistory:
+    """Learned team durations (hours), persisted as a small JSON file
+
+    Configured from the ``durations`` section: ``learn``, ``file``,
+    ``alpha`` (EWMA weight of the newest run), ``window`` (recent runs kept
+    per team), ``estimator`` (``ewma`` or ``p50``/``p75``/``p90``) and
+    ``min_samples``.
+    """
+
+    def __init__(self, config: Dict):
+        settings = config.get('durations', {})
+        self.enabled = settings.get('learn', True)
+        self.path = Path(config['project']['base_path']) / settings.get(
+            'file', 'state/durations.json')
+        self.alpha = settings.get('alpha', 0.3)
+        self.window = settings.get('window', 20)
+        self.estimator = settings.get('estimator', 'ewma')
+        self.min_samples = settings.get('min_samples', 1)
+        if self.estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown duration estimator: {self.estimator} "
+                             f"(expected one of {', '.join(ESTIMATORS)})")
+
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.teams = json.load(f).get('teams', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to load learned durations: {e}")
+
+    def _save(self):
+        """Write the history atomically"""
+        tmp_file = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump({'teams': self.teams}, f, indent=2)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            print(f"Warning: Failed to save learned durations: {e}")
+
+    def record(self, team_id: str, hours: float):
+        """Fold one completed run of a team into its estimate"""
+        if not self.enabled or hours <= 0:
+            return
+
+        with self._lock:
+            entry = self.teams.setdefault(team_id, {'ewma': hours, 'samples': 0, 'recent': []})
+            entry['ewma'] = self.alpha * hours + (1 - self.alpha) * entry['ewma']
+            entry['samples'] += 1
+            entry['recent'] = (entry['recent'] + [round(hours, 4)])[-self.window:]
+            entry['updated'] = datetime.now().isoformat()
+            self._save()
+
+    def estimate(self, team_id: str) -> Optional[float]:
+        """Learned duration in hours, or None until ``min_samples`` runs exist"""
+        entry = self.teams.get(team_id)
+        if not self.enabled or not entry or entry['samples'] < max(1, self.min_samples):
+            return None
+        if self.estimator == 'ewma':
+            return entry['ewma']
+        return percentile(entry['recent'], float(self.estimator[1:]))
+
+    def samples(self, team_id: str) -> int:
+        """Number of runs recorded for a team"""
+        return self.teams.get(team_id, {}).get('samples', 0)
+
+    def estimates(self, teams: Dict[str, Dict]) -> Dict[str, float]:
+        """Duration of every team: learned where known, else ``duration_estimate``"""
+        result = {}
+        for team_id, team_config in teams.items():
+            learned = self.estimate(team_id)
+            result[team_id] = learned if learned is not None else float(
+                team_config.get('duration_estimate', 1))
+        return result
@@ -0,0 +1,83 @@
+"""
+Events - In-process event bus for team state transitions
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable, Iterable
+
+
+# Team lifecycle states, in the order a healthy team moves through them
+QUEUED = "queued"
+STARTED = "started"
+VERIFIED = "verified"
+FAILED = "failed"
+DONE = "done"
+
+TEAM_STATES = (QUEUED, STARTED, VERIFIED, FAILED, DONE)
+
+
+class TeamEvent:
+    """A single team state transition"""
+
+    def __init__(self, team_id: str, state: str, data: Optional[Dict[str, Any]] = None):
+        if state not in TEAM_STATES:
+            raise ValueError(f"Unknown team state: {state}")
+
+        self.team_id = team_id
+        self.state = state
+        self.data = data or {}
+        self.timestamp = datetime.now().isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the event for logs and checkpoints"""
+        return {
+            'team_id': self.team_id,
+            'state': self.state,
+            'timestamp': self.timestamp,
+            **self.data
+        }
+
+    def __repr__(self) -> str:
+        return f"TeamEvent({self.team_id!r}, {self.state!r})"
+
+
+class EventBus:
+    """Synchronous publish/subscribe bus shared by the orchestrator components
+
+    Subscribers run on the publishing thread, in subscription order, so a
+    transition is fully applied (counters, progress, checkpoints) by the time
+    ``publish`` returns. A failing subscriber never blocks the others.
+    """
+
+    def __init__(self):
+        self._subscribers: List[tuple] = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, callback: Callable[[TeamEvent], None],
+                  states: Optional[Iterable[str]] = None):
+        """Register a callback, optionally limited to specific states"""
+        with self._lock:
+            self._subscribers.append((callback, frozenset(states) if states else None))
+
+    def unsubscribe(self, callback: Callable[[TeamEvent], None]):
+        """Remove a previously registered callback"""
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+    def publish(self, team_id: str, state: str, **data) -> TeamEvent:
+        """Publish a team transition to every matching subscriber"""
+        event = TeamEvent(team_id, state, data)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+            for callback, states in subscribers:
+                if states is not None and event.state not in states:
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Warning: Event subscriber failed on {event}: {e}")
+
+        return event
@@ -0,0 +1,71 @@
+"""
+Fingerprint - Content hashes of team inputs for incremental re-execution
+"""
+
+from typing import Dict, Any, List, Iterable
+
+from .cache import make_key, hash_file
+from .step_docs import resolve_step_file
+
+
+# Global settings that change what every team does on the host
+RELEVANT_CONFIG_KEYS = (
+    ('ssh', 'host'),
+    ('ssh', 'user'),
+    ('ssh', 'remote_project_path'),
+)
+
+# Team settings that only affect scheduling, not the work itself
+IGNORED_TEAM_KEYS = ('duration_estimate', 'parallel_with', 'timeout_hours', 'llm_cache',
+                     'scripted_steps')
+
+
+def _config_value(config: Dict, path: Iterable[str]) -> Any:
+    value: Any = config
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compute_fingerprints(config: Dict, order: List[str],
+                         system_prompts: Dict[str, str]) -> Dict[str, str]:
+    """Fingerprint every team in topological ``order``
+
+    A team's fingerprint covers its step file contents, its system prompt,
+    its own config entry (minus scheduling-only keys), the relevant global
+    config keys and the fingerprints of its dependencies, so a change
+    anywhere upstream changes every downstream fingerprint too.
+    """
+    teams = config['teams']
+    global_inputs = {'.'.join(path): _config_value(config, path) for path in RELEVANT_CONFIG_KEYS}
+    fingerprints: Dict[str, str] = {}
+
+    for team_id in order:
+        team_config = teams[team_id]
+        team_inputs = {k: v for k, v in team_config.items() if k not in IGNORED_TEAM_KEYS}
+
+        fingerprints[team_id] = make_key(
+            team_id,
+            team_inputs,
+            hash_file(resolve_step_file(config, team_config['step_file'])),
+            system_prompts.get(team_id, ""),
+            global_inputs,
+            [fingerprints[dep] for dep in team_config.get('dependencies', [])],
+        )
+
+    return fingerprints
+
+
+def changed_teams(current: Dict[str, str], recorded: Dict[str, str],
+                  candidates: Iterable[str]) -> List[str]:
+    """Candidates whose recorded fingerprint differs from the current one
+
+    Teams with no recorded fingerprint (state from before fingerprints were
+    tracked) are not considered changed.
+    """
+    return [
+        team_id for team_id in candidates
+        if team_id in recorded and recorded[team_id] != current.get(team_id)
+    ]
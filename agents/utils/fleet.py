@@ -0,0 +1,222 @@
+"""
+Fleet - Run the workflow on many Hetzner nodes at once
+
+The ``hosts`` inventory in config lists the nodes. Each host gets its own
+orchestrator built from a derived config with its SSH settings, state file,
+learned durations, logs and metrics isolated under ``state/hosts/<name>/`` and
+``logs/hosts/<name>/``. The ``FleetScheduler`` runs those orchestrators
+concurrently in waves (parallel, rolling or canary) while a shared
+semaphore caps the number of teams running across the whole fleet.
+"""
+
+import copy
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+from .state_manager import read_status
+
+
+STRATEGIES = ('parallel', 'rolling', 'canary')
+
+# Inventory keys that are host metadata rather than ssh overrides
+HOST_META_KEYS = ('name', 'canary', 'ssh')
+
+# Host statuses reported by the fleet scheduler
+HOST_PENDING = 'pending'
+HOST_RUNNING = 'running'
+HOST_COMPLETE = 'complete'
+HOST_FAILED = 'failed'
+HOST_SKIPPED = 'skipped'
+
+
+def load_inventory(config: Dict) -> List[Dict[str, Any]]:
+    """Normalised ``hosts`` entries; empty when no inventory is configured
+
+    An entry may be a plain name/alias string or a mapping with ``name``,
+    optional ssh overrides (``host``, ``user``, ``remote_project_path``, ...
+    or a nested ``ssh`` block) and ``canary: true``.
+    """
+    inventory = []
+    for entry in config.get('hosts') or []:
+        if isinstance(entry, str):
+            entry = {'name': entry}
+        entry = dict(entry)
+        if 'name' not in entry:
+            raise ValueError(f"Host inventory entry without a name: {entry}")
+        entry.setdefault('host', entry['name'])
+        inventory.append(entry)
+
+    names = [entry['name'] for entry in inventory]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate hosts in inventory: {', '.join(sorted(duplicates))}")
+    return inventory
+
+
+def host_config(config: Dict, entry: Dict[str, Any]) -> Dict:
+    """Derive the config for one host with isolated state, logs and SSH settings"""
+    name = entry['name']
+    derived = copy.deepcopy(config)
+    derived.pop('hosts', None)
+
+    ssh = derived.setdefault('ssh', {})
+    ssh.update({k: v for k, v in entry.items() if k not in HOST_META_KEYS})
+    ssh.update(entry.get('ssh', {}))
+
+    host_dir = f"hosts/{name}"
+    derived.setdefault('fleet', {})['host'] = name
+
+    state = derived.setdefault('state', {})
+    state['state_file'] = f"state/{host_dir}/workflow_state.json"
+    derived.setdefault('durations', {})['file'] = f"state/{host_dir}/durations.json"
+
+    logging_config = derived.setdefault('logging', {})
+    logging_config['file'] = f"logs/{host_dir}/orchestrator.log"
+    logging_config['team_log_dir'] = f"logs/{host_dir}"
+
+    # The fleet scheduler owns the process-wide metrics endpoint and trace
+    derived.setdefault('monitoring', {})['enable_metrics'] = False
+    derived.setdefault('advanced', {})['enable_profiling'] = False
+
+    return derived
+
+
+def plan_waves(inventory: List[Dict[str, Any]], fleet_config: Dict) -> List[List[str]]:
+    """Group hosts into waves; a wave starts once the previous one finished
+
+    - ``parallel``: one wave with every host
+    - ``rolling``: waves of ``batch_size`` hosts
+    - ``canary``: hosts marked ``canary: true`` (or the first
+      ``canary_count``) first, then everything else
+    """
+    strategy = fleet_config.get('strategy', 'parallel')
+    names = [entry['name'] for entry in inventory]
+    if not names:
+        return []
+
+    if strategy == 'parallel':
+        return [names]
+
+    if strategy == 'rolling':
+        size = max(1, fleet_config.get('batch_size', 1))
+        return [names[i:i + size] for i in range(0, len(names), size)]
+
+    if strategy == 'canary':
+        canaries = [entry['name'] for entry in inventory if entry.get('canary')]
+        if not canaries:
+            canaries = names[:max(1, fleet_config.get('canary_count', 1))]
+        rest = [name for name in names if name not in canaries]
+        return [canaries, rest] if rest else [canaries]
+
+    raise ValueError(f"Unknown fleet strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+
+def fleet_status(config: Dict) -> List[Dict[str, Any]]:
+    """Per-host progress read straight from each host's state file"""
+    rows = []
+    for entry in load_inventory(config):
+        status = read_status(host_config(config, entry))
+        rows.append({
+            'host': entry['name'],
+            'address': entry['host'],
+            'completed': len(status['completed']),
+            'failed': status['failed'],
+            'total': status['total'],
+            'running': status['running'],
+            'last_event': status['last_event'],
+            'last_update': status['last_update'],
+        })
+    return rows
+
+
+class FleetScheduler:
+    """Runs one orchestrator per host under fleet-wide limits
+
+    ``create_orchestrator(config, team_slots)`` builds the per-host
+    orchestrator from a derived host config; ``team_slots`` is the shared
+    semaphore every team must hold while it runs (None when uncapped).
+    ``run`` calls ``action(orchestrator)`` on each host and expects the
+    usual result dict with a ``status`` key.
+    """
+
+    def __init__(self, config: Dict, create_orchestrator: Callable[[Dict, Any], Any],
+                 hosts: Optional[List[str]] = None):
+        self.config = config
+        self.fleet_config = config.get('fleet', {})
+        self.create_orchestrator = create_orchestrator
+
+        self.inventory = load_inventory(config)
+        if hosts:
+            unknown = set(hosts) - {entry['name'] for entry in self.inventory}
+            if unknown:
+                raise ValueError(f"Unknown hosts: {', '.join(sorted(unknown))}")
+            self.inventory = [entry for entry in self.inventory if entry['name'] in hosts]
+
+        self.waves = plan_waves(self.inventory, self.fleet_config)
+        self.max_parallel_hosts = self.fleet_config.get('max_parallel_hosts') or len(self.inventory) or 1
+        cap = self.fleet_config.get('max_parallel_teams')
+        self.team_slots = threading.BoundedSemaphore(cap) if cap else None
+
+        self.status: Dict[str, str] = {entry['name']: HOST_PENDING for entry in self.inventory}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.orchestrators: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _run_host(self, entry: Dict[str, Any], action: Callable[[Any], Dict[str, Any]],
+                  on_host: Optional[Callable[[str, str], None]]) -> bool:
+        name = entry['name']
+        self._set_status(name, HOST_RUNNING, on_host)
+        start = time.time()
+        try:
+            orchestrator = self.create_orchestrator(host_config(self.config, entry), self.team_slots)
+            self.orchestrators[name] = orchestrator
+            result = action(orchestrator)
+        except Exception as e:
+            result = {'status': 'error', 'error': str(e)}
+
+        result['duration_hours'] = (time.time() - start) / 3600
+        ok = result.get('status') in ('complete', 'dry_run_complete') and not result.get('failed_teams')
+        with self._lock:
+            self.results[name] = result
+        self._set_status(name, HOST_COMPLETE if ok else HOST_FAILED, on_host)
+        return ok
+
+    def _set_status(self, name: str, status: str, on_host: Optional[Callable[[str, str], None]]):
+        with self._lock:
+            self.status[name] = status
+        if on_host:
+            on_host(name, status)
+
+    def run(self, action: Callable[[Any], Dict[str, Any]],
+            on_host: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """Run ``action`` on every host, wave by wave
+
+        With ``fleet.stop_on_host_failure`` (the default), a failed host stops
+        later waves from starting; hosts in the current wave finish.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        stop_on_failure = self.fleet_config.get('stop_on_host_failure', True)
+        by_name = {entry['name']: entry for entry in self.inventory}
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel_hosts,
+                                thread_name_prefix='fleet') as executor:
+            for wave in self.waves:
+                if stop_on_failure and HOST_FAILED in self.status.values():
+                    for name in wave:
+                        self._set_status(name, HOST_SKIPPED, on_host)
+                    continue
+
+                futures = [executor.submit(self._run_host, by_name[name], action, on_host)
+                           for name in wave]
+                for future in futures:
+                    future.result()
+
+        return {
+            'status': 'complete' if all(s == HOST_COMPLETE for s in self.status.values()) else 'failed',
+            'duration_hours': (time.time() - start) / 3600,
+            'hosts': dict(self.status),
+            'results': self.results,
+        }
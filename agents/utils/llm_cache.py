@@ -0,0 +1,125 @@
+"""
+LLM Cache - Content-addressed response cache wrapped around provider models
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, AsyncGenerator
+
+from strands.models import Model
+
+from .cache import DiskCache, make_key
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Canonical form of a conversation for cache keys
+
+    Tool use ids are provider-generated and differ between otherwise
+    identical runs, so they are replaced by their order of appearance.
+    Text is stripped of surrounding whitespace.
+    """
+    id_map: Dict[str, str] = {}
+
+    def _normalize(value: Any, key: str = "") -> Any:
+        if isinstance(value, dict):
+            return {k: _normalize(v, k) for k, v in sorted(value.items())}
+        if isinstance(value, list):
+            return [_normalize(v) for v in value]
+        if key == 'toolUseId' and isinstance(value, str):
+            return id_map.setdefault(value, f"tool_{len(id_map)}")
+        if key == 'text' and isinstance(value, str):
+            return value.strip()
+        return value
+
+    return _normalize(json.loads(json.dumps(messages, default=str)))
+
+
+class CachingModel(Model):
+    """Model wrapper that replays recorded streams for identical requests
+
+    The key covers the provider, the model configuration (model id,
+    temperature, max_tokens, ...), system prompt, tool specs and the
+    normalized message history. Only streams that complete normally are
+    stored. Use ``cache=False`` in ``create_model`` for steps whose output
+    must not be replayed. With ``replay`` off (one wrapper per agent, so
+    this is per agent) every request goes to the provider and the fresh
+    streams replace the recorded ones; a team retried after a failure uses
+    this so it does not replay the decisions that failed.
+    """
+
+    def __init__(self, model: Model, provider: str, cache: DiskCache, replay: bool = True):
+        self.model = model
+        self.provider = provider
+        self.cache = cache
+        self.replay = replay
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def cache_key(self, messages: List[Dict[str, Any]], tool_specs: Optional[List] = None,
+                  system_prompt: Optional[str] = None) -> str:
+        """Content hash of everything that determines the response"""
+        return make_key(
+            self.provider,
+            self.get_config(),
+            system_prompt,
+            tool_specs or [],
+            normalize_messages(messages),
+        )
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None,
+                     **kwargs) -> AsyncGenerator[Any, None]:
+        """Stream a response, serving it from cache when possible"""
+        key = self.cache_key(messages, tool_specs, system_prompt)
+        cached = self.cache.get(key) if self.replay else None
+        if cached is not None:
+            for event in cached:
+                yield event
+            return
+
+        recorded = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            recorded.append(event)
+            yield event
+
+        self.cache.set(key, recorded)
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Structured output is passed through uncached"""
+        async for event in self.model.structured_output(output_model, prompt,
+                                                         system_prompt=system_prompt, **kwargs):
+            yield event
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+_llm_caches: Dict[Path, DiskCache] = {}
+_llm_caches_lock = threading.Lock()
+
+
+def get_llm_cache(config: Dict) -> Optional[DiskCache]:
+    """Return the shared response store from ``models.cache``, or None if disabled"""
+    cache_config = config.get('models', {}).get('cache', {})
+    if not cache_config.get('enabled', False):
+        return None
+
+    cache_dir = Path(config['project']['base_path']) / config.get('advanced', {}).get('cache_dir', 'cache')
+    ttl_hours = cache_config.get('ttl_hours')
+    max_mb = cache_config.get('max_mb', 512)
+
+    with _llm_caches_lock:
+        if cache_dir not in _llm_caches:
+            _llm_caches[cache_dir] = DiskCache(
+                cache_dir,
+                'llm',
+                ttl=ttl_hours * 3600 if ttl_hours else None,
+                max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+            )
+        return _llm_caches[cache_dir]
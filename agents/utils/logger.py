@@ -1,40 +1,288 @@
 """
 Logger - Enhanced logging for workflow orchestration
+
+All records go through a bounded in-memory queue to a single background
+listener thread that does the formatting and file I/O, so logging from a
+team agent never blocks on disk. When the queue is full, records are
+dropped and counted instead of stalling the caller. Files are written as
+JSON lines carrying ``team_id``, ``phase`` and ``step`` and are rotated by
+size or time, with gzip compression of rotated files.
+
+In fleet mode every host's records also carry ``host`` and are routed to
+that host's own orchestrator and team log files.
 """
 
+import atexit
+import gzip
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Any, Optional
 from datetime import datetime
 
+try:
+    from pythonjsonlogger import jsonlogger
+except ImportError:  # optional - JsonFormatter below is used instead
+    jsonlogger = None
+
+
+CONTEXT_FIELDS = ('host', 'team_id', 'phase', 'step')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the team context fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _create_json_formatter() -> logging.Formatter:
+    """python-json-logger formatter when installed, else the built-in one"""
+    if jsonlogger is None:
+        return JsonFormatter()
+    return jsonlogger.JsonFormatter(
+        '%(asctime)s %(levelname)s %(name)s %(message)s',
+        rename_fields={'asctime': 'timestamp', 'levelname': 'level', 'name': 'logger'},
+    )
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress a rotated log file"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _create_file_handler(path: Path, log_config: Dict) -> logging.Handler:
+    """Rotating file handler configured from ``logging.rotation``"""
+    rotation = log_config.get('rotation', {})
+    backup_count = rotation.get('backup_count', 5)
+
+    if rotation.get('when'):
+        handler: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=rotation['when'], backupCount=backup_count, delay=True
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=rotation.get('max_bytes', 50 * 1024 * 1024),
+            backupCount=backup_count, delay=True
+        )
+
+    if rotation.get('compress', True):
+        handler.namer = lambda name: name + '.gz'
+        handler.rotator = _gzip_rotator
+
+    if log_config.get('json_output', True):
+        handler.setFormatter(_create_json_formatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        ))
+    return handler
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: full queue means the record is dropped
+
+    Unlike the stdlib handler, the message is not formatted on the calling
+    thread; the record keeps its ``msg``/``args`` and the listener formats
+    it. Records carrying exception info are still prepared eagerly so the
+    traceback doesn't outlive the caller's frame.
+    """
+
+    def __init__(self, log_queue: queue.Queue, pipeline: 'LogPipeline'):
+        super().__init__(log_queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            return super().prepare(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.pipeline.record_dropped()
+
+
+class _BlockingSentinelListener(logging.handlers.QueueListener):
+    """Listener whose stop sentinel waits for room in a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class _RoutingHandler(logging.Handler):
+    """Runs on the listener thread; sends team records to per-team files"""
+
+    def __init__(self, pipeline: 'LogPipeline'):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        host = getattr(record, 'host', None)
+        if record.name.startswith('Team.'):
+            team_id = getattr(record, 'team_id', None) or record.name.rsplit('.', 1)[-1]
+            handlers = [self.pipeline.team_handler(team_id, host)]
+        else:
+            handlers = self.pipeline.orchestrator_handlers.get(host, [])
+
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+class LogPipeline:
+    """Bounded queue plus background listener shared by every logger"""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.log_config = config.get('logging', {})
+        self.base_path = Path(config['project']['base_path'])
+
+        self.queue: queue.Queue = queue.Queue(maxsize=self.log_config.get('queue_size', 10000))
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+        # Keyed by fleet host; None is the single-host orchestrator
+        self.orchestrator_handlers: Dict[Optional[str], list] = {}
+        self.team_log_dirs: Dict[Optional[str], Path] = {}
+        # Least recently used team files are closed beyond this many, so
+        # thousands of teams don't exhaust file descriptors
+        self.max_open_team_files = self.log_config.get('max_open_team_files', 256)
+        self._team_handlers: 'OrderedDict[tuple, logging.Handler]' = OrderedDict()
+
+        self.handler = BoundedQueueHandler(self.queue, self)
+        self.listener = _BlockingSentinelListener(self.queue, _RoutingHandler(self))
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def record_dropped(self):
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def team_handler(self, team_id: str, host: Optional[str] = None) -> logging.Handler:
+        """Per-team (and per-host) log file handler, opened on first use
+
+        Only called from the listener thread. Closed handlers reopen their
+        file in append mode if the team logs again.
+        """
+        key = (host, team_id)
+        handler = self._team_handlers.get(key)
+        if handler is not None:
+            self._team_handlers.move_to_end(key)
+            return handler
+
+        log_dir = self.team_log_dirs.get(host, self.base_path / 'logs')
+        log_file = log_dir / f"team_{team_id}.log"
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        handler = _create_file_handler(log_file, self.log_config)
+        handler.setLevel(logging.DEBUG)
+        self._team_handlers[key] = handler
+
+        while self.max_open_team_files and len(self._team_handlers) > self.max_open_team_files:
+            _, evicted = self._team_handlers.popitem(last=False)
+            evicted.close()
+        return handler
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and drop counter"""
+        return {
+            'queued': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'dropped': self.dropped,
+        }
+
+    def stop(self):
+        """Flush queued records and close all files"""
+        if self.listener._thread is None:
+            return
+        self.listener.stop()
+        for handlers in self.orchestrator_handlers.values():
+            for handler in handlers:
+                handler.close()
+        for handler in self._team_handlers.values():
+            handler.close()
+
+
+_pipelines: Dict[Path, LogPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_log_pipeline(config: Dict) -> LogPipeline:
+    """Return the process-wide logging pipeline for a project"""
+    base_path = Path(config['project']['base_path'])
+    with _pipelines_lock:
+        if base_path not in _pipelines:
+            _pipelines[base_path] = LogPipeline(config)
+        return _pipelines[base_path]
+
+
+class _HostFilter(logging.Filter):
+    """Tags records from a fleet host's loggers with the host name"""
+
+    def __init__(self, host: str):
+        super().__init__()
+        self.host = host
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.host = self.host
+        return True
+
 
 def setup_logger(config: Dict) -> logging.Logger:
     """Setup and configure logger based on config"""
     log_config = config.get('logging', {})
+    pipeline = get_log_pipeline(config)
+    host = config.get('fleet', {}).get('host')
 
     # Create logs directory
     base_path = Path(config['project']['base_path'])
     log_file = base_path / log_config.get('file', 'logs/orchestrator.log')
     log_file.parent.mkdir(parents=True, exist_ok=True)
+    pipeline.team_log_dirs[host] = base_path / log_config.get('team_log_dir', 'logs')
 
     # Create logger
-    logger = logging.getLogger('HypervisorOrchestrator')
+    logger = logging.getLogger(f'HypervisorOrchestrator.{host}' if host else 'HypervisorOrchestrator')
     logger.setLevel(getattr(logging, log_config.get('level', 'INFO')))
+    logger.propagate = False
 
     # Clear existing handlers
     logger.handlers.clear()
+    logger.filters.clear()
+    for handler in pipeline.orchestrator_handlers.pop(host, []):
+        handler.close()
+    handlers = pipeline.orchestrator_handlers.setdefault(host, [])
+    if host:
+        logger.addFilter(_HostFilter(host))
 
-    # Create formatters
-    formatter = logging.Formatter(
-        log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    )
-
-    # File handler
-    file_handler = logging.FileHandler(log_file)
+    # File handler (written by the listener thread)
+    file_handler = _create_file_handler(log_file, log_config)
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
 
     # Console handler (if enabled)
     if log_config.get('console_output', True):
@@ -43,63 +291,79 @@ def setup_logger(config: Dict) -> logging.Logger:
 
         if log_config.get('rich_formatting', False):
             # Use simple formatter for console when using rich
-            console_formatter = logging.Formatter('%(message)s')
-            console_handler.setFormatter(console_formatter)
+            console_handler.setFormatter(logging.Formatter('%(message)s'))
         else:
-            console_handler.setFormatter(formatter)
+            console_handler.setFormatter(logging.Formatter(
+                log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            ))
+
+        handlers.append(console_handler)
 
-        logger.addHandler(console_handler)
+    logger.addHandler(pipeline.handler)
 
-    logger.info(f"Logger initialized - Level: {log_config.get('level', 'INFO')}")
-    logger.info(f"Log file: {log_file}")
+    logger.info("Logger initialized - Level: %s", log_config.get('level', 'INFO'))
+    logger.info("Log file: %s", log_file)
 
     return logger
 
 
 class TeamLogger:
-    """Logger for individual team agents"""
+    """Logger for individual team agents
 
-    def __init__(self, team_id: str, config: Dict):
+    Messages use lazy ``%``-style arguments, e.g.
+    ``team_logger.info("Ran %s in %.1fs", cmd, duration)``; they are only
+    formatted on the listener thread, and not at all if the level is off.
+    """
+
+    def __init__(self, team_id: str, config: Dict, phase: Optional[int] = None):
         """Initialize team-specific logger"""
         self.team_id = team_id
         self.config = config
+        self.phase = phase if phase is not None else config.get('teams', {}).get(team_id, {}).get('phase')
+        self.step: Optional[str] = None
+        self.host = config.get('fleet', {}).get('host')
 
-        # Create team-specific log file
-        base_path = Path(config['project']['base_path'])
-        log_file = base_path / f"logs/team_{team_id}.log"
-        log_file.parent.mkdir(parents=True, exist_ok=True)
+        pipeline = get_log_pipeline(config)
+        if self.host not in pipeline.team_log_dirs:
+            pipeline.team_log_dirs[self.host] = (Path(config['project']['base_path']) /
+                                                 config.get('logging', {}).get('team_log_dir', 'logs'))
 
         # Create logger
-        self.logger = logging.getLogger(f'Team.{team_id}')
+        self.logger = logging.getLogger(f'Team.{self.host}.{team_id}' if self.host else f'Team.{team_id}')
         self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
 
-        # Clear existing handlers
-        self.logger.handlers.clear()
+        if pipeline.handler not in self.logger.handlers:
+            self.logger.handlers.clear()
+            self.logger.addHandler(pipeline.handler)
 
-        # File handler
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+    def set_step(self, step: Optional[str]):
+        """Tag subsequent records with the sub-step being worked on"""
+        self.step = step
+
+    def _log(self, level: int, message: str, args: tuple, fields: Dict[str, Any]):
+        if not self.logger.isEnabledFor(level):
+            return
+        extra = {'host': self.host, 'team_id': self.team_id, 'phase': self.phase,
+                 'step': self.step, **fields}
+        self.logger.log(level, f"[{self.team_id}] {message}", *args, extra=extra)
 
-    def info(self, message: str):
+    def info(self, message: str, *args, **fields):
         """Log info message"""
-        self.logger.info(f"[{self.team_id}] {message}")
+        self._log(logging.INFO, message, args, fields)
 
-    def debug(self, message: str):
+    def debug(self, message: str, *args, **fields):
         """Log debug message"""
-        self.logger.debug(f"[{self.team_id}] {message}")
+        self._log(logging.DEBUG, message, args, fields)
 
-    def warning(self, message: str):
+    def warning(self, message: str, *args, **fields):
         """Log warning message"""
-        self.logger.warning(f"[{self.team_id}] {message}")
+        self._log(logging.WARNING, message, args, fields)
 
-    def error(self, message: str):
+    def error(self, message: str, *args, **fields):
         """Log error message"""
-        self.logger.error(f"[{self.team_id}] {message}")
+        self._log(logging.ERROR, message, args, fields)
 
-    def critical(self, message: str):
+    def critical(self, message: str, *args, **fields):
         """Log critical message"""
-        self.logger.critical(f"[{self.team_id}] {message}")
+        self._log(logging.CRITICAL, message, args, fields)
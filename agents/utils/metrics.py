@@ -0,0 +1,371 @@
+"""
+Metrics - Process-wide counters, gauges and histograms for the orchestrator
+
+Instrumented code records into the shared registry from ``get_metrics()``.
+The registry is written to ``monitoring.metrics_file`` as JSON and can be
+served in Prometheus text format on ``monitoring.prometheus_port`` so the
+Charlie monitoring stack can scrape the orchestrator itself.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+
+PREFIX = 'hypervisor_orchestrator_'
+
+# Seconds; SSH commands range from sub-second probes to long package installs
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ''
+    body = ','.join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return '{' + body + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(upper bound, cumulative count) pairs ending with +Inf"""
+        result, total = [], 0
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else repr(float(bound)), total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'buckets': dict(self.cumulative()),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms"""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str):
+        """Set the HELP text shown in the Prometheus output"""
+        self.help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                **labels):
+        """Record one observation in a histogram"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def record_team(self, team_id: str, status: str, seconds: float,
+                    estimate_hours: Optional[float] = None, host: Optional[str] = None):
+        """Record a team's wall time against its ``duration_estimate``"""
+        entry = {'id': team_id, 'status': status, 'duration': round(seconds / 3600, 4),
+                 'duration_seconds': round(seconds, 3)}
+        labels = {'team': team_id}
+        if host:
+            entry['host'] = host
+            labels['host'] = host
+        if estimate_hours:
+            entry['estimate'] = estimate_hours
+            entry['estimate_ratio'] = round(seconds / (estimate_hours * 3600), 4)
+
+        with self._lock:
+            self.teams[f"{host}/{team_id}" if host else team_id] = entry
+        self.set_gauge('team_duration_seconds', seconds, **labels)
+        if estimate_hours:
+            self.set_gauge('team_estimate_seconds', estimate_hours * 3600, **labels)
+        self.inc('teams_total', status=status)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.teams.clear()
+            self.started = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable snapshot"""
+        def flatten(series: Dict[str, Dict[LabelKey, Any]], convert) -> Dict[str, List[Dict]]:
+            return {
+                name: [{'labels': dict(key), 'value': convert(value)} for key, value in values.items()]
+                for name, values in series.items()
+            }
+
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'teams': list(self.teams.values()),
+                'counters': flatten(self.counters, lambda v: v),
+                'gauges': flatten(self.gauges, lambda v: v),
+                'histograms': flatten(self.histograms, lambda h: h.to_dict()),
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            full = PREFIX + name
+            if name in self.help:
+                lines.append(f'# HELP {full} {self.help[name]}')
+            lines.append(f'# TYPE {full} {kind}')
+            return full
+
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = header(name, 'counter')
+                for key, value in series.items():
+                    lines.append(f'{full}{_format_labels(key)} {value}')
+
+            for name, series in sorted(self.gauges.items()):
+                full = header(name, 'gauge')
+                for key, value in series.items():
+                    lines.append(f'{full}{_format_labels(key)} {value}')
+
+            for name, series in sorted(self.histograms.items()):
+                full = header(name, 'histogram')
+                for key, hist in series.items():
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{full}_bucket{_format_labels(key, {"le": bound})} {count}')
+                    lines.append(f'{full}_sum{_format_labels(key)} {hist.sum}')
+                    lines.append(f'{full}_count{_format_labels(key)} {hist.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: Path, **extra):
+        """Atomically write the snapshot (plus ``extra`` fields) to a file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {**self.to_dict(), **extra}
+
+        tmp_file = path.with_suffix(path.suffix + '.tmp')
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(tmp_file, path)
+        except OSError as e:
+            print(f"Warning: Failed to write metrics: {e}")
+
+
+class MetricsServer:
+    """Serves ``/metrics`` from a registry on a background thread"""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = '127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] != '/metrics':
+                    handler.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        name='metrics-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ResourceSampler:
+    """Samples process CPU and RSS into gauges (requires psutil)"""
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 5.0):
+        import psutil
+
+        self.registry = registry
+        self.interval = interval
+        self.process = psutil.Process()
+        self.process.cpu_percent(None)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-sampler', daemon=True)
+        self._thread.start()
+
+    def sample(self):
+        memory = self.process.memory_info()
+        self.registry.set_gauge('process_cpu_percent', self.process.cpu_percent(None))
+        self.registry.set_gauge('process_resident_memory_bytes', memory.rss)
+        self.registry.set_gauge('process_threads', self.process.num_threads())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval)
+        self.sample()
+
+
+_registry = MetricsRegistry()
+_registry.describe('ssh_command_seconds', 'Wall time of remote commands')
+_registry.describe('ssh_commands_total', 'Remote commands by result (ok, error, timeout, connection_lost, unreachable)')
+_registry.describe('ssh_retries_total', 'Remote command attempts retried after a connection error')
+_registry.describe('ssh_output_stalls_total', 'Times command output reading paused for a slow consumer')
+_registry.describe('llm_requests_total', 'Model requests by provider and result')
+_registry.describe('llm_request_seconds', 'Model request latency')
+_registry.describe('llm_tokens_total', 'Tokens reported by the provider')
+_registry.describe('llm_throttled_total', 'Model requests rejected by provider rate limits')
+_registry.describe('agent_context_tokens', 'Estimated agent conversation size after compaction')
+_registry.describe('agent_context_tokens_saved_total', 'Estimated tokens removed from agent conversations')
+_registry.describe('team_duration_seconds', 'Wall time of the last run of each team')
+_registry.describe('team_estimate_seconds', 'duration_estimate of each team')
+_registry.describe('scripted_steps_total', 'Step-doc tasks run without the model, by result')
+_registry.describe('scripted_step_repairs_total', 'Failed step-doc tasks handed to the team agent, by result')
+_registry.describe('prefetch_artifacts_total', 'Prefetched artifacts by result (cached, downloaded, failed)')
+_registry.describe('prefetch_seconds', 'Wall time of artifact prefetches')
+_registry.describe('ssh_upload_seconds', 'Wall time of file uploads to hosts')
+_registry.describe('ssh_upload_bytes_total', 'Bytes uploaded to hosts')
+_registry.describe('artifact_store_total', 'Artifact store lookups by result (hit, miss, download, corrupt)')
+_registry.describe('artifact_push_total', 'Artifacts pushed to hosts by result (cached, uploaded)')
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry"""
+    return _registry
+
+
+class MetricsReporter:
+    """Starts and stops the configured metrics outputs for one workflow run
+
+    The metrics file is rewritten every ``flush_interval_seconds`` while the
+    run is going (with ``"partial": true``), so a crash or kill loses at
+    most one interval of metrics.
+    """
+
+    def __init__(self, config: Dict, registry: Optional[MetricsRegistry] = None):
+        self.config = config
+        self.monitoring = config.get('monitoring', {})
+        self.registry = registry or get_metrics()
+        self.enabled = self.monitoring.get('enable_metrics', False)
+        self.metrics_file = Path(config['project']['base_path']) / self.monitoring.get(
+            'metrics_file', 'logs/metrics.json')
+        self.flush_interval = self.monitoring.get('flush_interval_seconds', 60)
+        self.server: Optional[MetricsServer] = None
+        self.sampler: Optional[ResourceSampler] = None
+        self.started: Optional[float] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flushing = threading.Event()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        """Start the Prometheus endpoint and resource sampler if configured"""
+        self.started = time.time()
+        if not self.enabled:
+            return
+
+        port = self.monitoring.get('prometheus_port')
+        if port is not None and self.server is None:
+            try:
+                self.server = MetricsServer(self.registry, port,
+                                            self.monitoring.get('prometheus_host', '127.0.0.1'))
+            except OSError as e:
+                print(f"Warning: Metrics endpoint not started on port {port}: {e}")
+
+        if self.monitoring.get('track_resource_usage', False) and self.sampler is None:
+            try:
+                self.sampler = ResourceSampler(self.registry,
+                                               self.monitoring.get('sample_interval_seconds', 5))
+            except ImportError:
+                print("Warning: track_resource_usage requires psutil; resource metrics disabled")
+
+        if self.flush_interval and self._flusher is None:
+            self._stop_flushing.clear()
+            self._flusher = threading.Thread(target=self._flush, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush(self):
+        while not self._stop_flushing.wait(self.flush_interval):
+            self.write(partial=True)
+
+    def write(self, **extra):
+        """Write the metrics file"""
+        if self.enabled:
+            if self.started is not None:
+                extra.setdefault('total_duration', round((time.time() - self.started) / 3600, 4))
+            # write_json's temp file name is fixed; one writer at a time
+            with self._write_lock:
+                self.registry.write_json(self.metrics_file, **extra)
+
+    def stop(self, **extra):
+        """Take a final sample, write the metrics file and stop the endpoint"""
+        if self._flusher is not None:
+            self._stop_flushing.set()
+            self._flusher.join()
+            self._flusher = None
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+        self.write(**extra)
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
@@ -3,29 +3,78 @@ Model Factory - Creates LLM model instances based on configuration
 """
 
 import os
+import json
+import threading
 from typing import Dict, Any
 
 
-def create_model(config: Dict) -> Any:
+# One shared model (and therefore one HTTP client) per provider configuration
+_model_pool: Dict[str, Any] = {}
+_model_pool_lock = threading.Lock()
+
+
+def create_model(config: Dict, cache: bool = True, replay: bool = True) -> Any:
     """
     Create and return a model instance based on configuration
 
     Supports: OpenAI, Anthropic, AWS Bedrock, Ollama
+
+    Provider models are pooled: every agent gets the same client for a given
+    provider configuration, rate limited through the provider's
+    ``rate_limit`` block if one is configured.
+
+    When ``models.cache.enabled`` is set, the provider model is wrapped in a
+    CachingModel that replays responses for identical requests. Pass
+    ``cache=False`` for non-deterministic steps, or ``replay=False`` to
+    record fresh responses without serving recorded ones.
     """
     models_config = config.get('models', {})
     provider = models_config.get('default_provider', 'anthropic')
 
-    if provider == 'openai':
-        return _create_openai_model(models_config['openai'])
-    elif provider == 'anthropic':
-        return _create_anthropic_model(models_config['anthropic'])
-    elif provider == 'bedrock':
-        return _create_bedrock_model(models_config['bedrock'])
-    elif provider == 'ollama':
-        return _create_ollama_model(models_config['ollama'])
-    else:
+    if provider not in ('openai', 'anthropic', 'bedrock', 'ollama'):
         raise ValueError(f"Unsupported model provider: {provider}")
 
+    model = get_pooled_model(provider, models_config[provider])
+
+    if cache:
+        from .llm_cache import CachingModel, get_llm_cache
+
+        llm_cache = get_llm_cache(config)
+        if llm_cache is not None:
+            model = CachingModel(model, provider, llm_cache, replay=replay)
+
+    return model
+
+
+def get_pooled_model(provider: str, provider_config: Dict) -> Any:
+    """Return the shared, rate-limited model for a provider configuration"""
+    key = json.dumps([provider, provider_config], sort_keys=True, default=str)
+
+    with _model_pool_lock:
+        if key in _model_pool:
+            return _model_pool[key]
+
+        if provider == 'openai':
+            model = _create_openai_model(provider_config)
+        elif provider == 'anthropic':
+            model = _create_anthropic_model(provider_config)
+        elif provider == 'bedrock':
+            model = _create_bedrock_model(provider_config)
+        else:
+            model = _create_ollama_model(provider_config)
+
+        from .model_metrics import MeteredModel
+        from .rate_limiter import ProviderRateLimiter, RateLimitedModel
+
+        model = MeteredModel(model, provider)
+
+        limiter = ProviderRateLimiter.from_config(provider, provider_config)
+        if limiter is not None:
+            model = RateLimitedModel(model, limiter)
+
+        _model_pool[key] = model
+        return model
+
 
 def _create_openai_model(config: Dict) -> Any:
     """Create OpenAI model instance"""
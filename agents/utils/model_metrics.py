@@ -0,0 +1,79 @@
+"""
+Model Metrics - Records LLM request counts, latency and token usage
+"""
+
+import time
+from typing import Any
+
+from strands.models import Model
+
+from .metrics import MetricsRegistry, get_metrics
+from .rate_limiter import is_throttle_error
+from .tracing import get_tracer
+
+
+# Seconds; model calls are slower and less spread out than SSH commands
+LLM_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+
+class MeteredModel(Model):
+    """Model wrapper that reports every provider request to the metrics registry
+
+    Sits directly around the provider client, so cache hits served by
+    ``CachingModel`` are not counted as requests.
+    """
+
+    def __init__(self, model: Model, provider: str, registry: MetricsRegistry = None):
+        self.model = model
+        self.provider = provider
+        self.registry = registry or get_metrics()
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def _record(self, status: str, started: float):
+        self.registry.inc('llm_requests_total', provider=self.provider, status=status)
+        self.registry.observe('llm_request_seconds', time.monotonic() - started,
+                              buckets=LLM_BUCKETS, provider=self.provider)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        """Stream from the provider, recording latency and reported usage"""
+        started = time.monotonic()
+        span = get_tracer().span(f'llm:{self.provider}', 'model', messages=len(messages))
+        try:
+            with span:
+                async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                    if isinstance(event, dict) and 'metadata' in event:
+                        usage = event['metadata'].get('usage', {})
+                        span.set(**usage)
+                        for kind in ('inputTokens', 'outputTokens'):
+                            if usage.get(kind):
+                                self.registry.inc('llm_tokens_total', usage[kind],
+                                                  provider=self.provider, kind=kind[:-len('Tokens')])
+                    yield event
+        except Exception as e:
+            if is_throttle_error(e):
+                self.registry.inc('llm_throttled_total', provider=self.provider)
+            self._record('error', started)
+            raise
+
+        self._record('ok', started)
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        started = time.monotonic()
+        try:
+            async for event in self.model.structured_output(output_model, prompt,
+                                                             system_prompt=system_prompt, **kwargs):
+                yield event
+        except Exception:
+            self._record('error', started)
+            raise
+        self._record('ok', started)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
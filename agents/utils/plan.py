@@ -0,0 +1,131 @@
+"""
+Plan - Compiled, read-only view of the ``teams`` config section
+
+The plan is built once per orchestrator: phase index, forward and reverse
+dependency adjacency and topological order are computed up front, and each
+team's task payload (description and system prompt) is built the first time
+it is asked for and then reused by every mode (full run, ``--phase``,
+``--resume-from``, ``--rollback``, ``--dry-run``) and by the scheduler.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Callable, Iterable, Mapping, Set, Tuple
+
+
+class WorkflowPlan:
+    """Immutable team graph with per-phase indexes and cached task payloads
+
+    ``build_task(team_id, team_config)`` returns the static part of a
+    team's task (at least ``description`` and ``system_prompt``); it is
+    called at most once per team.
+    """
+
+    def __init__(self, teams: Dict[str, Dict],
+                 build_task: Optional[Callable[[str, Dict], Dict[str, Any]]] = None):
+        """Compile the plan, raising ValueError on unknown dependencies or cycles"""
+        dependencies: Dict[str, Tuple[str, ...]] = {}
+        dependents: Dict[str, List[str]] = {team_id: [] for team_id in teams}
+
+        for team_id, team_config in teams.items():
+            deps = tuple(team_config.get('dependencies') or ())
+            for dep in deps:
+                if dep not in teams:
+                    raise ValueError(f"Team '{team_id}' depends on unknown team '{dep}'")
+                dependents[dep].append(team_id)
+            dependencies[team_id] = deps
+
+        self.teams: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {team_id: MappingProxyType(dict(team_config)) for team_id, team_config in teams.items()})
+        self.dependencies: Mapping[str, Tuple[str, ...]] = MappingProxyType(dependencies)
+        self.dependents: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {team_id: tuple(children) for team_id, children in dependents.items()})
+        self.order: Tuple[str, ...] = self._topological_order()
+        self.position: Mapping[str, int] = MappingProxyType(
+            {team_id: index for index, team_id in enumerate(self.order)})
+
+        phases: Dict[int, List[str]] = {}
+        for team_id in self.order:
+            phases.setdefault(teams[team_id].get('phase', 0), []).append(team_id)
+        self.phases: Mapping[int, Tuple[str, ...]] = MappingProxyType(
+            {phase: tuple(phases[phase]) for phase in sorted(phases)})
+        self.phase_of: Mapping[str, int] = MappingProxyType(
+            {team_id: phase for phase, team_ids in self.phases.items() for team_id in team_ids})
+
+        self._build_task = build_task
+        self._tasks: Dict[str, Mapping[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        """Teams in dependency order (config order among peers), raising on cycles"""
+        indegree = {team_id: len(deps) for team_id, deps in self.dependencies.items()}
+        queue = [team_id for team_id, degree in indegree.items() if degree == 0]
+        order = []
+
+        for team_id in queue:
+            order.append(team_id)
+            for child in self.dependents[team_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+
+        if len(order) != len(self.teams):
+            cyclic = sorted(set(self.teams) - set(order))
+            raise ValueError(f"Dependency cycle detected among teams: {', '.join(cyclic)}")
+
+        return tuple(order)
+
+    def __contains__(self, team_id: str) -> bool:
+        return team_id in self.teams
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def task(self, team_id: str) -> Mapping[str, Any]:
+        """Static task payload of a team, built on first use"""
+        task = self._tasks.get(team_id)
+        if task is None:
+            if self._build_task is None:
+                raise RuntimeError("WorkflowPlan was compiled without a task builder")
+            with self._lock:
+                task = self._tasks.get(team_id)
+                if task is None:
+                    payload = dict(self._build_task(team_id, dict(self.teams[team_id])))
+                    payload.setdefault('task_id', team_id)
+                    payload.setdefault('dependencies', list(self.dependencies[team_id]))
+                    task = self._tasks[team_id] = MappingProxyType(payload)
+        return task
+
+    def phase_teams(self, phase: int) -> Tuple[str, ...]:
+        """Teams of one phase in topological order"""
+        return self.phases.get(phase, ())
+
+    def teams_before_phase(self, phase: int) -> Set[str]:
+        """Teams of every phase earlier than ``phase``"""
+        return {team_id for p, team_ids in self.phases.items() if p < phase for team_id in team_ids}
+
+    def teams_from_phase(self, phase: int) -> Tuple[str, ...]:
+        """Teams of ``phase`` and every later phase, in topological order"""
+        return tuple(team_id for team_id in self.order if self.phase_of[team_id] >= phase)
+
+    def _closure(self, team_ids: Iterable[str], edges: Mapping[str, Tuple[str, ...]]) -> Set[str]:
+        result: Set[str] = set()
+        stack = list(team_ids)
+        while stack:
+            team_id = stack.pop()
+            if team_id not in result:
+                result.add(team_id)
+                stack.extend(edges[team_id])
+        return result
+
+    def upstream(self, team_ids: Iterable[str]) -> Set[str]:
+        """The given teams plus all of their transitive dependencies"""
+        return self._closure(team_ids, self.dependencies)
+
+    def downstream(self, team_ids: Iterable[str]) -> Set[str]:
+        """The given teams plus all of their transitive dependents"""
+        return self._closure(team_ids, self.dependents)
+
+    def in_order(self, team_ids: Iterable[str]) -> List[str]:
+        """The given teams sorted into topological order"""
+        return sorted(team_ids, key=self.position.__getitem__)
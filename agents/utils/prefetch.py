@@ -0,0 +1,258 @@
+"""
+Prefetch - Background download of the artifacts teams declare
+
+Teams list the images, binaries and charts they will need under
+``artifacts`` in their config. While earlier teams run, the ``Prefetcher``
+downloads them onto the host over the pooled SSH connection, in the order
+the teams are projected to start, with ``bandwidth_limit`` capping each
+download (``curl --limit-rate`` on the host, or the paced download and
+upload of the artifact store). A team waits for its own artifacts before
+it starts, fetching any that were not picked up yet itself, so it begins
+with everything local. Any URL curl understands works, including
+``file://`` for offline runs against the ``local`` transport.
+"""
+
+import posixpath
+import shlex
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .metrics import get_metrics
+from .tracing import get_tracer
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+CACHED = 'cached'
+DOWNLOADED = 'downloaded'
+FAILED = 'failed'
+
+
+def parse_rate(value: Any) -> Optional[float]:
+    """Bytes per second of a curl-style rate (``512K``, ``20M``, ``1G``)"""
+    if not value:
+        return None
+    text = str(value).strip()
+    multiplier = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}.get(text[-1].upper())
+    if multiplier:
+        text = text[:-1]
+    return float(text) * (multiplier or 1)
+
+
+def team_artifacts(team_config: Dict, remote_dir: str) -> List[Dict[str, Any]]:
+    """Normalised ``artifacts`` entries of a team"""
+    return normalize_artifacts(team_config.get('artifacts'), remote_dir)
+
+
+def normalize_artifacts(entries: Optional[List[Any]], remote_dir: str) -> List[Dict[str, Any]]:
+    """Artifact entries as ``url``/``dest``/``sha256`` dicts
+
+    An entry is a URL string or a mapping with ``url`` and optional
+    ``dest`` (remote path; defaults to ``remote_dir/<file name>``) and
+    ``sha256``.
+    """
+    artifacts = []
+    for entry in entries or []:
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        if 'url' not in entry:
+            raise ValueError(f"Artifact entry without a url: {entry}")
+        name = posixpath.basename(entry['url'].split('?', 1)[0].rstrip('/'))
+        artifacts.append({
+            'url': entry['url'],
+            'dest': entry.get('dest') or posixpath.join(remote_dir, name),
+            'sha256': entry.get('sha256'),
+        })
+    return artifacts
+
+
+class ArtifactJob:
+    """One download, shared by every team that declares the same destination"""
+
+    def __init__(self, url: str, dest: str, sha256: Optional[str] = None):
+        self.url = url
+        self.dest = dest
+        self.sha256 = sha256
+        self.status = PENDING
+        self.error = ""
+        self.duration = 0.0
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'url': self.url, 'dest': self.dest, 'status': self.status,
+                'error': self.error, 'duration': round(self.duration, 3)}
+
+
+class Prefetcher:
+    """Downloads declared artifacts to the host ahead of the teams needing them
+
+    Configured from the ``prefetch`` section: ``enabled``, ``remote_dir``,
+    ``bandwidth_limit`` (curl ``--limit-rate`` per download, e.g. ``20M``),
+    ``max_concurrent`` downloads and ``timeout`` per download in seconds.
+    With an artifact ``store``, artifacts are fetched once into the store on
+    the control machine and pushed to the host instead of downloaded there;
+    the download and the upload are each paced to ``bandwidth_limit``.
+    """
+
+    def __init__(self, pool, config: Dict, host: Optional[str] = None, store=None):
+        self.pool = pool
+        self.host = host
+        self.store = store
+        self.settings = config.get('prefetch', {})
+        self.enabled = self.settings.get('enabled', False)
+        self.remote_dir = self.settings.get('remote_dir', '/var/cache/hypervisor-artifacts')
+        self.bandwidth_limit = self.settings.get('bandwidth_limit')
+        self.rate_limit = parse_rate(self.bandwidth_limit)
+        self.max_concurrent = max(1, self.settings.get('max_concurrent', 2))
+        self.timeout = self.settings.get('timeout', 1800)
+        self.retry_delay = config.get('ssh', {}).get('retry_delay', 5)
+
+        self.jobs: Dict[str, ArtifactJob] = {}
+        self.team_jobs: Dict[str, List[ArtifactJob]] = {}
+        self.queue: List[ArtifactJob] = []
+        self.workers: List[threading.Thread] = []
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def plan(self, teams: Dict[str, Dict], order: List[str]):
+        """Queue the artifacts of ``order``'s teams, earliest start first"""
+        with self._lock:
+            for team_id in order:
+                jobs = []
+                for artifact in team_artifacts(teams[team_id], self.remote_dir):
+                    job = self.jobs.get(artifact['dest'])
+                    if job is None:
+                        job = ArtifactJob(artifact['url'], artifact['dest'], artifact['sha256'])
+                        self.jobs[job.dest] = job
+                        self.queue.append(job)
+                    jobs.append(job)
+                self.team_jobs[team_id] = jobs
+
+    def start(self, teams: Dict[str, Dict], order: List[str]):
+        """Plan the downloads and start the background workers"""
+        if not self.enabled:
+            return
+        self.plan(teams, order)
+        if not self.queue:
+            return
+
+        self._stopped.clear()
+        for index in range(min(self.max_concurrent, len(self.queue))):
+            worker = threading.Thread(target=self._worker, name=f"prefetch-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def stop(self):
+        """Stop picking up new downloads; ones in flight finish in the background"""
+        self._stopped.set()
+        self.workers = []
+
+    def _wait_for_host(self) -> bool:
+        """Block until the host answers (or prefetch is stopped)"""
+        while not self._stopped.is_set():
+            try:
+                if self.pool.run(f"mkdir -p {shlex.quote(self.remote_dir)}", host=self.host,
+                                 timeout=60).ok:
+                    return True
+                return False
+            except Exception:
+                self._stopped.wait(self.retry_delay)
+        return False
+
+    def _worker(self):
+        if not self._wait_for_host():
+            return
+        while not self._stopped.is_set():
+            job = self._claim()
+            if job is None:
+                return
+            self._fetch(job)
+
+    def _claim(self, job: Optional[ArtifactJob] = None) -> Optional[ArtifactJob]:
+        """Take the given (or next queued) job if nobody else has started it"""
+        with self._lock:
+            if job is None:
+                job = next((j for j in self.queue if j.status == PENDING), None)
+            if job is None or job.status != PENDING:
+                return None
+            job.status = RUNNING
+            self.queue.remove(job)
+            return job
+
+    def _command(self, job: ArtifactJob) -> str:
+        """Shell command that downloads the artifact unless a good copy exists"""
+        dest = shlex.quote(job.dest)
+        part = shlex.quote(job.dest + '.part')
+
+        curl = ['curl', '-fsSL', '--create-dirs', '-o', job.dest + '.part']
+        if self.bandwidth_limit:
+            curl += ['--limit-rate', str(self.bandwidth_limit)]
+        fetch = ' '.join(shlex.quote(arg) for arg in curl + [job.url])
+
+        def check(path: str) -> str:
+            if not job.sha256:
+                return 'true'
+            return f"echo {shlex.quote(job.sha256)}'  '{path} | sha256sum -c --status"
+
+        return (f"if [ -f {dest} ] && {check(dest)}; then echo {CACHED}; "
+                f"elif {fetch} && {check(part)} && mv -f {part} {dest}; then echo {DOWNLOADED}; "
+                f"else rm -f {part}; echo 'download or checksum failed' >&2; exit 1; fi")
+
+    def _fetch(self, job: ArtifactJob):
+        start = time.monotonic()
+        with get_tracer().span('prefetch', 'prefetch', url=job.url, dest=job.dest) as span:
+            try:
+                if self.store is not None:
+                    self._fetch_from_store(job)
+                    span.set(status=job.status)
+                    return self._finish(job, start)
+
+                result = self.pool.run(self._command(job), host=self.host, timeout=self.timeout)
+                if result.ok:
+                    job.status = CACHED if result.stdout.strip().endswith(CACHED) else DOWNLOADED
+                else:
+                    job.status = FAILED
+                    job.error = (result.stderr or result.stdout).strip()[-500:]
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e)
+            span.set(status=job.status)
+        self._finish(job, start)
+
+    def _fetch_from_store(self, job: ArtifactJob):
+        """Fetch into the control machine's store, then push to the host"""
+        from .artifacts import PUSH_CACHED
+
+        digest = self.store.fetch(job.url, job.sha256, rate_limit=self.rate_limit)
+        outcome = self.store.push(self.pool, [(digest, job.dest)], host=self.host,
+                                  rate_limit=self.rate_limit)
+        job.status = CACHED if outcome[job.dest] == PUSH_CACHED else DOWNLOADED
+
+    def _finish(self, job: ArtifactJob, start: float):
+        job.duration = time.monotonic() - start
+        metrics = get_metrics()
+        metrics.inc('prefetch_artifacts_total', status=job.status)
+        metrics.observe('prefetch_seconds', job.duration)
+        job.done.set()
+
+    def ensure(self, team_id: str, timeout: Optional[float] = None) -> List[ArtifactJob]:
+        """Make sure a team's artifacts are on the host; returns the failed ones
+
+        Artifacts nobody picked up yet are fetched right away on the calling
+        thread; ones already downloading are waited for.
+        """
+        jobs = self.team_jobs.get(team_id, [])
+        for job in jobs:
+            if self._claim(job) is not None:
+                self._fetch(job)
+            elif not job.done.wait(timeout):
+                job.error = job.error or "Timed out waiting for prefetch"
+        return [job for job in jobs if job.status not in (CACHED, DOWNLOADED)]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of artifacts per status"""
+        counts: Dict[str, int] = {}
+        for job in list(self.jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
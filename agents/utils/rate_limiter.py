@@ -0,0 +1,184 @@
+"""
+Rate Limiter - Provider-wide token buckets shared by all team agents
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from strands.models import Model
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``
+
+    ``reserve`` deducts immediately, even below zero, and returns how long
+    the caller must wait before using the reservation. Concurrent callers
+    therefore queue up behind each other instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Claim ``amount`` tokens and return the delay (seconds) before they are available"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate) if self.rate > 0 else 0.0
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the fact"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderRateLimiter:
+    """Requests/min and tokens/min limits with adaptive backoff for one provider"""
+
+    def __init__(self, provider: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 initial_backoff: float = 2.0, max_backoff: float = 60.0):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'throttled': 0, 'waited_seconds': 0.0}
+
+    @classmethod
+    def from_config(cls, provider: str, provider_config: Dict) -> Optional['ProviderRateLimiter']:
+        """Build a limiter from a provider's ``rate_limit`` block, or None if absent"""
+        limits = provider_config.get('rate_limit')
+        if not limits:
+            return None
+        return cls(
+            provider,
+            requests_per_minute=limits.get('requests_per_minute'),
+            tokens_per_minute=limits.get('tokens_per_minute'),
+            initial_backoff=limits.get('initial_backoff_seconds', 2.0),
+            max_backoff=limits.get('max_backoff_seconds', 60.0),
+        )
+
+    def reserve(self, estimated_tokens: float = 0.0) -> float:
+        """Claim capacity for one request and return the delay before sending it"""
+        delays = [0.0]
+        if self.requests:
+            delays.append(self.requests.reserve(1))
+        if self.tokens and estimated_tokens:
+            delays.append(self.tokens.reserve(estimated_tokens))
+
+        with self._lock:
+            delays.append(self.blocked_until - time.monotonic())
+            delay = max(delays)
+            self.stats['requests'] += 1
+            self.stats['waited_seconds'] += delay
+        return delay
+
+    def record_usage(self, estimated_tokens: float, actual_tokens: float):
+        """Correct the token bucket once the real usage is known"""
+        if self.tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def on_success(self):
+        """Decay the backoff after a request goes through"""
+        with self._lock:
+            self.backoff = self.backoff / 2 if self.backoff > self.initial_backoff else 0.0
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Pause every caller of this provider after a rate-limit response"""
+        with self._lock:
+            self.backoff = min(self.max_backoff, max(self.initial_backoff, self.backoff * 2))
+            pause = retry_after if retry_after else self.backoff
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            self.stats['throttled'] += 1
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """True if an exception is a provider rate-limit response"""
+    if type(error).__name__ in ('ModelThrottledException', 'RateLimitError', 'ThrottlingException'):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'throttl' in message
+
+
+def estimate_tokens(messages: Any, system_prompt: Optional[str] = None) -> int:
+    """Rough input token count (~4 characters per token)"""
+    chars = len(json.dumps(messages, default=str)) + len(system_prompt or "")
+    return chars // 4
+
+
+class RateLimitedModel(Model):
+    """Model wrapper that paces requests through a shared provider limiter
+
+    Throttling responses push back every agent sharing the limiter, then
+    propagate so the agent's own retry loop re-enters through the limiter.
+    """
+
+    def __init__(self, model: Model, limiter: ProviderRateLimiter):
+        self.model = model
+        self.limiter = limiter
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        """Wait for capacity, then stream from the provider"""
+        estimated = estimate_tokens(messages, system_prompt)
+        delay = self.limiter.reserve(estimated)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        actual = None
+        try:
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                if isinstance(event, dict) and 'metadata' in event:
+                    usage = event['metadata'].get('usage', {})
+                    actual = usage.get('totalTokens', actual)
+                yield event
+        except Exception as e:
+            if is_throttle_error(e):
+                self.limiter.on_throttle()
+            raise
+
+        self.limiter.on_success()
+        if actual is not None:
+            self.limiter.record_usage(estimated, actual)
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        delay = self.limiter.reserve(estimate_tokens(prompt, system_prompt))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            async for event in self.model.structured_output(output_model, prompt,
+                                                             system_prompt=system_prompt, **kwargs):
+                yield event
+        except Exception as e:
+            if is_throttle_error(e):
+                self.limiter.on_throttle()
+            raise
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
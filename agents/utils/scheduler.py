@@ -0,0 +1,285 @@
+"""
+Scheduler - Critical-path DAG scheduling for team execution
+"""
+
+import heapq
+from typing import Dict, List, Optional, Callable, Any, Iterable, Awaitable
+
+from .plan import WorkflowPlan
+
+
+class DAGScheduler:
+    """Schedules teams over their dependency graph with a concurrency cap
+
+    A team becomes ready the moment its last dependency finishes. Ready
+    teams are launched in order of longest remaining critical path
+    (sum of ``duration_estimate`` along the slowest chain of dependents),
+    so the teams that gate the most downstream work start first.
+    ``durations`` overrides ``duration_estimate`` per team, e.g. with
+    durations learned from earlier runs.
+    """
+
+    def __init__(self, teams: Dict[str, Dict], max_parallel: int = 1,
+                 completed: Optional[Iterable[str]] = None,
+                 durations: Optional[Dict[str, float]] = None,
+                 plan: Optional[WorkflowPlan] = None):
+        """Build the dependency graph from the ``teams`` config section
+
+        A compiled ``plan`` of the same teams is reused instead of
+        rebuilding the graph.
+        """
+        self.teams = teams
+        self.max_parallel = max(1, int(max_parallel))
+        self.durations = durations or {}
+
+        self.plan = plan if plan is not None else WorkflowPlan(teams)
+        self.dependencies = self.plan.dependencies
+        self.dependents = self.plan.dependents
+        self.order = list(self.plan.order)
+        self.critical_paths = self._compute_critical_paths()
+
+        # Execution state
+        self.completed: List[str] = [t for t in (completed or []) if t in teams]
+        self.failed: List[str] = []
+        self.skipped: List[str] = []
+        self.running: List[str] = []
+        self.errors: Dict[str, str] = {}
+
+    def _compute_critical_paths(self) -> Dict[str, float]:
+        """Longest remaining path (in hours) from each team to the end of the graph"""
+        paths: Dict[str, float] = {}
+        for team_id in reversed(self.order):
+            downstream = max((paths[child] for child in self.dependents[team_id]), default=0.0)
+            paths[team_id] = self.duration(team_id) + downstream
+        return paths
+
+    def duration(self, team_id: str) -> float:
+        """Estimated duration of a team in hours"""
+        if team_id in self.durations:
+            return float(self.durations[team_id])
+        return float(self.teams[team_id].get('duration_estimate', 1))
+
+    def priority(self, team_id: str) -> float:
+        """Scheduling priority of a team (higher runs first)"""
+        return self.critical_paths[team_id]
+
+    def critical_path_length(self) -> float:
+        """Lower bound on total makespan with unlimited parallelism"""
+        return max(self.critical_paths.values(), default=0.0)
+
+    def simulate(self, elapsed: Optional[Dict[str, float]] = None,
+                 starts: Optional[Dict[str, float]] = None) -> float:
+        """Projected hours until the remaining teams finish
+
+        Replays the scheduling policy (critical-path order, ``max_parallel``
+        slots) over the estimated durations. Running teams are credited
+        with their ``elapsed`` hours; failed and skipped teams never run.
+        If given, ``starts`` is filled with each team's projected start.
+        """
+        elapsed = elapsed or {}
+        starts = starts if starts is not None else {}
+        done = set(self.completed)
+        running = [t for t in self.running if t in self.teams]
+        excluded = done | set(self.failed) | set(self.skipped) | set(running)
+        waiting = {
+            team_id: sum(1 for dep in self.dependencies[team_id] if dep not in done)
+            for team_id in self.order if team_id not in excluded
+        }
+        position = self.plan.position
+
+        ready = [(-self.priority(t), position[t], t) for t, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        finishing = [(max(0.0, self.duration(t) - elapsed.get(t, 0.0)), t) for t in running]
+        heapq.heapify(finishing)
+        starts.update((t, 0.0) for t in running)
+
+        now = 0.0
+        while ready or finishing:
+            while ready and len(finishing) < self.max_parallel:
+                team_id = heapq.heappop(ready)[2]
+                starts[team_id] = now
+                heapq.heappush(finishing, (now + self.duration(team_id), team_id))
+
+            now, team_id = heapq.heappop(finishing)
+            for child in self.dependents[team_id]:
+                if child in waiting:
+                    waiting[child] -= 1
+                    if waiting[child] == 0:
+                        heapq.heappush(ready, (-self.priority(child), position[child], child))
+        return now
+
+    def ready_teams(self) -> List[str]:
+        """Teams whose dependencies are all complete, highest priority first"""
+        done = set(self.completed)
+        busy = done | set(self.failed) | set(self.skipped) | set(self.running)
+
+        ready = [
+            team_id for team_id in self.order
+            if team_id not in busy and all(dep in done for dep in self.dependencies[team_id])
+        ]
+        return sorted(ready, key=lambda t: (-self.priority(t), self.plan.position[t]))
+
+    def _skip_dependents(self, team_id: str):
+        """Mark every transitive dependent of a failed team as skipped"""
+        stack = list(self.dependents[team_id])
+        while stack:
+            child = stack.pop()
+            if child not in self.skipped and child not in self.completed:
+                self.skipped.append(child)
+                stack.extend(self.dependents[child])
+
+    def _launch_ready(self, slots: int, queued: set,
+                      on_queue: Optional[Callable[[str], None]],
+                      on_start: Optional[Callable[[str], None]]) -> List[str]:
+        """Fire queue callbacks for newly ready teams and claim up to ``slots`` of them"""
+        ready = self.ready_teams()
+        for team_id in ready:
+            if team_id not in queued:
+                queued.add(team_id)
+                if on_queue:
+                    on_queue(team_id)
+
+        launched = ready[:max(0, slots)]
+        for team_id in launched:
+            self.running.append(team_id)
+            if on_start:
+                on_start(team_id)
+        return launched
+
+    def _record_result(self, team_id: str, success: bool,
+                       on_finish: Optional[Callable[[str, bool], None]]) -> bool:
+        """Apply a finished team's outcome; returns False if it failed"""
+        self.running.remove(team_id)
+
+        if success:
+            self.completed.append(team_id)
+        else:
+            self.failed.append(team_id)
+            self._skip_dependents(team_id)
+
+        if on_finish:
+            on_finish(team_id, success)
+        return success
+
+    def _summary(self) -> Dict[str, Any]:
+        """Final outcome of a scheduler run"""
+        pending = [
+            team_id for team_id in self.order
+            if team_id not in self.completed and team_id not in self.failed
+            and team_id not in self.skipped
+        ]
+
+        return {
+            "completed": list(self.completed),
+            "failed": list(self.failed),
+            "skipped": list(self.skipped),
+            "pending": pending,
+            "errors": dict(self.errors),
+        }
+
+    def run(self, execute: Callable[[str], bool],
+            on_queue: Optional[Callable[[str], None]] = None,
+            on_start: Optional[Callable[[str], None]] = None,
+            on_finish: Optional[Callable[[str, bool], None]] = None,
+            continue_on_error: bool = False) -> Dict[str, Any]:
+        """Execute all pending teams, never exceeding ``max_parallel`` at once
+
+        ``execute`` is called with a team id and returns True on success.
+        ``on_queue`` fires once per team when it first becomes ready, which
+        may be before a slot frees up for it to start.
+        Exceptions raised by ``execute`` count as failures. When
+        ``continue_on_error`` is False, no new teams are launched after the
+        first failure; teams already running are allowed to finish.
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        stop = False
+        queued: set = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            futures = {}
+
+            while True:
+                if not stop:
+                    for team_id in self._launch_ready(self.max_parallel - len(futures),
+                                                      queued, on_queue, on_start):
+                        futures[executor.submit(execute, team_id)] = team_id
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    team_id = futures.pop(future)
+
+                    try:
+                        success = bool(future.result())
+                    except Exception as e:
+                        self.errors[team_id] = str(e)
+                        success = False
+
+                    if not self._record_result(team_id, success, on_finish) and not continue_on_error:
+                        stop = True
+
+        return self._summary()
+
+    async def run_async(self, execute: Callable[[str], Awaitable[bool]],
+                        on_queue: Optional[Callable[[str], None]] = None,
+                        on_start: Optional[Callable[[str], None]] = None,
+                        on_finish: Optional[Callable[[str, bool], None]] = None,
+                        continue_on_error: bool = False,
+                        timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Asyncio variant of ``run`` where each team is a coroutine
+
+        ``timeouts`` maps team ids to a limit in seconds; a team exceeding it
+        is cancelled and counted as failed. If the run itself is cancelled
+        (e.g. Ctrl-C under ``asyncio.run``), every running team is cancelled
+        and awaited, reported as failed, and the cancellation propagates.
+        """
+        import asyncio
+
+        timeouts = timeouts or {}
+        stop = False
+        queued: set = set()
+        tasks: Dict[asyncio.Task, str] = {}
+
+        try:
+            while True:
+                if not stop:
+                    for team_id in self._launch_ready(self.max_parallel - len(tasks),
+                                                      queued, on_queue, on_start):
+                        coro = asyncio.wait_for(execute(team_id), timeouts.get(team_id))
+                        tasks[asyncio.ensure_future(coro)] = team_id
+
+                if not tasks:
+                    break
+
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    team_id = tasks.pop(task)
+
+                    try:
+                        success = bool(task.result())
+                    except asyncio.TimeoutError:
+                        self.errors[team_id] = f"Timed out after {timeouts.get(team_id)}s"
+                        success = False
+                    except Exception as e:
+                        self.errors[team_id] = str(e)
+                        success = False
+
+                    if not self._record_result(team_id, success, on_finish) and not continue_on_error:
+                        stop = True
+
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            for team_id in list(tasks.values()):
+                self.errors[team_id] = "Cancelled"
+                self._record_result(team_id, False, on_finish)
+            raise
+
+        return self._summary()
@@ -1,75 +1,300 @@
 """
 State Manager - Handles workflow state persistence and recovery
+
+State is stored as an atomic snapshot (``state_file``) plus an append-only
+journal of small delta records next to it. Every save appends one record;
+the journal is folded into a fresh snapshot every ``state.compact_every``
+records. On startup the snapshot is loaded and the journal replayed;
+unreadable lines are skipped, so one bad record never hides later ones.
+
+Only the writer, the process holding the ``.lock`` file next to the state,
+cuts off a torn final journal line (crash mid-append). Read-only managers
+(``--status``, fleet status) never create, lock or modify any file.
 """
 
+import copy
 import json
 import os
+import threading
+from collections import OrderedDict, deque
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
+from .tracing import get_tracer
+
+try:
+    import fcntl
+except ImportError:  # Windows: no writer lock, the torn tail is left in place
+    fcntl = None
+
 
 class StateManager:
     """Manages workflow state for checkpointing and recovery"""
 
-    def __init__(self, config: Dict):
-        """Initialize state manager with configuration"""
+    def __init__(self, config: Dict, read_only: bool = False):
+        """Initialize state manager with configuration
+
+        ``read_only`` loads the state without touching the disk; saves are
+        ignored.
+        """
         self.config = config
         self.state_config = config.get('state', {})
+        self.read_only = read_only
 
-        # Setup state directory and file
+        # Setup state directory and files
         base_path = Path(config['project']['base_path'])
         self.state_file = base_path / self.state_config.get('state_file', 'state/workflow_state.json')
+        self.journal_file = self.state_file.with_suffix('.journal')
+        self.lock_file = self.state_file.with_suffix('.lock')
         self.state_dir = self.state_file.parent
 
-        # Create state directory if it doesn't exist
-        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.compact_every = self.state_config.get('compact_every', 100)
+        self.fsync = self.state_config.get('fsync', True)
+        self.max_checkpoints = self.state_config.get('max_checkpoints', 20)
 
         # Initialize state
         self.state: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
+        self.history: deque = deque(maxlen=self.state_config.get('history_size', 10))
+        self.checkpoints: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.seq = 0
+        self._journal_records = 0
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._journal = None
+        self._lock = threading.RLock()
+        self._writer_lock = None
+        self._torn_offset: Optional[int] = None
+
+        if not read_only:
+            # Create state directory if it doesn't exist
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            self._acquire_writer_lock()
 
         # Load existing state if available
-        if self.state_file.exists():
+        if self.state_file.exists() or self.journal_file.exists():
             self._load_state()
+            self._repair_journal()
+
+    def _acquire_writer_lock(self):
+        """Take the writer role; only its holder may repair the journal"""
+        if fcntl is None:
+            return
+        try:
+            lock = open(self.lock_file, 'a')
+        except OSError as e:
+            print(f"Warning: Failed to open state lock file: {e}")
+            return
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            print(f"Warning: {self.state_file} is in use by another process; "
+                  f"its journal will not be repaired")
+            return
+        self._writer_lock = lock
+
+    @property
+    def is_writer(self) -> bool:
+        """True if this manager holds the state lock"""
+        return self._writer_lock is not None
+
+    def _persists(self) -> bool:
+        return not self.read_only and self.state_config.get('persistence', True)
 
     def save_state(self, state_data: Dict[str, Any]):
-        """Save current workflow state to disk"""
-        if not self.state_config.get('persistence', True):
+        """Apply a delta to the workflow state and journal it"""
+        if not self._persists():
             return
 
         # Add timestamp
         state_data['timestamp'] = datetime.now().isoformat()
         state_data['version'] = self.config['project']['version']
 
-        # Backup current state to history
-        if self.state_config.get('backup_state', True) and self.state:
-            self.history.append(self.state.copy())
-
-        # Update current state
-        self.state.update(state_data)
+        with self._lock:
+            self._apply({'op': 'update', 'delta': state_data})
+            self._append({'op': 'update', 'delta': state_data})
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply a journal record to the in-memory state
+
+        Top-level values are always replaced by a private copy, never
+        mutated in place, so history entries and checkpoints can share them
+        through shallow copies instead of deep-copying the whole state.
+        """
+        op = record.get('op')
+
+        if op == 'update':
+            if self.state_config.get('backup_state', True) and self.state:
+                self.history.append(dict(self.state))
+            self.state.update(copy.deepcopy(record['delta']))
+        elif op == 'replace':
+            self.state = copy.deepcopy(record['state'])
+
+        name = record.get('delta', {}).get('checkpoint_name') if op == 'update' else None
+        if name:
+            self.checkpoints.pop(name, None)
+            self.checkpoints[name] = dict(self.state)
+            self._trim_checkpoints()
+
+    def _trim_checkpoints(self):
+        """Drop the oldest named checkpoints beyond ``state.max_checkpoints``
+
+        Each checkpoint is a full copy of the state, so keeping all of them
+        makes memory and snapshot size grow with the square of the team count.
+        """
+        while self.max_checkpoints and len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoints.popitem(last=False)
+
+    def _append(self, record: Dict[str, Any]):
+        """Append a record to the journal, compacting when it grows too long
+
+        Compaction waits for ``compact_every`` records *and* for the journal
+        to outgrow the last snapshot, so snapshot rewrites cost at most as
+        many bytes as the journal records they fold in, however large the
+        state gets.
+        """
+        self.seq += 1
+        record['seq'] = self.seq
 
-        # Write to file
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump({
-                    'current': self.state,
-                    'history': self.history[-10:]  # Keep last 10 states
-                }, f, indent=2)
+            with get_tracer().span('state.append', 'state'):
+                if self._journal is None:
+                    self._journal = open(self.journal_file, 'a')
+                line = json.dumps(record, default=str) + '\n'
+                self._journal.write(line)
+                self._journal.flush()
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+            self._journal_records += 1
+            self._journal_bytes += len(line)
         except Exception as e:
             print(f"Warning: Failed to save state: {e}")
+            return
+
+        if self._journal_records >= self.compact_every and self._journal_bytes >= self._snapshot_bytes:
+            self.compact()
+
+    def compact(self):
+        """Write an atomic snapshot of the state and truncate the journal"""
+        if self.read_only:
+            return
+        with self._lock, get_tracer().span('state.compact', 'state'):
+            snapshot = {
+                'seq': self.seq,
+                'current': self.state,
+                'history': list(self.history),
+                'checkpoints': self.checkpoints,
+            }
+
+            tmp_file = self.state_file.with_suffix('.tmp')
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(snapshot, f, default=str)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                self._snapshot_bytes = tmp_file.stat().st_size
+                os.replace(tmp_file, self.state_file)
+                self._fsync_dir()
+            except Exception as e:
+                print(f"Warning: Failed to write state snapshot: {e}")
+                return
+
+            # The snapshot now covers every journaled record
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            try:
+                open(self.journal_file, 'w').close()
+            except OSError as e:
+                print(f"Warning: Failed to truncate state journal: {e}")
+            self._journal_records = 0
+            self._journal_bytes = 0
+
+    def _fsync_dir(self):
+        """Persist the rename of the snapshot file"""
+        if not self.fsync or not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.state_dir, os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
     def _load_state(self):
-        """Load state from disk"""
+        """Load the snapshot from disk and replay the journal on top of it"""
         try:
-            with open(self.state_file, 'r') as f:
-                data = json.load(f)
+            if self.state_file.exists():
+                with open(self.state_file, 'r') as f:
+                    data = json.load(f)
                 self.state = data.get('current', {})
-                self.history = data.get('history', [])
+                self.history.extend(data.get('history', []))
+                self.checkpoints = OrderedDict(data.get('checkpoints', {}))
+                self.seq = data.get('seq', 0)
+                self._snapshot_bytes = self.state_file.stat().st_size
+
+                # Snapshots written before checkpoints were indexed
+                if not self.checkpoints:
+                    for state in list(self.history) + [self.state]:
+                        if 'checkpoint_name' in state:
+                            self.checkpoints[state['checkpoint_name']] = state
+                self._trim_checkpoints()
         except Exception as e:
             print(f"Warning: Failed to load state: {e}")
             self.state = {}
-            self.history = []
+            self.history.clear()
+            self.checkpoints.clear()
+
+        self._replay_journal()
+
+    def _replay_journal(self):
+        """Apply journal records newer than the snapshot
+
+        Lines that do not parse are skipped. A final line without a newline
+        is a record still being (or never finished being) written and is not
+        applied; its offset is kept for ``_repair_journal``.
+        """
+        if not self.journal_file.exists():
+            return
+
+        offset = 0
+        skipped = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    self._torn_offset = offset
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if record.get('seq', 0) <= self.seq:
+                    continue
+                self._apply(record)
+                self.seq = record['seq']
+                self._journal_records += 1
+        self._journal_bytes = offset
+
+        if skipped:
+            print(f"Warning: Skipped {skipped} unreadable state journal record(s)")
+
+    def _repair_journal(self):
+        """Cut off a torn final line so later appends start on a clean line
+
+        Only the writer does this: in any other process the "torn" line may
+        be an append still in progress.
+        """
+        if self._torn_offset is None or not self.is_writer:
+            return
+        try:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(self._torn_offset)
+        except OSError as e:
+            print(f"Warning: Failed to repair state journal: {e}")
+        self._torn_offset = None
 
     def restore_state(self) -> Optional[Dict[str, Any]]:
         """Restore state from checkpoint"""
@@ -83,7 +308,6 @@ class StateManager:
 
     def set(self, key: str, value: Any):
         """Set value in current state"""
-        self.state[key] = value
         self.save_state({key: value})
 
     def get_last_state(self) -> Optional[Dict[str, Any]]:
@@ -92,19 +316,33 @@ class StateManager:
 
     def get_history(self, n: int = 10) -> List[Dict[str, Any]]:
         """Get last n historical states"""
-        return self.history[-n:]
+        return list(self.history)[-n:]
 
     def clear_state(self):
         """Clear all state and history"""
-        self.state = {}
-        self.history = []
-
-        # Remove state file
-        if self.state_file.exists():
-            try:
-                self.state_file.unlink()
-            except Exception as e:
-                print(f"Warning: Failed to delete state file: {e}")
+        with self._lock:
+            self.state = {}
+            self.history.clear()
+            self.checkpoints.clear()
+            self.seq = 0
+            self._journal_records = 0
+            self._journal_bytes = 0
+            self._snapshot_bytes = 0
+
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+            if self.read_only:
+                return
+
+            # Remove state files
+            for path in (self.state_file, self.journal_file):
+                if path.exists():
+                    try:
+                        path.unlink()
+                    except Exception as e:
+                        print(f"Warning: Failed to delete state file: {e}")
 
     def checkpoint(self, checkpoint_name: str, data: Dict[str, Any]):
         """Create a named checkpoint"""
@@ -117,34 +355,20 @@ class StateManager:
 
     def restore_checkpoint(self, checkpoint_name: str) -> Optional[Dict[str, Any]]:
         """Restore from a named checkpoint"""
-        # Search history for matching checkpoint
-        for state in reversed(self.history):
-            if state.get('checkpoint_name') == checkpoint_name:
-                self.state = state.copy()
-                return state
-
-        # Check current state
-        if self.state.get('checkpoint_name') == checkpoint_name:
+        with self._lock:
+            state = self.checkpoints.get(checkpoint_name)
+            if state is None:
+                return None
+
+            record = {'op': 'replace', 'state': state}
+            self._apply(record)
+            if self._persists():
+                self._append(record)
             return self.state
 
-        return None
-
     def list_checkpoints(self) -> List[str]:
         """List all available checkpoint names"""
-        checkpoints = []
-
-        # Check current state
-        if 'checkpoint_name' in self.state:
-            checkpoints.append(self.state['checkpoint_name'])
-
-        # Check history
-        for state in self.history:
-            if 'checkpoint_name' in state:
-                name = state['checkpoint_name']
-                if name not in checkpoints:
-                    checkpoints.append(name)
-
-        return checkpoints
+        return list(self.checkpoints)
 
     def get_progress(self) -> Dict[str, Any]:
         """Get current progress metrics"""
@@ -157,21 +381,49 @@ class StateManager:
 
     def mark_team_complete(self, team_id: str):
         """Mark a team as completed"""
-        completed = self.state.get('completed_teams', [])
-        if team_id not in completed:
-            completed.append(team_id)
-            self.save_state({'completed_teams': completed})
+        with self._lock:
+            completed = list(self.state.get('completed_teams', []))
+            if team_id not in completed:
+                completed.append(team_id)
+                self.save_state({'completed_teams': completed})
 
     def mark_team_failed(self, team_id: str, error: str = ""):
         """Mark a team as failed"""
-        failed = self.state.get('failed_teams', [])
-        if team_id not in failed:
-            failed.append(team_id)
-            self.save_state({
-                'failed_teams': failed,
-                'last_error': error,
-                'failed_team': team_id
+        with self._lock:
+            failed = list(self.state.get('failed_teams', []))
+            if team_id not in failed:
+                failed.append(team_id)
+                self.save_state({
+                    'failed_teams': failed,
+                    'last_error': error,
+                    'failed_team': team_id
+                })
+
+    def record_team_step(self, team_id: str, step: str, summary: str = "") -> List[Dict[str, Any]]:
+        """Checkpoint a verified sub-step of a team's step file"""
+        with self._lock:
+            progress = copy.deepcopy(self.state.get('team_steps', {}))
+            steps = [s for s in progress.get(team_id, []) if s['step'] != step]
+            steps.append({
+                'step': step,
+                'summary': summary,
+                'timestamp': datetime.now().isoformat(),
             })
+            progress[team_id] = steps
+
+            self.checkpoint(f"{team_id}/{step}", {'team_steps': progress})
+            return steps
+
+    def get_team_steps(self, team_id: str) -> List[Dict[str, Any]]:
+        """Sub-steps a team has checkpointed, oldest first"""
+        return self.state.get('team_steps', {}).get(team_id, [])
+
+    def clear_team_steps(self, team_id: str):
+        """Forget a team's sub-step progress so it starts from scratch"""
+        with self._lock:
+            progress = dict(self.state.get('team_steps', {}))
+            if progress.pop(team_id, None) is not None:
+                self.save_state({'team_steps': progress})
 
     def get_completed_teams(self) -> List[str]:
         """Get list of completed teams"""
@@ -188,3 +440,19 @@ class StateManager:
     def is_team_failed(self, team_id: str) -> bool:
         """Check if a team has failed"""
         return team_id in self.state.get('failed_teams', [])
+
+
+def read_status(config: Dict) -> Dict[str, Any]:
+    """Workflow progress read from the state files without modifying anything"""
+    state_manager = StateManager(config, read_only=True)
+    progress = state_manager.get_progress()
+    finished = set(progress['completed_teams']) | set(progress['failed_teams'])
+    return {
+        'total': len(config['teams']),
+        'completed': progress['completed_teams'],
+        'failed': progress['failed_teams'],
+        'running': [t for t in state_manager.get('running_teams', []) if t not in finished],
+        'current_phase': progress['current_phase'],
+        'last_event': state_manager.get('last_event') or {},
+        'last_update': progress['last_update'],
+    }
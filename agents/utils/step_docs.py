@@ -0,0 +1,168 @@
+"""
+Step Docs - Helpers for reading the docs/steps/*.md playbooks
+
+Besides listing sub-steps, ``parse_step_tasks`` turns each ``### Task N:``
+section into a ``StepTask``: the fenced ``bash`` blocks to run, and the
+commands of the block following ``**Verification**:`` as checks, with any
+``# Should show: <text>`` comment becoming the check's expected output.
+
+A task whose section carries a ``**WARNING**`` callout (with or without an
+emoji) or an ``<!-- agent-only -->`` marker is ``agent_only``: its
+precondition needs judgement, so it is never run as a script.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+TASK_HEADING = re.compile(r'^###\s+(Task\s+\d+:\s*.+?)\s*(?:\([^)]*\))?\s*$')
+SECTION_HEADING = re.compile(r'^##\s')
+VERIFICATION_LABEL = re.compile(r'^\*\*Verification\*\*:?\s*$')
+FENCE = re.compile(r'^```\s*([\w-]*)\s*$')
+SHELL_LANGUAGES = ('bash', 'sh', 'shell')
+
+# ``ssh hetzner1`` on its own: the docs log in first, commands already run on the host
+LOGIN_LINE = re.compile(r'^\s*ssh\s+[\w.@-]+\s*$')
+EXPECT_COMMENT = re.compile(r'^#\s*Should show:\s*(.+?)\s*$', re.IGNORECASE)
+AGENT_ONLY = re.compile(r'^\s*(?:<!--\s*agent-only\s*-->|\*\*[^*\w]*WARNING\*\*)', re.IGNORECASE)
+
+
+class StepCheck:
+    """One verification command, optionally with text its output must contain"""
+
+    def __init__(self, command: str, expect: Optional[str] = None):
+        self.command = command
+        self.expect = expect
+
+    def __repr__(self) -> str:
+        return f"StepCheck({self.command!r}, expect={self.expect!r})"
+
+
+class StepTask:
+    """A ``### Task N:`` section as command blocks plus verification checks"""
+
+    def __init__(self, name: str, commands: Optional[List[str]] = None,
+                 checks: Optional[List[StepCheck]] = None, agent_only: bool = False):
+        self.name = name
+        self.commands = commands or []
+        self.checks = checks or []
+        self.agent_only = agent_only
+
+    @property
+    def script(self) -> str:
+        """All command blocks of the task as one shell script"""
+        return "\n\n".join(self.commands)
+
+    def __repr__(self) -> str:
+        return (f"StepTask({self.name!r}, blocks={len(self.commands)}, checks={len(self.checks)}"
+                f"{', agent_only=True' if self.agent_only else ''})")
+
+
+def resolve_step_file(config: Dict, step_file: str) -> Path:
+    """Absolute path of a team's step file"""
+    return Path(config['project']['base_path']) / step_file
+
+
+def list_substeps(path: Path) -> List[str]:
+    """Names of the ``### Task N: ...`` sub-steps in a step document"""
+    try:
+        text = Path(path).read_text(encoding='utf-8')
+    except OSError:
+        return []
+
+    substeps = []
+    for line in text.splitlines():
+        match = TASK_HEADING.match(line)
+        if match:
+            substeps.append(match.group(1))
+    return substeps
+
+
+def _strip_logins(block: str) -> str:
+    return "\n".join(line for line in block.splitlines() if not LOGIN_LINE.match(line)).strip()
+
+
+def parse_checks(block: str) -> List[StepCheck]:
+    """Split a verification block into checks
+
+    Each command (with ``\\`` continuations joined) is a check; a
+    ``# Should show: ...`` comment sets the expected output of the command
+    before it; other comments are dropped. Blocks with heredocs are kept
+    whole as a single check.
+    """
+    block = _strip_logins(block)
+    if '<<' in block:
+        return [StepCheck(block)] if block else []
+
+    checks: List[StepCheck] = []
+    pending = ""
+    for line in block.splitlines():
+        stripped = line.strip()
+        if pending:
+            pending += "\n" + line
+            if not stripped.endswith('\\'):
+                checks.append(StepCheck(pending))
+                pending = ""
+            continue
+        if not stripped:
+            continue
+        if stripped.startswith('#'):
+            match = EXPECT_COMMENT.match(stripped)
+            if match and checks:
+                checks[-1].expect = match.group(1)
+            continue
+        if stripped.endswith('\\'):
+            pending = line
+        else:
+            checks.append(StepCheck(stripped))
+    if pending:
+        checks.append(StepCheck(pending))
+    return checks
+
+
+def parse_step_tasks(path: Path) -> List[StepTask]:
+    """Executable form of the ``### Task N:`` sections of a step document"""
+    try:
+        lines = Path(path).read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return []
+
+    tasks: List[StepTask] = []
+    current: Optional[StepTask] = None
+    verification = False
+    block: Optional[List[str]] = None
+    language = ""
+
+    for line in lines:
+        if block is not None:
+            if line.strip() == '```':
+                text = "\n".join(block)
+                if current and language in SHELL_LANGUAGES:
+                    if verification:
+                        current.checks.extend(parse_checks(text))
+                    elif _strip_logins(text):
+                        current.commands.append(_strip_logins(text))
+                verification = False
+                block = None
+            else:
+                block.append(line)
+            continue
+
+        fence = FENCE.match(line)
+        heading = TASK_HEADING.match(line)
+        if fence:
+            block, language = [], fence.group(1).lower()
+        elif heading:
+            current = StepTask(heading.group(1))
+            tasks.append(current)
+            verification = False
+        elif SECTION_HEADING.match(line):
+            current = None
+            verification = False
+        elif VERIFICATION_LABEL.match(line.strip()):
+            verification = True
+        elif current and AGENT_ONLY.match(line):
+            current.agent_only = True
+
+    return [task for task in tasks if task.commands or task.checks]
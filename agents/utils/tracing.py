@@ -0,0 +1,216 @@
+"""
+Tracing - Nested timed spans exported as Chrome trace-event JSON
+
+Spans are recorded only while profiling is enabled (``advanced.enable_profiling``)
+and written to ``advanced.profiling_output`` when the run ends. The file
+opens in ``chrome://tracing`` or https://ui.perfetto.dev: every team gets
+its own track, so time spent waiting on the model, on the server and in
+idle scheduler gaps is visible side by side. ``advanced.profile_cpu``
+additionally captures a cProfile of the orchestrator thread next to it.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+# Name of the track (team) the current code path belongs to
+_current_track: contextvars.ContextVar = contextvars.ContextVar('trace_track', default=None)
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed region, emitted as a complete ("X") trace event on exit"""
+
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._emit({
+            'name': self.name,
+            'cat': self.cat,
+            'ph': 'X',
+            'ts': self.tracer._micros(self.start),
+            'dur': (end - self.start) / 1000,
+            'tid': self.tracer._tid(),
+            'args': self.args,
+        })
+        return False
+
+    def set(self, **args):
+        """Attach extra arguments, e.g. results known only at the end"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects spans and counters for one process"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self.max_events = 1_000_000
+        self.dropped = 0
+        self.output: Optional[Path] = None
+        self.profiler = None
+        self._epoch = time.perf_counter_ns()
+        self._tids: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, config: Dict) -> bool:
+        """Begin recording if ``advanced.enable_profiling`` is set
+
+        Returns True if this call started a recording, so the caller knows
+        it is the one to ``stop`` it.
+        """
+        advanced = config.get('advanced', {})
+        if self.enabled or not advanced.get('enable_profiling', False):
+            return False
+
+        self.output = Path(config['project']['base_path']) / advanced.get(
+            'profiling_output', 'logs/profile.json')
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        self.max_events = advanced.get('profiling_max_events', 1_000_000)
+        with self._lock:
+            self.events = []
+            self.dropped = 0
+            self._tids = {}
+        self._epoch = time.perf_counter_ns()
+        self.enabled = True
+
+        if advanced.get('profile_cpu', False):
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return True
+
+    def stop(self):
+        """Stop recording and write the trace (and cProfile stats)"""
+        if not self.enabled:
+            return
+        self.enabled = False
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            try:
+                self.profiler.dump_stats(str(self.output.with_suffix('.prof')))
+            except OSError as e:
+                print(f"Warning: Failed to write CPU profile: {e}")
+            self.profiler = None
+
+        self.write(self.output)
+
+    def span(self, name: str, cat: str = 'orchestrator', **args):
+        """Context manager timing a region; nested spans show as a stack"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def counter(self, name: str, **values):
+        """Record counter values (e.g. running teams) as a graph track"""
+        if not self.enabled:
+            return
+        self._emit({
+            'name': name,
+            'ph': 'C',
+            'ts': self._micros(time.perf_counter_ns()),
+            'tid': 0,
+            'args': values,
+        })
+
+    def current_track(self) -> Optional[str]:
+        """Name of the track set by the enclosing ``track`` block, if any"""
+        return _current_track.get()
+
+    @contextmanager
+    def track(self, name: str):
+        """Put spans opened inside this block on their own named track"""
+        token = _current_track.set(name)
+        try:
+            yield
+        finally:
+            _current_track.reset(token)
+
+    def _micros(self, ns: int) -> float:
+        return (ns - self._epoch) / 1000
+
+    def _tid(self) -> int:
+        """Track id: the current team if one is set, else the OS thread"""
+        key = _current_track.get()
+        label = key
+        if key is None:
+            thread = threading.current_thread()
+            key, label = thread.ident, thread.name
+
+        tid = self._tids.get(key)
+        if tid is None:
+            with self._lock:
+                tid = self._tids.setdefault(key, len(self._tids) + 1)
+                self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(),
+                                    'tid': tid, 'args': {'name': str(label)}})
+        return tid
+
+    def _emit(self, event: Dict[str, Any]):
+        event['pid'] = os.getpid()
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    def write(self, path: Path):
+        """Write the collected events in Chrome trace-event format"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                'traceEvents': list(self.events),
+                'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped},
+            }
+
+        tmp_file = path.with_suffix(path.suffix + '.tmp')
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_file, path)
+        except OSError as e:
+            print(f"Warning: Failed to write trace: {e}")
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    return _tracer
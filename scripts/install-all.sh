@@ -27,9 +27,23 @@ fi
 echo "✓ Virtualization support confirmed"
 echo ""
 
+# Payloads pushed by the orchestrator (--push-artifacts) are used instead
+# of downloading them again
+ARTIFACT_DIR="${ARTIFACT_DIR:-/var/cache/hypervisor-artifacts}"
+
+fetch() {
+    local name
+    name=$(basename "$1")
+    if [ -f "$ARTIFACT_DIR/$name" ]; then
+        cp "$ARTIFACT_DIR/$name" "$name"
+    else
+        wget -q "$1"
+    fi
+}
+
 # Install Firecracker
 echo "Installing Firecracker v1.10.0..."
-wget -q https://github.com/firecracker-microvm/firecracker/releases/download/v1.10.0/firecracker-v1.10.0-x86_64.tgz
+fetch https://github.com/firecracker-microvm/firecracker/releases/download/v1.10.0/firecracker-v1.10.0-x86_64.tgz
 tar -xzf firecracker-v1.10.0-x86_64.tgz
 mv release-v1.10.0-x86_64/firecracker-v1.10.0-x86_64 /usr/local/bin/firecracker
 chmod +x /usr/local/bin/firecracker
@@ -39,7 +53,7 @@ echo ""
 
 # Install Cloud Hypervisor
 echo "Installing Cloud Hypervisor v49.0..."
-wget -q https://github.com/cloud-hypervisor/cloud-hypervisor/releases/download/v49.0/cloud-hypervisor
+fetch https://github.com/cloud-hypervisor/cloud-hypervisor/releases/download/v49.0/cloud-hypervisor
 chmod +x cloud-hypervisor
 mv cloud-hypervisor /usr/local/bin/cloud-hypervisor
 echo "✓ Cloud Hypervisor installed: $(cloud-hypervisor --version)"
@@ -47,7 +61,7 @@ echo ""
 
 # Install Flintlock
 echo "Installing Flintlock v0.9.0..."
-wget -q https://github.com/liquidmetal-dev/flintlock/releases/download/v0.9.0/flintlockd_amd64
+fetch https://github.com/liquidmetal-dev/flintlock/releases/download/v0.9.0/flintlockd_amd64
 chmod +x flintlockd_amd64
 mv flintlockd_amd64 /usr/local/bin/flintlock
 echo "✓ Flintlock installed: $(flintlock version)"
@@ -59,10 +73,10 @@ mkdir -p /root/firecracker-test
 cd /root/firecracker-test
 
 echo "  - Downloading kernel..."
-wget -q https://s3.amazonaws.com/spec.ccfc.min/img/quickstart_guide/x86_64/kernels/vmlinux.bin
+fetch https://s3.amazonaws.com/spec.ccfc.min/img/quickstart_guide/x86_64/kernels/vmlinux.bin
 
 echo "  - Downloading rootfs..."
-wget -q https://s3.amazonaws.com/spec.ccfc.min/img/quickstart_guide/x86_64/rootfs/bionic.rootfs.ext4
+fetch https://s3.amazonaws.com/spec.ccfc.min/img/quickstart_guide/x86_64/rootfs/bionic.rootfs.ext4
 
 # Create Firecracker config
 cat > vm_config.json << 'EOF'